@@ -2,61 +2,142 @@
 Cliente para comunicação com as APIs do sistema
 """
 
-import requests
 import logging
+import random
+import threading
+import time
+import requests
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, as_completed, wait
 from datetime import datetime
 from config import *
+from http_session import criar_sessao
+from json_backend import carregar, serializar
+from json_stream import iter_itens_json
+from master_cache import CacheDadosMestres
+from records import Pedido
+from token_cache import TokenCache
+
+class ErroAPI(Exception):
+    """Falha em uma consulta à API"""
+
+def extrair_registros(dados):
+    """
+    Extrai a lista de registros da resposta da API
+    
+    Args:
+        dados (list|dict): Resposta decodificada (lista ou objeto com chave 'data')
+        
+    Returns:
+        list: Lista de registros
+    """
+    if isinstance(dados, dict):
+        return dados.get('data') or []
+    return dados
 
 class APIClient:
     """Cliente para comunicação com as APIs"""
     
-    def __init__(self):
+    def __init__(self, session=None, token_cache=None, cache_mestres=None, base_url=None, gravar=None):
+        base_url = base_url or API_BASE_URL
+        self.token_url = f"{base_url}/oauth/token"
+        self.vendas_url = f"{base_url}/integration/v1/fetch/pedido"
+        self.vendedores_url = f"{base_url}/integration/v1/fetch/representante"
+        self.empresas_url = f"{base_url}/integration/v1/fetch/empresa"
         self.token = None
+        self.token_expira_em = 0
         self.logger = logging.getLogger(__name__)
+        # Consultas são somente leitura, então POST pode ser repetido com segurança
+        self.session = session or criar_sessao(retentar_post=True)
+        self.token_cache = token_cache or TokenCache(base_url=base_url)
+        self.cache_mestres = cache_mestres or CacheDadosMestres()
+        self._token_lock = threading.Lock()
+        # Inclui os campos de PEDIDO_CHAVE na consulta de vendas (apenas o modo incremental precisa deles)
+        self.campos_chave_pedido = False
+        # Snapshot das respostas (SNAPSHOT_GRAVAR), reproduzível com main.py --replay
+        gravar = SNAPSHOT_GRAVAR if gravar is None else gravar
+        self.gravador = None
+        if gravar:
+            from snapshots import GravadorSnapshot
+            
+            self.gravador = GravadorSnapshot(base_url)
+            self.session.hooks['response'].append(self.gravador.gancho_resposta)
+    
+    def _token_valido(self):
+        """
+        Verifica se o token atual existe e não está próximo de expirar
+        
+        Returns:
+            bool: True se o token pode ser usado
+        """
+        return bool(self.token) and time.time() < self.token_expira_em - self.token_cache.margem_renovacao
     
-    def generate_token(self):
+    def generate_token(self, forcar=False):
         """
         Gera token de autenticação para a API
         
+        Reutiliza o token do cache em disco enquanto for válido. Um novo token
+        só é solicitado quando o atual está ausente ou próximo de expirar.
+        
+        Args:
+            forcar (bool): Ignora o token em cache e solicita um novo
+        
         Returns:
             str: Token de acesso ou None em caso de erro
         """
-        try:
-            headers = {
-                'Authorization': API_AUTHORIZATION,
-                'Content-Type': 'application/x-www-form-urlencoded'
-            }
-            
-            data = {
-                'grant_type': 'password',
-                'username': API_USERNAME,
-                'password': API_PASSWORD
-            }
-            
-            self.logger.info("Gerando token de autenticação...")
-            response = requests.post(TOKEN_URL, headers=headers, data=data)
-            
-            if response.status_code == 200:
-                token_data = response.json()
-                self.token = token_data.get('access_token')
-                self.logger.info("Token gerado com sucesso")
+        with self._token_lock:
+            if not forcar and self._token_valido():
                 return self.token
-            else:
-                self.logger.error(f"Erro ao gerar token: {response.status_code} - {response.text}")
+            
+            try:
+                with self.token_cache.lock():
+                    if not forcar:
+                        token, expira_em = self.token_cache.carregar()
+                        if token:
+                            self.token = token
+                            self.token_expira_em = expira_em
+                            self.logger.info("Token reutilizado do cache")
+                            return self.token
+                    
+                    headers = {
+                        'Authorization': API_AUTHORIZATION,
+                        'Content-Type': 'application/x-www-form-urlencoded'
+                    }
+                    
+                    data = {
+                        'grant_type': 'password',
+                        'username': API_USERNAME,
+                        'password': API_PASSWORD
+                    }
+                    
+                    self.logger.info("Gerando token de autenticação...")
+                    response = self.session.post(self.token_url, headers=headers, data=data)
+                    
+                    if response.status_code == 200:
+                        token_data = carregar(response.content)
+                        expires_in = int(token_data.get('expires_in') or TOKEN_VALIDADE_PADRAO)
+                        self.token = token_data.get('access_token')
+                        self.token_expira_em = time.time() + expires_in
+                        self.token_cache.salvar(self.token, self.token_expira_em)
+                        self.logger.info("Token gerado com sucesso")
+                        return self.token
+                    else:
+                        self.logger.error(f"Erro ao gerar token: {response.status_code} - {response.text}")
+                        return None
+                    
+            except Exception as e:
+                self.logger.error(f"Erro ao gerar token: {str(e)}")
                 return None
-                
-        except Exception as e:
-            self.logger.error(f"Erro ao gerar token: {str(e)}")
-            return None
     
     def get_auth_headers(self):
         """
         Retorna headers com autorização Bearer
         
+        O token é renovado automaticamente quando está próximo de expirar.
+        
         Returns:
             dict: Headers com token de autorização
         """
-        if not self.token:
+        if not self._token_valido():
             self.generate_token()
         
         return {
@@ -64,52 +145,372 @@ class APIClient:
             'Authorization': f'Bearer {self.token}'
         }
     
+    def post_autenticado(self, url, payload, stream=False):
+        """
+        Envia POST autenticado à API
+        
+        Se a API rejeitar o token (401), ele é descartado do cache, um novo
+        token é obtido e a requisição é repetida uma única vez.
+        
+        Args:
+            url (str): URL do endpoint
+            payload (dict): Corpo JSON da requisição
+            stream (bool): Não lê o corpo da resposta antecipadamente
+            
+        Returns:
+            requests.Response: Resposta da API
+        """
+        headers = self.get_auth_headers()
+        token_usado = self.token
+        corpo = serializar(payload)
+        response = self.session.post(url, headers=headers, data=corpo, stream=stream)
+        
+        if response.status_code == 401:
+            response.close()
+            self.logger.warning("Token rejeitado pela API (401), renovando...")
+            self.token_cache.invalidar(token_usado)
+            with self._token_lock:
+                if self.token == token_usado:
+                    self.token = None
+            response = self.session.post(url, headers=self.get_auth_headers(), data=corpo, stream=stream)
+        
+        return response
+    
+    def _payload_vendas(self, data_emissao, cdempresa=None):
+        """
+        Monta o corpo da consulta de vendas
+        
+        Args:
+            data_emissao (str): Data no formato DD/MM/YYYY
+            cdempresa: Restringe a consulta a uma empresa. Se None, todas
+            
+        Returns:
+            dict: Payload da consulta
+        """
+        campos = [
+            "CDEMPRESA",
+            "CDREPRESENTANTE", 
+            "CDUSUARIOEMISSAO",
+            "FLORIGEMPEDIDO",
+            "CDTIPOPAGAMENTO",
+            "DTEMISSAO",
+            "VLTOTALPEDIDO",
+            "VLVOLUMEPEDIDO",
+            "FLCONTROLEERP"
+        ]
+        # Campos que identificam o pedido, pedidos só no modo incremental
+        if self.campos_chave_pedido:
+            campos += [campo for campo in PEDIDO_CHAVE if campo not in campos]
+        
+        filtros = {
+            "DTEMISSAO": data_emissao
+        }
+        if cdempresa is not None:
+            filtros["CDEMPRESA"] = cdempresa
+        
+        return {
+            "fields": campos,
+            "filters": filtros
+        }
+    
     def fetch_vendas(self, data_emissao=None):
         """
         Consulta vendas do dia
         
+        Se VENDAS_TAMANHO_PAGINA estiver configurado, a consulta é feita em
+        páginas e o resultado é concatenado. Com VENDAS_STREAMING, a resposta
+        é decodificada à medida que chega (ver iter_vendas).
+        
         Args:
             data_emissao (str): Data no formato DD/MM/YYYY. Se None, usa data atual
             
         Returns:
-            list: Lista de vendas ou None em caso de erro
+            list: Lista de vendas (Pedido) ou None em caso de erro
         """
         try:
             if not data_emissao:
                 data_emissao = datetime.now().strftime("%d/%m/%Y")
             
-            payload = {
-                "fields": [
-                    "CDEMPRESA",
-                    "CDREPRESENTANTE", 
-                    "CDUSUARIOEMISSAO",
-                    "FLORIGEMPEDIDO",
-                    "CDTIPOPAGAMENTO",
-                    "DTEMISSAO",
-                    "VLTOTALPEDIDO",
-                    "VLVOLUMEPEDIDO",
-                    "FLCONTROLEERP"
-                ],
-                "filters": {
-                    "DTEMISSAO": data_emissao
-                }
-            }
+            if VENDAS_TAMANHO_PAGINA > 0:
+                vendas = []
+                for pagina in self.iter_vendas_paginas(data_emissao):
+                    vendas.extend(pagina)
+                return vendas
+            
+            if VENDAS_STREAMING:
+                return list(self.iter_vendas(data_emissao))
             
             self.logger.info(f"Consultando vendas do dia {data_emissao}...")
-            response = requests.post(VENDAS_URL, headers=self.get_auth_headers(), json=payload)
+            vendas = self._consultar_vendas(data_emissao)
+            self.logger.info(f"Encontradas {len(vendas)} vendas")
+            return vendas
             
-            if response.status_code == 200:
-                vendas = response.json()
-                self.logger.info(f"Encontradas {len(vendas)} vendas")
-                return vendas
-            else:
-                self.logger.error(f"Erro ao consultar vendas: {response.status_code} - {response.text}")
-                return None
-                
+        except ErroAPI as e:
+            self.logger.error(str(e))
+            return None
         except Exception as e:
             self.logger.error(f"Erro ao consultar vendas: {str(e)}")
             return None
     
+    def _consultar_vendas(self, data_emissao, cdempresa=None):
+        """
+        Consulta vendas em uma única requisição
+        
+        Args:
+            data_emissao (str): Data no formato DD/MM/YYYY
+            cdempresa: Restringe a consulta a uma empresa. Se None, todas
+            
+        Returns:
+            list: Vendas (Pedido)
+            
+        Raises:
+            ErroAPI: Se a consulta falhar
+        """
+        response = self._requisitar_vendas(data_emissao, cdempresa)
+        
+        try:
+            return [Pedido.de_api(venda) for venda in extrair_registros(carregar(response.content))]
+        except ValueError as e:
+            raise ErroAPI(f"Resposta de vendas inválida: {str(e)}")
+    
+    def _requisitar_vendas(self, data_emissao, cdempresa=None):
+        """
+        Envia a consulta de vendas e valida o status da resposta
+        
+        Returns:
+            requests.Response: Resposta com status 200
+            
+        Raises:
+            ErroAPI: Se a requisição falhar ou retornar outro status
+        """
+        try:
+            response = self.post_autenticado(self.vendas_url, self._payload_vendas(data_emissao, cdempresa))
+        except Exception as e:
+            raise ErroAPI(f"Erro ao consultar vendas: {str(e)}")
+        
+        if response.status_code != 200:
+            raise ErroAPI(f"Erro ao consultar vendas: {response.status_code} - {response.text}")
+        
+        return response
+    
+    def consultar_vendas_bruto(self, data_emissao=None, cdempresa=None):
+        """
+        Consulta vendas em uma única requisição, sem decodificar a resposta
+        
+        Usado quando a decodificação acontece em outro processo
+        (ver ProcessadorParalelo.processar_respostas).
+        
+        Args:
+            data_emissao (str): Data no formato DD/MM/YYYY. Se None, usa data atual
+            cdempresa: Restringe a consulta a uma empresa. Se None, todas
+            
+        Returns:
+            bytes: Corpo JSON da resposta
+            
+        Raises:
+            ErroAPI: Se a consulta falhar
+        """
+        if not data_emissao:
+            data_emissao = datetime.now().strftime("%d/%m/%Y")
+        
+        return self._requisitar_vendas(data_emissao, cdempresa).content
+    
+    def iter_vendas_particionado(self, cd_empresas, data_emissao=None, max_workers=None, tentativas=None, bruto=False):
+        """
+        Consulta vendas com uma requisição por empresa (filtro CDEMPRESA), em paralelo
+        
+        Cada partição é repetida até `tentativas` vezes antes de desistir, sem
+        refazer as que já foram concluídas. Dentro de cada partição valem
+        VENDAS_TAMANHO_PAGINA e VENDAS_STREAMING, exceto com `bruto`.
+        
+        Args:
+            cd_empresas (list): Códigos das empresas a consultar
+            data_emissao (str): Data no formato DD/MM/YYYY. Se None, usa data atual
+            max_workers (int): Consultas simultâneas. Se None, usa VENDAS_PARTICAO_WORKERS
+            tentativas (int): Tentativas por partição. Se None, usa VENDAS_PARTICAO_TENTATIVAS
+            bruto (bool): Entrega o corpo JSON de cada partição sem decodificar
+            
+        Yields:
+            list|bytes: Vendas (Pedido) de uma empresa, ou o corpo da resposta com
+                `bruto`, na ordem em que as partições terminam
+            
+        Raises:
+            ErroAPI: Se alguma partição falhar em todas as tentativas
+        """
+        if not data_emissao:
+            data_emissao = datetime.now().strftime("%d/%m/%Y")
+        
+        max_workers = max_workers or VENDAS_PARTICAO_WORKERS
+        tentativas = max(1, tentativas or VENDAS_PARTICAO_TENTATIVAS)
+        
+        def consultar(cdempresa):
+            for tentativa in range(1, tentativas + 1):
+                try:
+                    if bruto:
+                        return self.consultar_vendas_bruto(data_emissao, cdempresa)
+                    if VENDAS_TAMANHO_PAGINA > 0:
+                        return [venda for pagina in self.iter_vendas_paginas(data_emissao, cdempresa=cdempresa)
+                                for venda in pagina]
+                    if VENDAS_STREAMING:
+                        return list(self.iter_vendas(data_emissao, cdempresa=cdempresa))
+                    return self._consultar_vendas(data_emissao, cdempresa)
+                except ErroAPI as e:
+                    if tentativa == tentativas:
+                        raise ErroAPI(f"Empresa {cdempresa}: {str(e)}")
+                    espera = random.uniform(0, min(HTTP_BACKOFF_MAX, HTTP_BACKOFF_FACTOR * 2 ** tentativa))
+                    self.logger.warning("Falha nas vendas da empresa %s (tentativa %d/%d), repetindo em %.1fs: %s",
+                                        cdempresa, tentativa, tentativas, espera, e)
+                    time.sleep(espera)
+        
+        self.logger.info("Consultando vendas do dia %s por empresa (%d partições, até %d em paralelo)...",
+                         data_emissao, len(cd_empresas), max_workers)
+        
+        executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(cd_empresas) or 1)),
+                                      thread_name_prefix='vendas')
+        concluido = False
+        try:
+            futuros = [executor.submit(consultar, cdempresa) for cdempresa in cd_empresas]
+            quantidade = 0
+            for futuro in as_completed(futuros):
+                vendas = futuro.result()
+                quantidade += len(vendas)
+                yield vendas
+            concluido = True
+            if bruto:
+                self.logger.info("Recebidos %d bytes de vendas de %d empresas", quantidade, len(cd_empresas))
+            else:
+                self.logger.info("Encontradas %d vendas em %d empresas", quantidade, len(cd_empresas))
+        finally:
+            # Em caso de falha, não espera as partições restantes
+            executor.shutdown(wait=concluido, cancel_futures=True)
+    
+    def iter_vendas_paginas(self, data_emissao=None, tamanho_pagina=None, cdempresa=None):
+        """
+        Consulta vendas do dia em páginas, entregando cada página assim que chega
+        
+        Usa os parâmetros limit/offset do endpoint. Se a primeira página vier
+        menor que o solicitado, o tamanho dela é tomado como o limite aplicado
+        pelo servidor e a consulta continua até uma página vazia ou menor que
+        esse limite, para não perder pedidos quando a API reduz o limit.
+        
+        A primeira página só é entregue depois que a segunda confirma que o
+        offset é respeitado; se a API repetir a página, o dia é consultado em
+        uma única requisição, como sem paginação.
+        
+        Args:
+            data_emissao (str): Data no formato DD/MM/YYYY. Se None, usa data atual
+            tamanho_pagina (int): Registros por página. Se None, usa VENDAS_TAMANHO_PAGINA
+            cdempresa: Restringe a consulta a uma empresa. Se None, todas
+            
+        Yields:
+            list: Página de vendas (Pedido)
+            
+        Raises:
+            ErroAPI: Se alguma página não puder ser consultada
+        """
+        if not data_emissao:
+            data_emissao = datetime.now().strftime("%d/%m/%Y")
+        
+        tamanho_pagina = tamanho_pagina or VENDAS_TAMANHO_PAGINA or 1000
+        payload = self._payload_vendas(data_emissao, cdempresa)
+        offset = 0
+        assinatura_anterior = None
+        # Tamanho efetivo das páginas, conhecido após a primeira
+        limite_servidor = None
+        # Primeira página, retida até a segunda confirmar que o offset é respeitado
+        primeira = None
+        
+        self.logger.info("Consultando vendas do dia %s em páginas de %d...", data_emissao, tamanho_pagina)
+        
+        while True:
+            payload['limit'] = tamanho_pagina
+            payload['offset'] = offset
+            
+            try:
+                response = self.post_autenticado(self.vendas_url, payload)
+            except Exception as e:
+                raise ErroAPI(f"Erro ao consultar vendas (offset {offset}): {str(e)}")
+            
+            if response.status_code != 200:
+                raise ErroAPI(f"Erro ao consultar vendas (offset {offset}): {response.status_code} - {response.text}")
+            
+            pagina = extrair_registros(carregar(response.content))
+            
+            # Protege contra servidor que ignora o offset e repete a mesma página
+            assinatura = (pagina[0], pagina[-1]) if pagina else None
+            if assinatura is not None and assinatura == assinatura_anterior:
+                if primeira is None:
+                    # Páginas anteriores já foram entregues; não há como refazer a consulta
+                    raise ErroAPI(f"A API repetiu a página de vendas no offset {offset}")
+                self.logger.warning("A API ignorou o offset e repetiu a primeira página; "
+                                    "consultando o dia em uma única requisição")
+                yield self._consultar_vendas(data_emissao, cdempresa)
+                return
+            assinatura_anterior = assinatura
+            
+            offset += len(pagina)
+            self.logger.debug("Página de vendas recebida: %d registros (total %d)", len(pagina), offset)
+            
+            if primeira is not None:
+                yield primeira
+                primeira = None
+            
+            if not pagina:
+                break
+            
+            if limite_servidor is None:
+                limite_servidor = len(pagina)
+                if limite_servidor < tamanho_pagina:
+                    self.logger.debug("Primeira página com %d de %d registros; confirmando o fim da consulta",
+                                      limite_servidor, tamanho_pagina)
+                primeira = [Pedido.de_api(venda) for venda in pagina]
+                continue
+            
+            yield [Pedido.de_api(venda) for venda in pagina]
+            if len(pagina) < limite_servidor:
+                break
+    
+    def iter_vendas(self, data_emissao=None, cdempresa=None):
+        """
+        Consulta vendas do dia decodificando a resposta à medida que chega
+        
+        Cada pedido é entregue assim que é decodificado, sem manter o corpo
+        completo nem a lista inteira em memória.
+        
+        Args:
+            data_emissao (str): Data no formato DD/MM/YYYY. Se None, usa data atual
+            cdempresa: Restringe a consulta a uma empresa. Se None, todas
+            
+        Yields:
+            Pedido: Pedido
+            
+        Raises:
+            ErroAPI: Se a consulta falhar ou a resposta vier truncada
+        """
+        if not data_emissao:
+            data_emissao = datetime.now().strftime("%d/%m/%Y")
+        
+        self.logger.info("Consultando vendas do dia %s (streaming)...", data_emissao)
+        
+        try:
+            response = self.post_autenticado(self.vendas_url, self._payload_vendas(data_emissao, cdempresa), stream=True)
+        except Exception as e:
+            raise ErroAPI(f"Erro ao consultar vendas: {str(e)}")
+        
+        with response:
+            if response.status_code != 200:
+                raise ErroAPI(f"Erro ao consultar vendas: {response.status_code} - {response.text}")
+            
+            quantidade = 0
+            try:
+                for venda in iter_itens_json(response.iter_content(chunk_size=VENDAS_STREAMING_BLOCO)):
+                    quantidade += 1
+                    yield Pedido.de_api(venda)
+            except (ValueError, OSError, requests.RequestException) as e:
+                raise ErroAPI(f"Erro ao ler vendas após {quantidade} registros: {str(e)}")
+        
+        self.logger.info("Encontradas %d vendas", quantidade)
+    
     def fetch_vendedores(self):
         """
         Consulta lista de vendedores ativos
@@ -132,10 +533,10 @@ class APIClient:
             }
             
             self.logger.info("Consultando vendedores...")
-            response = requests.post(VENDEDORES_URL, headers=self.get_auth_headers(), json=payload)
+            response = self.post_autenticado(self.vendedores_url, payload)
             
             if response.status_code == 200:
-                vendedores = response.json()
+                vendedores = carregar(response.content)
                 self.logger.info(f"Encontrados {len(vendedores)} vendedores")
                 return vendedores
             else:
@@ -166,10 +567,10 @@ class APIClient:
             }
             
             self.logger.info("Consultando empresas...")
-            response = requests.post(EMPRESAS_URL, headers=self.get_auth_headers(), json=payload)
+            response = self.post_autenticado(self.empresas_url, payload)
             
             if response.status_code == 200:
-                empresas = response.json()
+                empresas = carregar(response.content)
                 self.logger.info(f"Encontradas {len(empresas)} empresas")
                 return empresas
             else:
@@ -178,4 +579,79 @@ class APIClient:
                 
         except Exception as e:
             self.logger.error(f"Erro ao consultar empresas: {str(e)}")
-            return None
\ No newline at end of file
+            return None
+    
+    def fetch_dados_paralelo(self, data_emissao=None, incluir_vendas=True, forcar_atualizacao=False):
+        """
+        Consulta vendas, vendedores e empresas em paralelo
+        
+        As consultas compartilham o mesmo token. Na primeira falha as
+        consultas pendentes são canceladas e a execução retorna imediatamente.
+        Vendedores e empresas vêm do cache de dados mestres enquanto válido,
+        exceto ao gravar snapshot, que precisa das respostas deles.
+        
+        Args:
+            data_emissao (str): Data no formato DD/MM/YYYY. Se None, usa data atual
+            incluir_vendas (bool): Se False, consulta apenas vendedores e empresas
+            forcar_atualizacao (bool): Ignora o cache de vendedores e empresas
+            
+        Returns:
+            tuple: (dados, relatorio) onde dados é um dict com as listas de
+                'vendas', 'vendedores' e 'empresas' (ou None em caso de erro) e
+                relatorio é um dict com o status de cada endpoint
+        """
+        forcar_atualizacao = forcar_atualizacao or self.gravador is not None
+        consultas = {
+            'vendas': lambda: self.fetch_vendas(data_emissao),
+            'vendedores': lambda: self.cache_mestres.obter('vendedores', self.fetch_vendedores, forcar_atualizacao),
+            'empresas': lambda: self.cache_mestres.obter('empresas', self.fetch_empresas, forcar_atualizacao)
+        }
+        if not incluir_vendas:
+            del consultas['vendas']
+        
+        if not self._token_valido() and not self.generate_token():
+            relatorio = {nome: 'falha: token não gerado' for nome in consultas}
+            return None, relatorio
+        
+        dados = {}
+        relatorio = {nome: 'cancelado' for nome in consultas}
+        falhou = False
+        
+        executor = ThreadPoolExecutor(max_workers=API_MAX_WORKERS, thread_name_prefix='api')
+        try:
+            futuros = {executor.submit(funcao): nome for nome, funcao in consultas.items()}
+            pendentes = set(futuros)
+            
+            while pendentes and not falhou:
+                concluidos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+                
+                for futuro in concluidos:
+                    nome = futuros[futuro]
+                    try:
+                        resultado = futuro.result()
+                    except Exception as e:
+                        resultado = None
+                        relatorio[nome] = f'falha: {str(e)}'
+                    
+                    if resultado is None:
+                        if relatorio[nome] == 'cancelado':
+                            relatorio[nome] = 'falha'
+                        falhou = True
+                    else:
+                        dados[nome] = resultado
+                        relatorio[nome] = f'ok ({len(resultado)} registros)'
+            
+            for futuro in pendentes:
+                futuro.cancel()
+        finally:
+            # Não aguarda consultas em andamento quando houve falha
+            executor.shutdown(wait=not falhou)
+        
+        for nome, status in relatorio.items():
+            nivel = logging.INFO if status.startswith('ok') else logging.ERROR
+            self.logger.log(nivel, f"Consulta {nome}: {status}")
+        
+        if falhou:
+            return None, relatorio
+        
+        return dados, relatorio
\ No newline at end of file
@@ -0,0 +1,162 @@
+"""
+Reprocessamento de vários dias de vendas em paralelo (backfill)
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from itertools import chain
+from api_client import ErroAPI
+from config import BACKFILL_MAX_WORKERS, VENDAS_PARTICIONADO, VENDAS_STREAMING, VENDAS_TAMANHO_PAGINA
+
+def interpretar_data(texto):
+    """
+    Converte data de linha de comando (DD/MM/YYYY ou YYYY-MM-DD) para date
+    
+    Args:
+        texto (str): Data informada
+        
+    Returns:
+        date: Data convertida
+    """
+    for formato in ("%d/%m/%Y", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(texto, formato).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Data inválida: {texto} (use DD/MM/YYYY ou YYYY-MM-DD)")
+
+def intervalo_datas(inicio, fim):
+    """
+    Lista as datas de um intervalo inclusivo
+    
+    Args:
+        inicio (date): Data inicial
+        fim (date): Data final
+        
+    Returns:
+        list: Datas do intervalo
+    """
+    return [inicio + timedelta(days=dias) for dias in range((fim - inicio).days + 1)]
+
+class Backfill:
+    """Consulta e agrega vários dias com um único token e um único snapshot de cadastros"""
+    
+    def __init__(self, api_client, data_processor, armazem=None, max_workers=None, processador_paralelo=None):
+        """
+        Args:
+            api_client (APIClient): Cliente da API
+            data_processor (DataProcessor): Processador de dados
+            armazem (ArmazemVendas): Histórico onde cada dia é gravado. Se None, não grava
+            max_workers (int): Dias consultados em paralelo. Se None, usa BACKFILL_MAX_WORKERS
+            processador_paralelo (ProcessadorParalelo): Decodifica e agrega os dias em um
+                pool de processos compartilhado. Se None, na thread de cada dia
+        """
+        self.api_client = api_client
+        self.data_processor = data_processor
+        self.armazem = armazem
+        self.max_workers = max_workers or BACKFILL_MAX_WORKERS
+        self.processador_paralelo = processador_paralelo
+        self.logger = logging.getLogger(__name__)
+    
+    def _processar_dia(self, data, vendedores, empresas_com_uf, indices):
+        """
+        Consulta, agrega e (opcionalmente) grava um dia
+        
+        Returns:
+            dict: Totais por UF e consultor do dia
+            
+        Raises:
+            ErroAPI: Se as vendas do dia não puderem ser consultadas
+        """
+        data_emissao = data.strftime("%d/%m/%Y")
+        manter_registros = self.armazem is not None
+        cd_empresas = [empresa['CDEMPRESA'] for empresa in empresas_com_uf]
+        
+        if self.processador_paralelo is not None:
+            # Uma resposta por empresa, decodificada e agregada no pool de processos
+            # compartilhado pelos dias (sem partições, cada dia ocuparia um só processo)
+            respostas = self.api_client.iter_vendas_particionado(cd_empresas, data_emissao, bruto=True)
+            agregados, registros = self.processador_paralelo.processar_respostas(
+                respostas, vendedores, empresas_com_uf, indices=indices, manter_registros=manter_registros
+            )
+        else:
+            agregados, registros = self.data_processor.processar_vendas(
+                self._vendas_do_dia(data_emissao, cd_empresas), vendedores, empresas_com_uf,
+                indices=indices, manter_registros=manter_registros
+            )
+        
+        if self.armazem is not None:
+            self.armazem.salvar_dia(data, registros)
+        
+        return agregados
+    
+    def _vendas_do_dia(self, data_emissao, cd_empresas):
+        """
+        Consulta as vendas de um dia conforme o modo configurado
+        
+        Returns:
+            iterable: Pedidos do dia
+            
+        Raises:
+            ErroAPI: Se as vendas do dia não puderem ser consultadas
+        """
+        if VENDAS_PARTICIONADO:
+            vendas = chain.from_iterable(self.api_client.iter_vendas_particionado(cd_empresas, data_emissao))
+        elif VENDAS_TAMANHO_PAGINA > 0:
+            vendas = chain.from_iterable(self.api_client.iter_vendas_paginas(data_emissao))
+        elif VENDAS_STREAMING:
+            vendas = self.api_client.iter_vendas(data_emissao)
+        else:
+            vendas = self.api_client.fetch_vendas(data_emissao)
+            if vendas is None:
+                raise ErroAPI(f"Falha ao consultar vendas de {data_emissao}")
+        return vendas
+    
+    def executar(self, inicio, fim, forcar_atualizacao=False):
+        """
+        Processa todos os dias do intervalo com paralelismo limitado
+        
+        Args:
+            inicio (date): Data inicial
+            fim (date): Data final (inclusiva)
+            forcar_atualizacao (bool): Ignora o cache de vendedores e empresas
+            
+        Returns:
+            tuple: (totais por data -> UF -> consultor, lista de datas com falha),
+                ou (None, None) se os cadastros não puderem ser obtidos
+        """
+        datas = intervalo_datas(inicio, fim)
+        self.logger.info(f"Backfill de {len(datas)} dias ({inicio} a {fim}) com até {self.max_workers} consultas em paralelo")
+        
+        # Um único token e um único snapshot de cadastros para todos os dias
+        dados, relatorio_consultas = self.api_client.fetch_dados_paralelo(
+            incluir_vendas=False, forcar_atualizacao=forcar_atualizacao
+        )
+        if dados is None:
+            self.logger.error(f"Falha ao consultar cadastros: {relatorio_consultas}")
+            return None, None
+        
+        vendedores = dados['vendedores']
+        empresas_com_uf = self.data_processor.add_uf_to_empresas(dados['empresas'])
+        indices = self.data_processor.criar_indices(vendedores, empresas_com_uf)
+        
+        resultados = {}
+        falhas = []
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='backfill') as executor:
+            futuros = {
+                executor.submit(self._processar_dia, data, vendedores, empresas_com_uf, indices): data
+                for data in datas
+            }
+            
+            for futuro in as_completed(futuros):
+                data = futuros[futuro]
+                try:
+                    resultados[data] = futuro.result()
+                except Exception as e:
+                    self.logger.error(f"Falha no backfill de {data.strftime('%d/%m/%Y')}: {str(e)}")
+                    falhas.append(data)
+        
+        self.logger.info(f"Backfill concluído: {len(resultados)} dias processados, {len(falhas)} com falha")
+        return dict(sorted(resultados.items())), sorted(falhas)
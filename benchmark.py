@@ -0,0 +1,202 @@
+"""
+Benchmark do processamento de vendas com dados sintéticos
+
+Mede tempo e pico de memória de cada etapa do DataProcessor e grava os
+resultados em JSON para comparação entre versões.
+
+Uso:
+    python benchmark.py --vendas 100000 500000
+    python benchmark.py --vendas 100000 --comparar benchmarks/base.json
+"""
+
+import argparse
+import copy
+import gc
+import json
+import logging
+import os
+import platform
+import statistics
+import time
+import tracemalloc
+from datetime import datetime
+
+# O benchmark não acessa as APIs; credenciais fictícias apenas satisfazem a validação do config
+for variavel in ("WHATSAPP_TOKEN", "API_AUTHORIZATION", "API_USERNAME", "API_PASSWORD"):
+    os.environ.setdefault(variavel, "benchmark")
+
+from data_processor import DataProcessor
+from synthetic_data import GeradorDadosSinteticos
+
+DIRETORIO_RESULTADOS = "benchmarks"
+
+def setup_logging():
+    """Configura sistema de logs"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+def medir(funcao, preparar, repeticoes):
+    """
+    Mede tempo (mediana e mínimo) e pico de memória de uma função
+    
+    Args:
+        funcao (callable): Recebe o resultado de preparar()
+        preparar (callable): Monta a entrada de cada repetição (fora da medição)
+        repeticoes (int): Número de execuções cronometradas
+        
+    Returns:
+        dict: tempo_mediano_s, tempo_minimo_s e pico_memoria_mb
+    """
+    # Aquecimento: imports tardios e caches não entram na medição
+    funcao(preparar())
+    
+    tempos = []
+    for _ in range(repeticoes):
+        entrada = preparar()
+        gc.collect()
+        inicio = time.perf_counter()
+        funcao(entrada)
+        tempos.append(time.perf_counter() - inicio)
+    
+    # Memória medida numa execução separada, pois o tracemalloc distorce o tempo
+    entrada = preparar()
+    gc.collect()
+    tracemalloc.start()
+    funcao(entrada)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    return {
+        'tempo_mediano_s': round(statistics.median(tempos), 6),
+        'tempo_minimo_s': round(min(tempos), 6),
+        'pico_memoria_mb': round(pico / 1024 / 1024, 3)
+    }
+
+def executar_cenario(quantidade, repeticoes, semente):
+    """
+    Executa todas as medições para um volume de pedidos
+    
+    Args:
+        quantidade (int): Número de pedidos sintéticos
+        repeticoes (int): Execuções cronometradas por etapa
+        semente (int): Semente do gerador
+        
+    Returns:
+        dict: Resultado por etapa
+    """
+    logger = logging.getLogger(__name__)
+    
+    vendas, vendedores, empresas = GeradorDadosSinteticos(semente=semente).gerar_dataset(quantidade)
+    
+    # Silencia os logs do processador durante as medições
+    logging.getLogger('data_processor').setLevel(logging.WARNING)
+    
+    processador = DataProcessor()
+    empresas_com_uf = processador.add_uf_to_empresas(copy.deepcopy(empresas))
+    vendas_relacionadas = processador.relacionar_dados(vendas, vendedores, empresas_com_uf)
+    vendas_por_uf = processador.agrupar_por_uf(vendas_relacionadas)
+    
+    etapas = {
+        'add_uf_to_empresas': (
+            lambda entrada: DataProcessor().add_uf_to_empresas(entrada),
+            lambda: copy.deepcopy(empresas)
+        ),
+        'relacionar_dados': (
+            lambda entrada: DataProcessor().relacionar_dados(vendas, vendedores, entrada),
+            lambda: empresas_com_uf
+        ),
+        'agrupar_por_uf': (
+            lambda entrada: processador.agrupar_por_uf(entrada),
+            lambda: vendas_relacionadas
+        ),
+        'gerar_relatorio_uf': (
+            lambda entrada: [processador.gerar_relatorio_uf(v) for uf, v in entrada.items() if uf != 'DESCONHECIDO'],
+            lambda: vendas_por_uf
+        ),
+        'processar_vendas': (
+            lambda entrada: processador.formatar_relatorios_por_uf(
+                DataProcessor().processar_vendas(vendas, vendedores, entrada)[0]
+            ),
+            lambda: empresas_com_uf
+        )
+    }
+    
+    resultados = {}
+    for nome, (funcao, preparar) in etapas.items():
+        resultados[nome] = medir(funcao, preparar, repeticoes)
+        logger.info(
+            f"{quantidade:>9} vendas | {nome:<24} | "
+            f"{resultados[nome]['tempo_mediano_s'] * 1000:>10.1f} ms | "
+            f"{resultados[nome]['pico_memoria_mb']:>9.1f} MB"
+        )
+    
+    logging.getLogger('data_processor').setLevel(logging.NOTSET)
+    return resultados
+
+def comparar(atual, base):
+    """
+    Registra a variação de tempo e memória em relação a um resultado anterior
+    
+    Args:
+        atual (dict): Resultado desta execução
+        base (dict): Resultado carregado do arquivo de comparação
+    """
+    logger = logging.getLogger(__name__)
+    logger.info(f"Comparação com {base.get('data_execucao')}:")
+    
+    for quantidade, etapas in atual['cenarios'].items():
+        etapas_base = base.get('cenarios', {}).get(quantidade, {})
+        for nome, medidas in etapas.items():
+            anterior = etapas_base.get(nome)
+            if not anterior:
+                continue
+            variacao_tempo = (medidas['tempo_mediano_s'] / anterior['tempo_mediano_s'] - 1) * 100 if anterior['tempo_mediano_s'] else 0
+            variacao_memoria = (medidas['pico_memoria_mb'] / anterior['pico_memoria_mb'] - 1) * 100 if anterior['pico_memoria_mb'] else 0
+            logger.info(f"{quantidade:>9} vendas | {nome:<24} | tempo {variacao_tempo:+7.1f}% | memória {variacao_memoria:+7.1f}%")
+
+def main():
+    """Função principal do benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark do processamento de vendas")
+    parser.add_argument('--vendas', type=int, nargs='+', default=[10000, 100000],
+                        help="Volumes de pedidos a medir (padrão: 10000 100000)")
+    parser.add_argument('--repeticoes', type=int, default=3, help="Execuções cronometradas por etapa")
+    parser.add_argument('--semente', type=int, default=42, help="Semente do gerador de dados")
+    parser.add_argument('--saida', help="Arquivo JSON de resultado (padrão: benchmarks/benchmark_<data>.json)")
+    parser.add_argument('--comparar', metavar='ARQUIVO', help="Resultado anterior para comparação")
+    args = parser.parse_args()
+    
+    setup_logging()
+    logger = logging.getLogger(__name__)
+    
+    logger.info("=" * 60)
+    logger.info("BENCHMARK DO PROCESSAMENTO DE VENDAS")
+    logger.info("=" * 60)
+    
+    resultado = {
+        'data_execucao': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'repeticoes': args.repeticoes,
+        'semente': args.semente,
+        'cenarios': {}
+    }
+    
+    for quantidade in args.vendas:
+        resultado['cenarios'][str(quantidade)] = executar_cenario(quantidade, args.repeticoes, args.semente)
+    
+    saida = args.saida or os.path.join(
+        DIRETORIO_RESULTADOS, f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(saida) or '.', exist_ok=True)
+    with open(saida, 'w', encoding='utf-8') as f:
+        json.dump(resultado, f, indent=2, ensure_ascii=False)
+    logger.info(f"Resultado gravado em {saida}")
+    
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as f:
+            comparar(resultado, json.load(f))
+
+if __name__ == "__main__":
+    main()
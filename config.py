@@ -30,7 +30,112 @@ missing_vars = [var for var in required_vars if not os.getenv(var)]
 if missing_vars:
     raise ValueError(f"Variáveis de ambiente obrigatórias não encontradas: {', '.join(missing_vars)}")
 
-# Mapeamento de empresas para UF
+# Envio WhatsApp concorrente (taxa em mensagens por segundo, 0 = sem limite)
+WHATSAPP_MAX_EM_VOO = int(os.getenv("WHATSAPP_MAX_EM_VOO", "5"))
+WHATSAPP_TAXA_ENVIO = float(os.getenv("WHATSAPP_TAXA_ENVIO", "1"))
+WHATSAPP_RAJADA = int(os.getenv("WHATSAPP_RAJADA", "5"))
+
+# Caixa de saída do WhatsApp (entrega idempotente com retentativas), tempos em segundos
+OUTBOX_ATIVO = os.getenv("OUTBOX_ATIVO", "true").lower() == "true"
+OUTBOX_PATH = os.getenv("OUTBOX_PATH", "outbox.db")
+OUTBOX_MAX_TENTATIVAS = int(os.getenv("OUTBOX_MAX_TENTATIVAS", "5"))
+OUTBOX_BACKOFF_BASE = float(os.getenv("OUTBOX_BACKOFF_BASE", "30"))
+OUTBOX_BACKOFF_MAX = float(os.getenv("OUTBOX_BACKOFF_MAX", "1800"))
+OUTBOX_VALIDADE = float(os.getenv("OUTBOX_VALIDADE", "43200"))
+# Tempo máximo de retentativas de um envio dentro da mesma execução
+OUTBOX_ESPERA_MAXIMA = float(os.getenv("OUTBOX_ESPERA_MAXIMA", "300"))
+
+# Consultas concorrentes à API
+API_MAX_WORKERS = int(os.getenv("API_MAX_WORKERS", "3"))
+
+# Transporte HTTP (pool de conexões e retentativas)
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+HTTP_BACKOFF_FACTOR = float(os.getenv("HTTP_BACKOFF_FACTOR", "0.5"))
+HTTP_BACKOFF_MAX = float(os.getenv("HTTP_BACKOFF_MAX", "30"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "60"))
+
+# Backend JSON das APIs e do WhatsApp ("auto", "json", "orjson" ou "ujson"; "auto" = o mais rápido instalado)
+JSON_BACKEND = os.getenv("JSON_BACKEND", "auto").lower()
+
+# Backfill (python main.py --from ... --to ...): dias consultados em paralelo
+BACKFILL_MAX_WORKERS = int(os.getenv("BACKFILL_MAX_WORKERS", "4"))
+
+# Paginação da consulta de vendas (0 = consulta única)
+VENDAS_TAMANHO_PAGINA = int(os.getenv("VENDAS_TAMANHO_PAGINA", "0"))
+
+# Consulta de vendas particionada por empresa (filtro CDEMPRESA), com retentativa por partição
+VENDAS_PARTICIONADO = os.getenv("VENDAS_PARTICIONADO", "false").lower() == "true"
+VENDAS_PARTICAO_WORKERS = int(os.getenv("VENDAS_PARTICAO_WORKERS", "4"))
+VENDAS_PARTICAO_TENTATIVAS = int(os.getenv("VENDAS_PARTICAO_TENTATIVAS", "3"))
+
+# Decodifica a resposta de vendas à medida que chega, sem carregar o corpo inteiro (bytes por leitura)
+VENDAS_STREAMING = os.getenv("VENDAS_STREAMING", "false").lower() == "true"
+VENDAS_STREAMING_BLOCO = int(os.getenv("VENDAS_STREAMING_BLOCO", "65536"))
+
+# Decodificação e agregação das respostas de vendas em processos paralelos (0 workers = todos os núcleos).
+# A consulta é sempre particionada por empresa, uma resposta por processo.
+# Respostas menores que PROCESSAMENTO_PARALELO_MINIMO_KB são processadas no processo principal
+PROCESSAMENTO_PARALELO = os.getenv("PROCESSAMENTO_PARALELO", "false").lower() == "true"
+PROCESSAMENTO_PARALELO_WORKERS = int(os.getenv("PROCESSAMENTO_PARALELO_WORKERS", "0"))
+PROCESSAMENTO_PARALELO_MINIMO_KB = int(os.getenv("PROCESSAMENTO_PARALELO_MINIMO_KB", "1024"))
+
+# Snapshots das respostas da API (JSON lines comprimido, um arquivo por execução) para o modo --replay
+SNAPSHOT_GRAVAR = os.getenv("SNAPSHOT_GRAVAR", "false").lower() == "true"
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "snapshots")
+
+# Modo incremental (campos que identificam um pedido)
+INCREMENTAL_STATE_PATH = os.getenv("INCREMENTAL_STATE_PATH", "estado_incremental.json")
+PEDIDO_CHAVE = [campo.strip() for campo in os.getenv("PEDIDO_CHAVE", "CDEMPRESA,NUPEDIDO").split(",") if campo.strip()]
+
+# Cache dos dados mestres (vendedores e empresas), TTL em segundos
+MASTER_CACHE_DIR = os.getenv("MASTER_CACHE_DIR", "cache")
+MASTER_CACHE_TTL = int(os.getenv("MASTER_CACHE_TTL", "21600"))
+
+# Histórico local de vendas (SQLite)
+ARMAZENAR_VENDAS = os.getenv("ARMAZENAR_VENDAS", "true").lower() == "true"
+VENDAS_DB_PATH = os.getenv("VENDAS_DB_PATH", "vendas.db")
+
+# Acumulados anexados ao relatório diário ("semana", "mes"), a partir do histórico local
+RELATORIOS_PERIODO = [periodo.strip() for periodo in os.getenv("RELATORIOS_PERIODO", "").split(",") if periodo.strip()]
+
+# Cache do token OAuth
+TOKEN_CACHE_PATH = os.getenv("TOKEN_CACHE_PATH", ".token_cache.json")
+TOKEN_MARGEM_RENOVACAO = int(os.getenv("TOKEN_MARGEM_RENOVACAO", "300"))
+TOKEN_VALIDADE_PADRAO = int(os.getenv("TOKEN_VALIDADE_PADRAO", "3600"))
+
+# Modo daemon (python main.py --daemon): agenda cron padrão das UFs sem "agenda" em config.json
+DAEMON_AGENDA = os.getenv("DAEMON_AGENDA", "0 18 * * *")
+
+# Logs: rotação por tamanho (LOG_TAMANHO_MAX_MB) ou diária, e arquivo opcional em JSON lines
+LOG_PATH = os.getenv("LOG_PATH", "resumo_vendas.log")
+LOG_NIVEL = os.getenv("LOG_NIVEL", "INFO")
+LOG_ROTACAO = os.getenv("LOG_ROTACAO", "tamanho").lower()
+LOG_TAMANHO_MAX_MB = float(os.getenv("LOG_TAMANHO_MAX_MB", "10"))
+LOG_BACKUPS = int(os.getenv("LOG_BACKUPS", "7"))
+LOG_JSON = os.getenv("LOG_JSON", "false").lower() == "true"
+
+# Métricas de execução (relatório JSON por execução e arquivo do Prometheus textfile collector)
+METRICAS_ATIVAS = os.getenv("METRICAS_ATIVAS", "true").lower() == "true"
+METRICAS_DIR = os.getenv("METRICAS_DIR", "metricas")
+METRICAS_PROMETHEUS_PATH = os.getenv("METRICAS_PROMETHEUS_PATH", "")
+# Relatórios JSON mantidos em METRICAS_DIR; os mais antigos são removidos (0 = sem limite)
+METRICAS_MAX_ARQUIVOS = int(os.getenv("METRICAS_MAX_ARQUIVOS", "100"))
+
+# Servidor simulado das APIs (python main.py --mock / python mock_server.py)
+MOCK_VENDAS = int(os.getenv("MOCK_VENDAS", "5000"))
+MOCK_LATENCIA_MS = float(os.getenv("MOCK_LATENCIA_MS", "50"))
+MOCK_JITTER_MS = float(os.getenv("MOCK_JITTER_MS", "20"))
+MOCK_TAXA_ERRO = float(os.getenv("MOCK_TAXA_ERRO", "0"))
+MOCK_LIMITE_REQ_S = float(os.getenv("MOCK_LIMITE_REQ_S", "0"))
+MOCK_COMPRESSAO = os.getenv("MOCK_COMPRESSAO", "true").lower() == "true"
+
+# Arquivos recarregados sem reiniciar o processo (verificação do mtime a cada N segundos)
+CONFIG_PATH = os.getenv("CONFIG_PATH", "config.json")
+UF_MAPPING_PATH = os.getenv("UF_MAPPING_PATH", "uf_mapping.json")
+CONFIG_VERIFICACAO_SEGUNDOS = float(os.getenv("CONFIG_VERIFICACAO_SEGUNDOS", "5"))
+
+# Mapeamento de empresas para UF (usado quando UF_MAPPING_PATH não existe)
 UF_MAPPING = {
     'LSO': 'CE',
     'LFO': 'CE', 
@@ -3,13 +3,119 @@ Processador de dados de vendas
 """
 
 import logging
-from config import UF_MAPPING
+from metrics import coletor
+from records import Empresa, Pedido, Vendedor, VendaRelacionada, converter_numero, converter_volume
+from runtime_config import mapeamento_uf
+
+def formatar_decimal(valor):
+    """
+    Formata número no padrão brasileiro (1.234,56)
+    
+    Args:
+        valor (float): Valor numérico
+        
+    Returns:
+        str: Valor formatado
+    """
+    return f"{valor:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+
+def formatar_moeda(valor):
+    """
+    Formata valor monetário no padrão brasileiro (R$ 1.234,56)
+    
+    Args:
+        valor (float): Valor numérico
+        
+    Returns:
+        str: Valor formatado
+    """
+    return f"R$ {formatar_decimal(valor)}"
+
+def relacionar_pedido(venda, indices):
+    """
+    Relaciona um pedido ao vendedor e à empresa e converte valor e volume
+    
+    Concentra as regras aplicadas a cada pedido em todos os modos de
+    processamento: pedidos sem vendedor ou empresa válidos são descartados,
+    a UF vem da empresa e o consultor é o nome do vendedor.
+    
+    Args:
+        venda (Pedido|dict): Pedido retornado pela API
+        indices (tuple): Índices de DataProcessor.criar_indices()
+        
+    Returns:
+        tuple: (Vendedor, Empresa, valor, volume) ou None se o pedido não tiver
+            vendedor ou empresa válidos
+    """
+    vendedores_dict, empresas_dict = indices
+    
+    # Pedidos da API já vêm com valores convertidos; dicts são lidos campo a campo
+    if type(venda) is Pedido:
+        vendedor = vendedores_dict.get(venda.cdrepresentante)
+        empresa = empresas_dict.get(venda.cdempresa)
+        if vendedor is None or empresa is None:
+            return None
+        return vendedor, empresa, venda.valor, venda.volume
+    
+    vendedor = vendedores_dict.get(venda.get('CDREPRESENTANTE'))
+    empresa = empresas_dict.get(venda.get('CDEMPRESA'))
+    if vendedor is None or empresa is None:
+        return None
+    return (vendedor, empresa, converter_numero(venda.get('VLTOTALPEDIDO', '0')),
+            converter_volume(venda.get('VLVOLUMEPEDIDO', '0')))
+
+def acumular_pedido(totais, venda, indices):
+    """
+    Soma um pedido aos totais da sua UF e consultor
+    
+    Args:
+        totais (dict): (UF, consultor) -> [total, volume_total, quantidade], alterado no lugar
+        venda (Pedido|dict): Pedido retornado pela API
+        indices (tuple): Índices de DataProcessor.criar_indices()
+        
+    Returns:
+        tuple: Resultado de relacionar_pedido() ou None se o pedido não foi somado
+    """
+    relacionado = relacionar_pedido(venda, indices)
+    if relacionado is None:
+        return None
+    
+    vendedor, empresa, valor, volume = relacionado
+    chave = (empresa.uf, vendedor.nome)
+    acumulador = totais.get(chave)
+    if acumulador is None:
+        acumulador = totais[chave] = [0.0, 0.0, 0]
+    acumulador[0] += valor
+    acumulador[1] += volume
+    acumulador[2] += 1
+    return relacionado
+
+def agrupar_totais(totais):
+    """
+    Converte os totais de acumular_pedido() para o formato dos relatórios
+    
+    Args:
+        totais (dict): (UF, consultor) -> [total, volume_total, quantidade]
+        
+    Returns:
+        dict: UF -> consultor -> {'total', 'volume_total', 'quantidade'}
+    """
+    agregados = {}
+    for (uf, consultor), (total, volume_total, quantidade) in totais.items():
+        agregados.setdefault(uf, {})[consultor] = {
+            'total': total,
+            'volume_total': volume_total,
+            'quantidade': quantidade
+        }
+    return agregados
 
 class DataProcessor:
     """Processador para manipulação e formatação dos dados"""
     
     def __init__(self):
         self.logger = logging.getLogger(__name__)
+        # (vendedores, empresas, UFs das empresas, indices) da última chamada a criar_indices
+        self._ultimos_indices = None
     
     def add_uf_to_empresas(self, empresas):
         """
@@ -22,18 +128,75 @@ class DataProcessor:
             list: Lista de empresas com UF adicionada
         """
         try:
+            mapeamento = mapeamento_uf()
             for empresa in empresas:
                 sigla = empresa.get('NMEMPRESACURTO', '')
-                empresa['UF'] = UF_MAPPING.get(sigla, 'DESCONHECIDO')
+                empresa['UF'] = mapeamento.get(sigla, 'DESCONHECIDO')
             
             self.logger.info(f"UF adicionada a {len(empresas)} empresas")
+            coletor.registrar_linhas('add_uf_to_empresas', len(empresas), len(empresas))
             return empresas
             
         except Exception as e:
             self.logger.error(f"Erro ao adicionar UF às empresas: {str(e)}")
             return empresas
     
-    def relacionar_dados(self, vendas, vendedores, empresas):
+    def criar_indices(self, vendedores, empresas):
+        """
+        Cria dicionários de lookup de vendedores e empresas
+        
+        Os cadastros são convertidos em registros compactos (Vendedor e
+        Empresa). Os índices são reaproveitados enquanto as mesmas listas
+        forem informadas, como acontece com o cache de dados mestres, e a UF
+        das empresas não mudar.
+        
+        Args:
+            vendedores (list): Lista de vendedores
+            empresas (list): Lista de empresas com UF
+            
+        Returns:
+            tuple: (Vendedor por CDREPRESENTANTE, Empresa por CDEMPRESA)
+        """
+        ufs = tuple(e.get('UF') for e in empresas)
+        ultimos = self._ultimos_indices
+        if ultimos and ultimos[0] is vendedores and ultimos[1] is empresas and ultimos[2] == ufs:
+            return ultimos[3]
+        
+        vendedores_dict = {v['CDREPRESENTANTE']: Vendedor.de_api(v) for v in vendedores}
+        empresas_dict = {e['CDEMPRESA']: Empresa.de_api(e) for e in empresas}
+        self._ultimos_indices = (vendedores, empresas, ufs, (vendedores_dict, empresas_dict))
+        return vendedores_dict, empresas_dict
+    
+    def criar_registro(self, venda, relacionado):
+        """
+        Cria o registro de venda relacionada
+        
+        Args:
+            venda (Pedido|dict): Pedido retornado pela API
+            relacionado (tuple): Resultado de relacionar_pedido() para o pedido
+            
+        Returns:
+            VendaRelacionada: Venda relacionada, com valor e volume numéricos
+        """
+        vendedor, empresa, valor, volume = relacionado
+        if type(venda) is Pedido:
+            return VendaRelacionada(
+                empresa.sigla, vendedor.nome, valor, volume, venda.dtemissao or '',
+                empresa.uf, venda.cdempresa, venda.cdrepresentante
+            )
+        
+        return VendaRelacionada(
+            empresa.sigla,
+            vendedor.nome,
+            valor,
+            volume,
+            venda.get('DTEMISSAO', ''),
+            empresa.uf,
+            venda.get('CDEMPRESA'),
+            venda.get('CDREPRESENTANTE')
+        )
+    
+    def relacionar_dados(self, vendas, vendedores, empresas, indices=None):
         """
         Relaciona dados de vendas com vendedores e empresas
         
@@ -41,52 +204,71 @@ class DataProcessor:
             vendas (list): Lista de vendas
             vendedores (list): Lista de vendedores
             empresas (list): Lista de empresas
+            indices (tuple): Índices de criar_indices(), para reaproveitar
+                entre páginas de vendas. Se None, são criados aqui
             
         Returns:
             list: Lista de vendas relacionadas
         """
         try:
             # Criar dicionários para lookup rápido
-            vendedores_dict = {v['CDREPRESENTANTE']: v for v in vendedores}
-            empresas_dict = {e['CDEMPRESA']: e for e in empresas}
+            indices = indices or self.criar_indices(vendedores, empresas)
             
             vendas_relacionadas = []
             
             for venda in vendas:
-                cd_representante = venda.get('CDREPRESENTANTE')
-                cd_empresa = venda.get('CDEMPRESA')
-                
-                # Buscar dados do vendedor
-                vendedor = vendedores_dict.get(cd_representante)
-                if not vendedor:
-                    continue  # Pula vendas sem vendedor válido
-                
-                # Buscar dados da empresa
-                empresa = empresas_dict.get(cd_empresa)
-                if not empresa:
-                    continue  # Pula vendas sem empresa válida
-                
-                # Criar registro relacionado
-                venda_relacionada = {
-                    'Base': empresa.get('NMEMPRESACURTO', ''),
-                    'Consultor': vendedor.get('NMREPRESENTANTE', ''),
-                    'Valor': venda.get('VLTOTALPEDIDO', '0'),
-                    'Volume': venda.get('VLVOLUMEPEDIDO', '0'),
-                    'DataEmissao': venda.get('DTEMISSAO', ''),
-                    'UF': empresa.get('UF', 'DESCONHECIDO'),
-                    'CDEMPRESA': cd_empresa,
-                    'CDREPRESENTANTE': cd_representante
-                }
-                
-                vendas_relacionadas.append(venda_relacionada)
+                # Pula vendas sem vendedor ou empresa válidos
+                relacionado = relacionar_pedido(venda, indices)
+                if relacionado is not None:
+                    vendas_relacionadas.append(self.criar_registro(venda, relacionado))
             
             self.logger.info(f"Relacionadas {len(vendas_relacionadas)} vendas válidas de {len(vendas)} totais")
+            coletor.registrar_linhas('relacionar_dados', len(vendas), len(vendas_relacionadas))
             return vendas_relacionadas
             
         except Exception as e:
             self.logger.error(f"Erro ao relacionar dados: {str(e)}")
             return []
     
+    def processar_vendas(self, vendas, vendedores, empresas, indices=None, manter_registros=False):
+        """
+        Relaciona e agrega vendas em uma única passada
+        
+        Cada pedido é lido uma vez e somado diretamente aos totais da sua UF e
+        consultor, sem criar registros intermediários. Aceita qualquer
+        iterável, inclusive um gerador sobre as páginas da API.
+        
+        Args:
+            vendas (iterable): Pedidos retornados pela API (Pedido ou dict)
+            vendedores (list): Lista de vendedores
+            empresas (list): Lista de empresas com UF
+            indices (tuple): Índices de criar_indices(). Se None, são criados aqui
+            manter_registros (bool): Também retorna as vendas relacionadas
+            
+        Returns:
+            tuple: (totais UF -> consultor -> {'total', 'volume_total', 'quantidade'},
+                lista de vendas relacionadas ou None)
+        """
+        indices = indices or self.criar_indices(vendedores, empresas)
+        
+        # (UF, consultor) -> [total, volume_total, quantidade]
+        totais = {}
+        registros = [] if manter_registros else None
+        lidas = 0
+        
+        for venda in vendas:
+            lidas += 1
+            relacionado = acumular_pedido(totais, venda, indices)
+            if relacionado is not None and registros is not None:
+                registros.append(self.criar_registro(venda, relacionado))
+        
+        agregados = agrupar_totais(totais)
+        relacionadas = sum(quantidade for _, _, quantidade in totais.values())
+        
+        self.logger.info(f"Relacionadas {relacionadas} vendas válidas de {lidas} totais")
+        coletor.registrar_linhas('processar_vendas', lidas, relacionadas)
+        return agregados, registros
+    
     def agrupar_por_uf(self, vendas_relacionadas):
         """
         Agrupa vendas por UF
@@ -109,6 +291,7 @@ class DataProcessor:
                 vendas_por_uf[uf].append(venda)
             
             self.logger.info(f"Vendas agrupadas em {len(vendas_por_uf)} UFs")
+            coletor.registrar_linhas('agrupar_por_uf', len(vendas_relacionadas), len(vendas_por_uf))
             return vendas_por_uf
             
         except Exception as e:
@@ -133,62 +316,47 @@ class DataProcessor:
         except:
             return nome_completo
     
-    def gerar_relatorio_uf(self, vendas_uf):
+    def agregar_por_consultor(self, vendas_uf):
         """
-        Gera relatório formatado para uma UF
+        Agrega vendas por consultor
         
         Args:
-            vendas_uf (list): Lista de vendas de uma UF
+            vendas_uf (list): Lista de vendas relacionadas
+            
+        Returns:
+            dict: Totais por consultor ({'total', 'volume_total', 'quantidade'})
+        """
+        vendas_por_consultor = {}
+        
+        for venda in vendas_uf:
+            consultor = venda.get('Consultor', 'Não informado')
+            valor_numerico = converter_numero(venda.get('Valor', 0))
+            volume_numerico = converter_volume(venda.get('Volume', 0))
+            
+            if consultor not in vendas_por_consultor:
+                vendas_por_consultor[consultor] = {'total': 0, 'volume_total': 0, 'quantidade': 0}
+            
+            vendas_por_consultor[consultor]['total'] += valor_numerico
+            vendas_por_consultor[consultor]['volume_total'] += volume_numerico
+            vendas_por_consultor[consultor]['quantidade'] += 1
+        
+        return vendas_por_consultor
+    
+    def formatar_relatorio(self, vendas_por_consultor, titulo="📊 *RELATÓRIO DE VENDAS*"):
+        """
+        Formata relatório a partir dos totais por consultor
+        
+        Args:
+            vendas_por_consultor (dict): Totais por consultor, como em agregar_por_consultor()
+            titulo (str): Primeira linha do relatório
             
         Returns:
             str: Relatório formatado
         """
         try:
-            if not vendas_uf:
+            if not vendas_por_consultor:
                 return "Nenhuma venda encontrada hoje."
             
-            # Agregar vendas por consultor
-            vendas_por_consultor = {}
-            
-            for venda in vendas_uf:
-                consultor = venda.get('Consultor', 'Não informado')
-                valor_raw = venda.get('Valor', 0)
-                volume_raw = venda.get('Volume', 0)
-                
-                # Converter valor corretamente
-                try:
-                    # Se já é número, usar diretamente
-                    if isinstance(valor_raw, (int, float)):
-                        valor_numerico = float(valor_raw)
-                    else:
-                        # Se é string, limpar apenas caracteres de moeda
-                        valor_string = str(valor_raw)
-                        valor_limpo = valor_string.replace('R$', '').replace(' ', '').strip()
-                        # Não remover pontos decimais - apenas converter
-                        valor_numerico = float(valor_limpo)
-                except:
-                    valor_numerico = 0.0
-                
-                # Converter volume corretamente
-                try:
-                    # Se já é número, usar diretamente
-                    if isinstance(volume_raw, (int, float)):
-                        volume_numerico = float(volume_raw)
-                    else:
-                        # Se é string, converter para float
-                        volume_string = str(volume_raw)
-                        volume_limpo = volume_string.replace(' ', '').strip()
-                        volume_numerico = float(volume_limpo)
-                except:
-                    volume_numerico = 0.0
-                
-                if consultor not in vendas_por_consultor:
-                    vendas_por_consultor[consultor] = {'total': 0, 'volume_total': 0, 'quantidade': 0}
-                
-                vendas_por_consultor[consultor]['total'] += valor_numerico
-                vendas_por_consultor[consultor]['volume_total'] += volume_numerico
-                vendas_por_consultor[consultor]['quantidade'] += 1
-            
             # Ordenar por maior valor
             consultores_ordenados = sorted(
                 vendas_por_consultor.items(),
@@ -197,7 +365,7 @@ class DataProcessor:
             )
             
             # Montar relatório
-            relatorio = "📊 *RELATÓRIO DE VENDAS*\n\n"
+            relatorio = f"{titulo}\n\n"
             
             total_geral = 0
             total_volume = 0
@@ -205,8 +373,8 @@ class DataProcessor:
             
             for consultor, dados in consultores_ordenados:
                 nome_abreviado = self.abreviar_nome(consultor)
-                valor_formatado = f"R$ {dados['total']:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
-                volume_formatado = f"{dados['volume_total']:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+                valor_formatado = formatar_moeda(dados['total'])
+                volume_formatado = formatar_decimal(dados['volume_total'])
                 
                 relatorio += f"👤 *{nome_abreviado}*\n"
                 relatorio += f"   📦 Pedidos: {dados['quantidade']}\n"
@@ -218,8 +386,8 @@ class DataProcessor:
                 total_pedidos += dados['quantidade']
             
             # Totais gerais
-            total_formatado = f"R$ {total_geral:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
-            volume_total_formatado = f"{total_volume:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+            total_formatado = formatar_moeda(total_geral)
+            volume_total_formatado = formatar_decimal(total_volume)
             relatorio += "=" * 30 + "\n"
             relatorio += f"🎯 *TOTAL GERAL*\n"
             relatorio += f"📦 Total de Pedidos: {total_pedidos}\n"
@@ -228,6 +396,70 @@ class DataProcessor:
             
             return relatorio
             
+        except Exception as e:
+            self.logger.error(f"Erro ao gerar relatório: {str(e)}")
+            return "Erro ao gerar relatório de vendas."
+    
+    def somar_agregados(self, *agregados):
+        """
+        Soma totais por UF e consultor de vários períodos
+        
+        Args:
+            *agregados (dict): UF -> consultor -> totais
+            
+        Returns:
+            dict: Totais somados, no mesmo formato
+        """
+        resultado = {}
+        
+        for parcial in agregados:
+            for uf, consultores in parcial.items():
+                consultores_uf = resultado.setdefault(uf, {})
+                for consultor, dados in consultores.items():
+                    soma = consultores_uf.setdefault(consultor, {'total': 0, 'volume_total': 0, 'quantidade': 0})
+                    soma['total'] += dados['total']
+                    soma['volume_total'] += dados['volume_total']
+                    soma['quantidade'] += dados['quantidade']
+        
+        return resultado
+    
+    def formatar_relatorios_por_uf(self, agregados):
+        """
+        Formata os relatórios de todas as UFs a partir dos totais
+        
+        Args:
+            agregados (dict): UF -> consultor -> totais
+            
+        Returns:
+            dict: Relatório formatado por UF (exceto DESCONHECIDO)
+        """
+        relatorios_por_uf = {}
+        for uf, vendas_por_consultor in agregados.items():
+            if uf == 'DESCONHECIDO':
+                continue
+            relatorios_por_uf[uf] = self.formatar_relatorio(vendas_por_consultor)
+            quantidade = sum(dados['quantidade'] for dados in vendas_por_consultor.values())
+            self.logger.info("Relatório gerado para %s: %d vendas", uf, quantidade)
+        
+        coletor.registrar_linhas('formatar_relatorios_por_uf', len(agregados), len(relatorios_por_uf))
+        return relatorios_por_uf
+    
+    def gerar_relatorio_uf(self, vendas_uf):
+        """
+        Gera relatório formatado para uma UF
+        
+        Args:
+            vendas_uf (list): Lista de vendas de uma UF
+            
+        Returns:
+            str: Relatório formatado
+        """
+        try:
+            if not vendas_uf:
+                return "Nenhuma venda encontrada hoje."
+            
+            return self.formatar_relatorio(self.agregar_por_consultor(vendas_uf))
+            
         except Exception as e:
             self.logger.error(f"Erro ao gerar relatório: {str(e)}")
             return "Erro ao gerar relatório de vendas."
\ No newline at end of file
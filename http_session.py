@@ -0,0 +1,88 @@
+"""
+Camada de transporte HTTP compartilhada pelos clientes das APIs
+"""
+
+import random
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from config import HTTP_POOL_SIZE, HTTP_MAX_RETRIES, HTTP_BACKOFF_FACTOR, HTTP_BACKOFF_MAX, HTTP_TIMEOUT
+from metrics import coletor
+
+# Status considerados falhas transitórias
+STATUS_RETENTAVEIS = (429, 500, 502, 503, 504)
+
+# Métodos que podem ser repetidos sem efeitos colaterais
+METODOS_IDEMPOTENTES = frozenset(['GET', 'HEAD', 'OPTIONS'])
+
+class RetryComJitter(Retry):
+    """Política de retentativa com backoff exponencial e jitter aleatório"""
+    
+    def get_backoff_time(self):
+        """
+        Calcula o tempo de espera antes da próxima tentativa
+        
+        Returns:
+            float: Tempo em segundos, sorteado entre 0 e o backoff exponencial
+        """
+        backoff = min(super().get_backoff_time(), HTTP_BACKOFF_MAX)
+        if backoff <= 0:
+            return 0
+        return random.uniform(0, backoff)
+
+class SessaoHTTP(requests.Session):
+    """Sessão requests com timeout padrão em todas as requisições"""
+    
+    def __init__(self, timeout=None):
+        super().__init__()
+        self.timeout = timeout if timeout is not None else HTTP_TIMEOUT
+    
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return super().request(method, url, **kwargs)
+
+def criar_sessao(retentar_post=False, pool_size=None, max_retries=None, backoff_factor=None, timeout=None):
+    """
+    Cria sessão HTTP com keep-alive, pool de conexões e retentativas
+    
+    Falhas de conexão são sempre repetidas, pois a requisição não chegou ao
+    servidor. Erros de leitura e status transitórios só são repetidos para
+    métodos idempotentes. O header Retry-After é respeitado em 429/503.
+    Latência, status e tamanho de cada resposta vão para o coletor de métricas.
+    
+    Args:
+        retentar_post (bool): Trata POST como idempotente (consultas somente leitura)
+        pool_size (int): Conexões mantidas por host. Se None, usa HTTP_POOL_SIZE
+        max_retries (int): Número máximo de retentativas. Se None, usa HTTP_MAX_RETRIES
+        backoff_factor (float): Fator do backoff exponencial. Se None, usa HTTP_BACKOFF_FACTOR
+        timeout (float): Timeout padrão em segundos. Se None, usa HTTP_TIMEOUT
+        
+    Returns:
+        SessaoHTTP: Sessão configurada
+    """
+    pool_size = pool_size or HTTP_POOL_SIZE
+    max_retries = HTTP_MAX_RETRIES if max_retries is None else max_retries
+    backoff_factor = HTTP_BACKOFF_FACTOR if backoff_factor is None else backoff_factor
+    
+    metodos = METODOS_IDEMPOTENTES | {'POST'} if retentar_post else METODOS_IDEMPOTENTES
+    
+    retry = RetryComJitter(
+        total=max_retries,
+        connect=max_retries,
+        read=max_retries,
+        status=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=STATUS_RETENTAVEIS,
+        allowed_methods=metodos,
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    
+    sessao = SessaoHTTP(timeout=timeout)
+    sessao.mount('http://', adapter)
+    sessao.mount('https://', adapter)
+    sessao.hooks['response'].append(coletor.gancho_resposta)
+    
+    return sessao
@@ -0,0 +1,207 @@
+"""
+Estado do modo incremental: pedidos já processados e totais acumulados do dia
+"""
+
+import json
+import logging
+import os
+from config import INCREMENTAL_STATE_PATH, PEDIDO_CHAVE
+from data_processor import relacionar_pedido
+from records import VendaRelacionada
+
+# Campos da contribuição de cada pedido guardada no estado
+CAMPOS_CONTRIBUICAO = ('FLCONTROLEERP', 'UF', 'Consultor', 'Valor', 'Volume', 'Base', 'CDEMPRESA', 'CDREPRESENTANTE')
+
+class ChavePedidoAusente(Exception):
+    """Pedido sem algum dos campos de PEDIDO_CHAVE"""
+
+class EstadoIncremental:
+    """Mantém pedidos vistos e totais por UF/consultor entre execuções do dia"""
+    
+    def __init__(self, caminho=None):
+        self.caminho = caminho or INCREMENTAL_STATE_PATH
+        self.logger = logging.getLogger(__name__)
+        self.data_emissao = None
+        # chave do pedido -> [FLCONTROLEERP, UF, Consultor, valor, volume, Base, CDEMPRESA, CDREPRESENTANTE]
+        self.pedidos = {}
+        # UF -> consultor -> {'total', 'volume_total', 'quantidade'}
+        self.agregados = {}
+        self.vistos = set()
+    
+    def carregar(self, data_emissao):
+        """
+        Carrega o estado salvo, descartando-o se for de outro dia
+        
+        Args:
+            data_emissao (str): Data no formato DD/MM/YYYY
+        """
+        self.data_emissao = data_emissao
+        self.pedidos = {}
+        self.agregados = {}
+        self.vistos = set()
+        
+        try:
+            with open(self.caminho, 'r', encoding='utf-8') as f:
+                estado = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            self.logger.warning(f"Estado incremental inválido, reiniciando: {str(e)}")
+            return
+        
+        if estado.get('data_emissao') != data_emissao:
+            self.logger.info("Estado incremental de outro dia descartado")
+            return
+        
+        pedidos = estado.get('pedidos', {})
+        if any(len(contribuicao) != len(CAMPOS_CONTRIBUICAO) for contribuicao in pedidos.values()):
+            # Gravado por uma versão anterior, sem os campos do histórico: o dia é recontado
+            self.logger.warning("Estado incremental em formato antigo descartado")
+            return
+        
+        self.pedidos = pedidos
+        self.agregados = estado.get('agregados', {})
+        self.logger.info(f"Estado incremental carregado: {len(self.pedidos)} pedidos já processados")
+    
+    def salvar(self):
+        """Grava o estado em disco de forma atômica"""
+        temporario = f"{self.caminho}.tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump({
+                'data_emissao': self.data_emissao,
+                'pedidos': self.pedidos,
+                'agregados': self.agregados
+            }, f, ensure_ascii=False)
+        os.replace(temporario, self.caminho)
+    
+    def chave_pedido(self, venda):
+        """
+        Monta a chave única do pedido a partir dos campos de PEDIDO_CHAVE
+        
+        Args:
+            venda (Pedido|dict): Pedido retornado pela API
+            
+        Returns:
+            str: Chave do pedido
+            
+        Raises:
+            ChavePedidoAusente: Se algum campo de PEDIDO_CHAVE não veio no pedido
+        """
+        valores = [venda.get(campo) for campo in PEDIDO_CHAVE]
+        if any(valor is None for valor in valores):
+            # Pelo conteúdo, pedidos distintos com os mesmos valores seriam contados uma vez só
+            ausentes = [campo for campo, valor in zip(PEDIDO_CHAVE, valores) if valor is None]
+            raise ChavePedidoAusente(f"Pedido sem os campos de chave {', '.join(ausentes)} (PEDIDO_CHAVE)")
+        return '|'.join(str(valor) for valor in valores)
+    
+    def _somar(self, contribuicao, sinal):
+        """
+        Soma (ou subtrai) a contribuição de um pedido aos totais
+        
+        Args:
+            contribuicao (list): [FLCONTROLEERP, UF, Consultor, valor, volume, ...]
+            sinal (int): 1 para somar, -1 para subtrair
+        """
+        _, uf, consultor, valor, volume = contribuicao[:5]
+        if uf is None:
+            return
+        
+        consultores = self.agregados.setdefault(uf, {})
+        dados = consultores.setdefault(consultor, {'total': 0, 'volume_total': 0, 'quantidade': 0})
+        dados['total'] += sinal * valor
+        dados['volume_total'] += sinal * volume
+        dados['quantidade'] += sinal
+        
+        if dados['quantidade'] <= 0:
+            del consultores[consultor]
+            if not consultores:
+                del self.agregados[uf]
+    
+    def processar(self, vendas, indices):
+        """
+        Incorpora aos totais apenas pedidos novos ou alterados
+        
+        Um pedido é considerado alterado quando seu FLCONTROLEERP ou sua UF
+        mudam; nesse caso a contribuição anterior é estornada antes de somar a nova.
+        
+        Args:
+            vendas (list): Pedidos retornados pela API
+            indices (tuple): Índices de DataProcessor.criar_indices()
+            
+        Returns:
+            int: Quantidade de pedidos novos ou alterados
+            
+        Raises:
+            ChavePedidoAusente: Se algum pedido não tiver os campos de PEDIDO_CHAVE
+                (o estado fica incompleto e não deve ser salvo)
+        """
+        alterados = 0
+        
+        for venda in vendas:
+            chave = self.chave_pedido(venda)
+            self.vistos.add(chave)
+            controle = venda.get('FLCONTROLEERP')
+            
+            # Mesmas regras da passada única; a UF é comparada antes de somar
+            relacionado = relacionar_pedido(venda, indices)
+            uf = relacionado[1].uf if relacionado is not None else None
+            
+            anterior = self.pedidos.get(chave)
+            if anterior is not None:
+                # A UF também é comparada para refletir mudanças no mapeamento e nos cadastros
+                if anterior[0] == controle and anterior[1] == uf:
+                    continue
+                self._somar(anterior, -1)
+            
+            if uf is None:
+                # Guarda o pedido para não reavaliá-lo enquanto não mudar
+                self.pedidos[chave] = [controle, None, None, 0.0, 0.0, None, None, None]
+                continue
+            
+            vendedor, empresa, valor, volume = relacionado
+            contribuicao = [
+                controle,
+                uf,
+                vendedor.nome,
+                valor,
+                volume,
+                empresa.sigla,
+                venda.get('CDEMPRESA'),
+                venda.get('CDREPRESENTANTE')
+            ]
+            self._somar(contribuicao, 1)
+            self.pedidos[chave] = contribuicao
+            alterados += 1
+        
+        return alterados
+    
+    def remover_ausentes(self):
+        """
+        Estorna pedidos que não vieram mais na consulta do dia (ex.: cancelados)
+        
+        Deve ser chamado apenas após uma consulta completa das vendas do dia.
+        
+        Returns:
+            int: Quantidade de pedidos removidos
+        """
+        ausentes = [chave for chave in self.pedidos if chave not in self.vistos]
+        
+        for chave in ausentes:
+            self._somar(self.pedidos.pop(chave), -1)
+        
+        return len(ausentes)
+    
+    def vendas_relacionadas(self):
+        """
+        Monta as vendas relacionadas do dia a partir dos pedidos do estado
+        
+        Usado para gravar no histórico local os dias processados no modo incremental.
+        
+        Returns:
+            list: VendaRelacionada de cada pedido com vendedor e empresa válidos
+        """
+        return [
+            VendaRelacionada(base, consultor, valor, volume, self.data_emissao, uf, cdempresa, cdrepresentante)
+            for _, uf, consultor, valor, volume, base, cdempresa, cdrepresentante in self.pedidos.values()
+            if uf is not None
+        ]
\ No newline at end of file
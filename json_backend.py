@@ -0,0 +1,89 @@
+"""
+Decodificação e codificação JSON com backend configurável (json, orjson ou ujson)
+
+O backend é escolhido por JSON_BACKEND. Com "auto", usa o mais rápido
+instalado (orjson, depois ujson) e recorre à biblioteca padrão.
+"""
+
+import json
+import logging
+from config import JSON_BACKEND
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional
+    orjson = None
+
+try:
+    import ujson
+except ImportError:  # ujson é opcional
+    ujson = None
+
+PREFERENCIA = ('orjson', 'ujson', 'json')
+
+def _serializar_json(dados):
+    return json.dumps(dados, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def _serializar_ujson(dados):
+    return ujson.dumps(dados, ensure_ascii=False).encode('utf-8')
+
+def backends_disponiveis():
+    """
+    Lista os backends instalados
+    
+    Returns:
+        dict: Nome -> (função de decodificação, função de codificação para bytes)
+    """
+    backends = {'json': (json.loads, _serializar_json)}
+    if orjson is not None:
+        backends['orjson'] = (orjson.loads, orjson.dumps)
+    if ujson is not None:
+        backends['ujson'] = (ujson.loads, _serializar_ujson)
+    return backends
+
+def selecionar_backend(nome):
+    """
+    Escolhe o backend pelo nome, recorrendo à biblioteca padrão se não estiver instalado
+    
+    Args:
+        nome (str): "auto", "json", "orjson" ou "ujson"
+    
+    Returns:
+        tuple: (nome do backend escolhido, decodificação, codificação)
+    """
+    backends = backends_disponiveis()
+    if nome == 'auto':
+        nome = next(candidato for candidato in PREFERENCIA if candidato in backends)
+    elif nome not in backends:
+        logging.getLogger(__name__).warning("Backend JSON '%s' indisponível, usando json", nome)
+        nome = 'json'
+    return (nome,) + backends[nome]
+
+BACKEND, _carregar, _serializar = selecionar_backend(JSON_BACKEND)
+
+def carregar(conteudo):
+    """
+    Decodifica um documento JSON com o backend configurado
+    
+    Args:
+        conteudo (bytes|str): Documento JSON (bytes em UTF-8)
+    
+    Returns:
+        object: Valor decodificado
+    
+    Raises:
+        ValueError: Se o documento for inválido (todos os backends derivam dele)
+    """
+    return _carregar(conteudo)
+
+def serializar(dados):
+    """
+    Codifica um valor em JSON compacto com o backend configurado
+    
+    Args:
+        dados (object): Valor composto de dict, list, str, números, bool e None
+    
+    Returns:
+        bytes: Documento JSON em UTF-8
+    """
+    return _serializar(dados)
\ No newline at end of file
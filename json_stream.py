@@ -0,0 +1,111 @@
+"""
+Decodificação incremental de respostas JSON grandes
+"""
+
+import codecs
+import json
+
+# Caracteres ignorados entre os elementos do array
+ESPACOS = ' \t\r\n'
+
+# Compacta o buffer quando a parte já consumida passa deste tamanho
+LIMITE_DESCARTE = 1 << 16
+
+def iter_itens_json(blocos, chave='data'):
+    """
+    Decodifica os elementos de um array JSON à medida que os bytes chegam
+    
+    Apenas o elemento em decodificação e o bloco atual ficam em memória.
+    Se o documento for um objeto (ex.: {"data": [...]}), ele é lido por
+    completo e os registros de `chave` são entregues em seguida.
+    
+    Args:
+        blocos (iterable): Blocos de bytes (ex.: response.iter_content())
+        chave (str): Chave com os registros quando a resposta é um objeto
+        
+    Yields:
+        Cada elemento do array, já decodificado
+        
+    Raises:
+        ValueError: Se o JSON estiver malformado ou truncado
+    """
+    decodificador = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    blocos = iter(blocos)
+    buffer = ''
+    posicao = 0
+    fim_dos_dados = False
+    
+    def ler():
+        nonlocal buffer, posicao, fim_dos_dados
+        bloco = next(blocos, None)
+        if bloco is None:
+            fim_dos_dados = True
+            buffer += utf8.decode(b'', final=True)
+        else:
+            buffer += utf8.decode(bloco)
+        if posicao > LIMITE_DESCARTE:
+            buffer = buffer[posicao:]
+            posicao = 0
+    
+    def pular_espacos():
+        nonlocal posicao
+        while True:
+            while posicao < len(buffer) and buffer[posicao] in ESPACOS:
+                posicao += 1
+            if posicao < len(buffer) or fim_dos_dados:
+                return
+            ler()
+    
+    pular_espacos()
+    if posicao >= len(buffer):
+        raise ValueError("Resposta JSON vazia")
+    
+    if buffer[posicao] != '[':
+        # Objeto ou outro valor: decodifica o documento inteiro
+        while not fim_dos_dados:
+            ler()
+        dados = json.loads(buffer[posicao:])
+        registros = dados.get(chave) or [] if isinstance(dados, dict) else dados
+        yield from registros
+        return
+    
+    posicao += 1
+    primeiro = True
+    
+    while True:
+        pular_espacos()
+        if posicao >= len(buffer):
+            raise ValueError("Array JSON truncado")
+        
+        if buffer[posicao] == ']':
+            return
+        
+        if not primeiro:
+            if buffer[posicao] != ',':
+                raise ValueError("Esperado ',' ou ']' entre os elementos do array JSON")
+            posicao += 1
+            pular_espacos()
+        
+        while True:
+            try:
+                item, fim = decodificador.raw_decode(buffer, posicao)
+            except json.JSONDecodeError:
+                if fim_dos_dados:
+                    raise ValueError("Elemento JSON truncado ou inválido") from None
+                ler()
+                continue
+            
+            # O elemento só está completo se for seguido de ',' ou ']': um número
+            # no fim do bloco (ex.: "-3" de "-3e2") pode continuar no próximo
+            seguinte = fim
+            while seguinte < len(buffer) and buffer[seguinte] in ESPACOS:
+                seguinte += 1
+            if not fim_dos_dados and (seguinte == len(buffer) or buffer[seguinte] not in ',]'):
+                ler()
+                continue
+            break
+        
+        posicao = fim
+        primeiro = False
+        yield item
@@ -0,0 +1,130 @@
+"""
+Configuração de logs: fila assíncrona, rotação de arquivos e saída opcional em JSON
+"""
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+from datetime import datetime
+from config import LOG_PATH, LOG_NIVEL, LOG_ROTACAO, LOG_TAMANHO_MAX_MB, LOG_BACKUPS, LOG_JSON
+
+FORMATO_TEXTO = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Formata os tracebacks antes de enfileirar (ver HandlerFila)
+_FORMATADOR_EXCECAO = logging.Formatter()
+
+# Listener ativo (um por processo)
+_listener = None
+
+class FormatadorJSON(logging.Formatter):
+    """Formata cada registro como um objeto JSON por linha"""
+    
+    def format(self, record):
+        evento = {
+            'timestamp': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'mensagem': record.getMessage()
+        }
+        if record.exc_info:
+            evento['excecao'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            # Registro vindo da fila (HandlerFila), com a exceção já formatada
+            evento['excecao'] = record.exc_text
+        return json.dumps(evento, ensure_ascii=False)
+
+class HandlerFila(logging.handlers.QueueHandler):
+    """QueueHandler que mantém o traceback separado da mensagem"""
+    
+    def prepare(self, record):
+        """
+        Prepara o registro para a fila
+        
+        O prepare padrão junta o traceback à mensagem e descarta exc_info.
+        Aqui o traceback vai para exc_text: o Formatter de texto o acrescenta
+        à linha e o FormatadorJSON o grava na chave 'excecao'.
+        
+        Args:
+            record (logging.LogRecord): Registro original
+            
+        Returns:
+            logging.LogRecord: Cópia com a mensagem resolvida e sem objetos de exceção
+        """
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = _FORMATADOR_EXCECAO.formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+def criar_handler_arquivo(caminho=None, rotacao=None):
+    """
+    Cria o handler do arquivo de log com rotação
+    
+    Args:
+        caminho (str): Arquivo de log. Se None, usa LOG_PATH
+        rotacao (str): 'tamanho' (LOG_TAMANHO_MAX_MB) ou 'diaria' (meia-noite). Se None, usa LOG_ROTACAO
+        
+    Returns:
+        logging.Handler: Handler configurado
+    """
+    caminho = caminho or LOG_PATH
+    rotacao = rotacao or LOG_ROTACAO
+    
+    if rotacao == 'diaria':
+        return logging.handlers.TimedRotatingFileHandler(
+            caminho, when='midnight', backupCount=LOG_BACKUPS, encoding='utf-8'
+        )
+    return logging.handlers.RotatingFileHandler(
+        caminho, maxBytes=int(LOG_TAMANHO_MAX_MB * 1024 * 1024), backupCount=LOG_BACKUPS, encoding='utf-8'
+    )
+
+def configurar_logs(json_lines=None):
+    """
+    Configura o logger raiz para gravar via fila
+    
+    As threads da aplicação apenas enfileiram os registros (QueueHandler);
+    a gravação no arquivo e no console acontece na thread do QueueListener.
+    Chamadas repetidas não duplicam handlers.
+    
+    Args:
+        json_lines (bool): Grava o arquivo em JSON, um evento por linha. Se None, usa LOG_JSON
+    """
+    global _listener
+    if _listener is not None:
+        return
+    
+    json_lines = LOG_JSON if json_lines is None else json_lines
+    
+    arquivo = criar_handler_arquivo()
+    arquivo.setFormatter(FormatadorJSON() if json_lines else logging.Formatter(FORMATO_TEXTO))
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(logging.Formatter(FORMATO_TEXTO))
+    
+    fila = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(fila, arquivo, console, respect_handler_level=True)
+    _listener.start()
+    
+    raiz = logging.getLogger()
+    raiz.setLevel(getattr(logging, LOG_NIVEL.upper(), logging.INFO))
+    raiz.addHandler(HandlerFila(fila))
+    
+    atexit.register(encerrar_logs)
+
+def encerrar_logs():
+    """Grava os registros pendentes na fila e fecha os handlers"""
+    global _listener
+    if _listener is None:
+        return
+    
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
@@ -2,26 +2,273 @@
 Script principal para geração e envio de resumo de vendas via WhatsApp
 """
 
+import argparse
 import logging
+import os
+import signal
 import sys
-from datetime import datetime
-from api_client import APIClient
-from data_processor import DataProcessor
+import threading
+from datetime import date, datetime, timedelta
+from itertools import chain
+from api_client import APIClient, ErroAPI
+from config import ARMAZENAR_VENDAS, INCREMENTAL_STATE_PATH, MASTER_CACHE_DIR, PROCESSAMENTO_PARALELO, RELATORIOS_PERIODO, TOKEN_CACHE_PATH, VENDAS_PARTICIONADO, VENDAS_STREAMING, VENDAS_TAMANHO_PAGINA
+from backfill import Backfill, interpretar_data
+from data_processor import DataProcessor, formatar_moeda
+from incremental_state import ChavePedidoAusente, EstadoIncremental
+from logging_setup import configurar_logs
+from master_cache import CacheDadosMestres
+from metrics import coletor
+from outbox import CaixaSaida
+from parallel_processing import ProcessadorParalelo
+from sales_store import ArmazemVendas
+from scheduler import Agendador, carregar_agenda
+from token_cache import TokenCache
 from whatsapp_sender import WhatsAppSender
 
 def setup_logging():
-    """Configura sistema de logs"""
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler('resumo_vendas.log', encoding='utf-8'),
-            logging.StreamHandler(sys.stdout)
-        ]
-    )
-
-def main():
-    """Função principal do sistema"""
+    """Configura sistema de logs (ver logging_setup.py)"""
+    configurar_logs()
+
+def vendas_sob_demanda(api_client, empresas_com_uf, ufs=None):
+    """
+    Consulta as vendas do dia entregando cada pedido assim que chega
+    
+    Com VENDAS_PARTICIONADO ou `ufs`, consulta uma partição por empresa;
+    senão usa páginas se VENDAS_TAMANHO_PAGINA estiver configurado, ou uma
+    única consulta decodificada em streaming.
+    
+    Args:
+        api_client (APIClient): Cliente da API
+        empresas_com_uf (list): Lista de empresas com UF
+        ufs (set): Consulta apenas as empresas destas UFs. Se None, todas
+        
+    Returns:
+        iterator: Pedidos (a consulta acontece durante a iteração e pode levantar ErroAPI)
+    """
+    if VENDAS_PARTICIONADO or ufs is not None:
+        return chain.from_iterable(api_client.iter_vendas_particionado(codigos_empresas(empresas_com_uf, ufs)))
+    if VENDAS_TAMANHO_PAGINA > 0:
+        return chain.from_iterable(api_client.iter_vendas_paginas())
+    return api_client.iter_vendas()
+
+def respostas_vendas(api_client, empresas_com_uf, ufs=None):
+    """
+    Consulta as vendas do dia sem decodificar, para o processamento paralelo
+    
+    Sempre entrega uma resposta por empresa, mesmo sem VENDAS_PARTICIONADO:
+    com a resposta única do dia, um só processo faria todo o trabalho.
+    
+    Args:
+        api_client (APIClient): Cliente da API
+        empresas_com_uf (list): Lista de empresas com UF
+        ufs (set): Consulta apenas as empresas destas UFs. Se None, todas
+        
+    Yields:
+        bytes: Corpo JSON de cada resposta (a consulta pode levantar ErroAPI)
+    """
+    yield from api_client.iter_vendas_particionado(codigos_empresas(empresas_com_uf, ufs), bruto=True)
+
+def codigos_empresas(empresas_com_uf, ufs=None):
+    """
+    Lista os códigos das empresas a consultar
+    
+    Args:
+        empresas_com_uf (list): Lista de empresas com UF
+        ufs (set): Apenas as empresas destas UFs. Se None, todas
+        
+    Returns:
+        list: Valores de CDEMPRESA
+    """
+    return [empresa['CDEMPRESA'] for empresa in empresas_com_uf if ufs is None or empresa.get('UF') in ufs]
+
+def processar_incremental(api_client, data_processor, dados, vendedores, empresas_com_uf, sob_demanda,
+                          manter_registros=False, caminho_estado=None):
+    """
+    Incorpora ao estado do dia apenas os pedidos novos ou alterados
+    
+    Se a API não retornar os campos de PEDIDO_CHAVE, o estado não é salvo e
+    o dia é recontado por inteiro, como fora do modo incremental.
+    
+    Args:
+        api_client (APIClient): Cliente da API
+        data_processor (DataProcessor): Processador de dados
+        dados (dict): Resultado de fetch_dados_paralelo()
+        vendedores (list): Lista de vendedores
+        empresas_com_uf (list): Lista de empresas com UF
+        sob_demanda (bool): Se as vendas devem ser consultadas durante o processamento
+        manter_registros (bool): Também retorna as vendas relacionadas do dia, para o histórico
+        caminho_estado (str): Arquivo do estado incremental. Se None, INCREMENTAL_STATE_PATH
+        
+    Returns:
+        tuple: (totais por UF e consultor, vendas relacionadas ou None), ou None
+            em caso de falha na consulta
+    """
+    logger = logging.getLogger(__name__)
+    
+    estado = EstadoIncremental(caminho=caminho_estado)
+    estado.carregar(datetime.now().strftime("%d/%m/%Y"))
+    indices = data_processor.criar_indices(vendedores, empresas_com_uf)
+    
+    try:
+        vendas = vendas_sob_demanda(api_client, empresas_com_uf) if sob_demanda else dados['vendas']
+        alterados = estado.processar(vendas, indices)
+    except ErroAPI as e:
+        logger.error(f"{str(e)}. Encerrando execução.")
+        return None
+    except ChavePedidoAusente as e:
+        logger.error(f"{str(e)}. Recontando o dia inteiro sem o estado incremental.")
+        try:
+            vendas = vendas_sob_demanda(api_client, empresas_com_uf) if sob_demanda else dados['vendas']
+            return data_processor.processar_vendas(vendas, vendedores, empresas_com_uf, indices=indices,
+                                                   manter_registros=manter_registros)
+        except ErroAPI as e:
+            logger.error(f"{str(e)}. Encerrando execução.")
+            return None
+    
+    removidos = estado.remover_ausentes()
+    estado.salvar()
+    
+    logger.info(f"Modo incremental: {alterados} pedidos novos ou alterados, {removidos} removidos")
+    return estado.agregados, estado.vendas_relacionadas() if manter_registros else None
+
+def armazenar_vendas(vendas_relacionadas, ufs=None):
+    """
+    Grava as vendas do dia no histórico local sem interromper a execução em caso de erro
+    
+    Args:
+        vendas_relacionadas (list): Vendas relacionadas do dia
+        ufs (set): UFs consultadas, quando a consulta foi parcial
+    """
+    logger = logging.getLogger(__name__)
+    
+    try:
+        armazem = ArmazemVendas()
+        try:
+            armazem.salvar_dia(date.today(), vendas_relacionadas, ufs=ufs)
+        finally:
+            armazem.fechar()
+    except Exception as e:
+        logger.warning(f"Não foi possível gravar o histórico de vendas: {str(e)}")
+
+# Período -> (título, função que retorna a data inicial a partir de hoje)
+PERIODOS = {
+    'semana': ("📆 *ACUMULADO DA SEMANA*", lambda hoje: hoje - timedelta(days=hoje.weekday())),
+    'mes': ("🗓️ *ACUMULADO DO MÊS*", lambda hoje: hoje.replace(day=1))
+}
+
+def avisar_dias_sem_historico(armazem, periodo, inicio, fim):
+    """
+    Registra um aviso com os dias do período que não têm vendas no histórico
+    
+    Esses dias ficam fora do acumulado: não tiveram vendas ou não foram
+    processados (use o backfill para incluí-los).
+    
+    Args:
+        armazem (ArmazemVendas): Histórico local
+        periodo (str): Nome do período, para o aviso
+        inicio (date): Primeiro dia do período
+        fim (date): Último dia anterior a hoje
+    """
+    if inicio > fim:
+        return
+    
+    gravadas = set(armazem.datas_armazenadas(inicio, fim))
+    ausentes = [inicio + timedelta(days=dia) for dia in range((fim - inicio).days + 1)]
+    ausentes = [data.strftime('%d/%m') for data in ausentes if data.isoformat() not in gravadas]
+    if ausentes:
+        logging.getLogger(__name__).warning(
+            f"Acumulado ({periodo}) sem histórico de {', '.join(ausentes)}: dias sem vendas ou não processados"
+        )
+
+def adicionar_relatorios_periodo(data_processor, relatorios_por_uf, agregados_hoje):
+    """
+    Anexa aos relatórios do dia os rankings acumulados da semana e/ou do mês
+    
+    Os dias anteriores vêm dos agregados diários do histórico local; o dia
+    atual vem dos totais já calculados na execução.
+    
+    Args:
+        data_processor (DataProcessor): Processador de dados
+        relatorios_por_uf (dict): Relatórios do dia por UF (alterado no lugar)
+        agregados_hoje (dict): Totais do dia por UF e consultor
+    """
+    logger = logging.getLogger(__name__)
+    hoje = date.today()
+    ontem = hoje - timedelta(days=1)
+    
+    try:
+        armazem = ArmazemVendas()
+        try:
+            for periodo in RELATORIOS_PERIODO:
+                if periodo not in PERIODOS:
+                    logger.warning(f"Período desconhecido em RELATORIOS_PERIODO: {periodo}")
+                    continue
+                
+                titulo, calcular_inicio = PERIODOS[periodo]
+                inicio = calcular_inicio(hoje)
+                anteriores = armazem.consultar_agregados_periodo(inicio, ontem) if inicio <= ontem else {}
+                avisar_dias_sem_historico(armazem, periodo, inicio, ontem)
+                acumulado = data_processor.somar_agregados(anteriores, agregados_hoje)
+                
+                for uf in relatorios_por_uf:
+                    if uf in acumulado:
+                        relatorios_por_uf[uf] += "\n\n" + data_processor.formatar_relatorio(
+                            acumulado[uf],
+                            titulo=f"{titulo} ({inicio.strftime('%d/%m')} a {hoje.strftime('%d/%m')})"
+                        )
+        finally:
+            armazem.fechar()
+    except Exception as e:
+        logger.warning(f"Não foi possível gerar os acumulados do período: {str(e)}")
+
+def main(incremental=False, atualizar_cadastros=False, api_client=None, whatsapp_sender=None, armazenar=None,
+         data_processor=None, ufs=None, caminho_estado=None):
+    """
+    Executa o resumo do dia e exporta as métricas da execução (ver metrics.py)
+    
+    Args:
+        incremental (bool): Processa apenas pedidos novos ou alterados desde a última execução do dia
+        atualizar_cadastros (bool): Ignora o cache de vendedores e empresas
+        api_client (APIClient): Cliente já configurado (padrão: um novo APIClient)
+        whatsapp_sender (WhatsAppSender): Enviador já configurado (padrão: um novo WhatsAppSender)
+        armazenar (bool): Grava o histórico e gera os acumulados (padrão: ARMAZENAR_VENDAS)
+        data_processor (DataProcessor): Processador reaproveitado entre execuções (padrão: um novo)
+        ufs (set): Envia apenas os relatórios destas UFs (padrão: todas)
+        caminho_estado (str): Arquivo do estado incremental (padrão: INCREMENTAL_STATE_PATH)
+        
+    Returns:
+        bool: True se a execução foi concluída sem falhas
+    """
+    coletor.reiniciar()
+    sucesso = False
+    try:
+        sucesso = executar_resumo(
+            incremental=incremental, atualizar_cadastros=atualizar_cadastros, api_client=api_client,
+            whatsapp_sender=whatsapp_sender, armazenar=armazenar, data_processor=data_processor, ufs=ufs,
+            caminho_estado=caminho_estado
+        )
+        return sucesso
+    finally:
+        coletor.definir('sucesso', int(bool(sucesso)))
+        relatorio = coletor.exportar()
+        etapas = ', '.join(f"{etapa}={duracao:.2f}s" for etapa, duracao in relatorio['etapas'].items())
+        logging.getLogger(__name__).info(f"Duração das etapas: {etapas}")
+
+def executar_resumo(incremental=False, atualizar_cadastros=False, api_client=None, whatsapp_sender=None, armazenar=None,
+                    data_processor=None, ufs=None, caminho_estado=None):
+    """
+    Função principal do sistema
+    
+    Args:
+        incremental (bool): Processa apenas pedidos novos ou alterados desde a última execução do dia
+        atualizar_cadastros (bool): Ignora o cache de vendedores e empresas
+        api_client (APIClient): Cliente já configurado (padrão: um novo APIClient)
+        whatsapp_sender (WhatsAppSender): Enviador já configurado (padrão: um novo WhatsAppSender)
+        armazenar (bool): Grava o histórico e gera os acumulados (padrão: ARMAZENAR_VENDAS)
+        data_processor (DataProcessor): Processador reaproveitado entre execuções (padrão: um novo)
+        ufs (set): Envia apenas os relatórios destas UFs (padrão: todas)
+        caminho_estado (str): Arquivo do estado incremental (padrão: INCREMENTAL_STATE_PATH)
+    """
     
     # Configurar logs
     setup_logging()
@@ -33,11 +280,14 @@ def main():
     
     try:
         # Inicializar componentes
-        api_client = APIClient()
-        data_processor = DataProcessor()
-        whatsapp_sender = WhatsAppSender()
+        api_client = api_client or APIClient()
+        data_processor = data_processor or DataProcessor()
+        whatsapp_sender = whatsapp_sender or WhatsAppSender()
+        armazenar = ARMAZENAR_VENDAS if armazenar is None else armazenar
+        api_client.campos_chave_pedido = incremental
         
         # Etapa 1: Gerar token de autenticação
+        coletor.marcar_etapa('autenticacao')
         logger.info("ETAPA 1: Gerando token de autenticação...")
         token = api_client.generate_token()
         if not token:
@@ -45,61 +295,102 @@ def main():
             return False
         
         # Etapa 2: Consultar dados da API
+        coletor.marcar_etapa('consulta')
         logger.info("ETAPA 2: Consultando dados da API...")
         
-        # Consultar vendas do dia
-        vendas = api_client.fetch_vendas()
-        if vendas is None:
-            logger.error("Falha ao consultar vendas. Encerrando execução.")
-            return False
+        # Fora do modo incremental, com UFs definidas só as empresas delas são consultadas
+        # (o estado incremental precisa da consulta completa do dia)
+        ufs_consulta = ufs if ufs is not None and not incremental else None
         
-        # Consultar vendedores
-        vendedores = api_client.fetch_vendedores()
-        if vendedores is None:
-            logger.error("Falha ao consultar vendedores. Encerrando execução.")
-            return False
+        # Com paginação, streaming ou partições, as vendas são consultadas depois
+        # dos dados mestres para que cada pedido seja relacionado assim que chega
+        sob_demanda = (VENDAS_TAMANHO_PAGINA > 0 or VENDAS_STREAMING or VENDAS_PARTICIONADO or PROCESSAMENTO_PARALELO
+                       or ufs_consulta is not None)
         
-        # Consultar empresas
-        empresas = api_client.fetch_empresas()
-        if empresas is None:
-            logger.error("Falha ao consultar empresas. Encerrando execução.")
+        # Consultar vendas, vendedores e empresas em paralelo
+        dados, relatorio_consultas = api_client.fetch_dados_paralelo(
+            incluir_vendas=not sob_demanda,
+            forcar_atualizacao=atualizar_cadastros
+        )
+        if dados is None:
+            falhas = ', '.join(f"{nome}: {status}" for nome, status in relatorio_consultas.items())
+            logger.error(f"Falha ao consultar dados da API ({falhas}). Encerrando execução.")
             return False
         
+        vendedores = dados['vendedores']
+        empresas = dados['empresas']
+        
         # Etapa 3: Processar dados
+        coletor.marcar_etapa('processamento')
         logger.info("ETAPA 3: Processando dados...")
         
         # Adicionar UF às empresas
         empresas_com_uf = data_processor.add_uf_to_empresas(empresas)
         
-        # Relacionar dados
-        vendas_relacionadas = data_processor.relacionar_dados(vendas, vendedores, empresas_com_uf)
+        # Relacionar e agregar dados
+        if incremental:
+            resultado = processar_incremental(api_client, data_processor, dados, vendedores, empresas_com_uf,
+                                              sob_demanda, manter_registros=armazenar, caminho_estado=caminho_estado)
+            if resultado is None:
+                return False
+            agregados, vendas_relacionadas = resultado
+        else:
+            # Uma única passada: cada pedido é relacionado e somado aos totais
+            # assim que chega; os registros só são mantidos para o histórico
+            try:
+                if PROCESSAMENTO_PARALELO:
+                    # Cada resposta é decodificada e agregada em outro processo
+                    processador_paralelo = ProcessadorParalelo(data_processor)
+                    try:
+                        agregados, vendas_relacionadas = processador_paralelo.processar_respostas(
+                            respostas_vendas(api_client, empresas_com_uf, ufs_consulta),
+                            vendedores, empresas_com_uf, manter_registros=armazenar
+                        )
+                    finally:
+                        processador_paralelo.fechar()
+                else:
+                    vendas = vendas_sob_demanda(api_client, empresas_com_uf, ufs_consulta) if sob_demanda else dados['vendas']
+                    agregados, vendas_relacionadas = data_processor.processar_vendas(
+                        vendas, vendedores, empresas_com_uf, manter_registros=armazenar
+                    )
+            except ErroAPI as e:
+                logger.error(f"{str(e)}. Encerrando execução.")
+                return False
+        
+        # Gravar vendas do dia no histórico local (no modo incremental, a partir do estado do dia)
+        if armazenar:
+            armazenar_vendas(vendas_relacionadas, ufs=ufs_consulta)
         
-        if not vendas_relacionadas:
+        total_vendas = sum(d['quantidade'] for consultores in agregados.values() for d in consultores.values())
+        coletor.definir('vendas_processadas', total_vendas)
+        
+        if not total_vendas:
             logger.warning("Nenhuma venda válida encontrada para processar.")
             # Ainda assim, enviar mensagem informando que não há vendas
             mensagem_sem_vendas = "📊 *RELATÓRIO DE VENDAS*\n\n❌ Nenhuma venda encontrada hoje."
             
-            # Enviar para todos os grupos
-            for uf in ['CE', 'PI', 'MA', 'PB', 'RN']:
-                whatsapp_sender.send_relatorio_uf(uf, mensagem_sem_vendas)
+            # Enviar para todos os grupos de config.json (recarregado se o arquivo mudar)
+            coletor.marcar_etapa('envio')
+            whatsapp_sender.send_relatorios_todas_ufs(
+                {uf: mensagem_sem_vendas for uf in whatsapp_sender.grupos_config if ufs is None or uf in ufs}
+            )
             
             logger.info("Mensagens de 'sem vendas' enviadas para todos os grupos.")
             return True
         
-        # Agrupar por UF
-        vendas_por_uf = data_processor.agrupar_por_uf(vendas_relacionadas)
-        
         # Etapa 4: Gerar relatórios
+        coletor.marcar_etapa('relatorios')
         logger.info("ETAPA 4: Gerando relatórios por UF...")
-        relatorios_por_uf = {}
+        relatorios_por_uf = data_processor.formatar_relatorios_por_uf(agregados)
+        if ufs is not None:
+            relatorios_por_uf = {uf: relatorio for uf, relatorio in relatorios_por_uf.items() if uf in ufs}
         
-        for uf, vendas_uf in vendas_por_uf.items():
-            if uf != 'DESCONHECIDO':
-                relatorio = data_processor.gerar_relatorio_uf(vendas_uf)
-                relatorios_por_uf[uf] = relatorio
-                logger.info(f"Relatório gerado para {uf}: {len(vendas_uf)} vendas")
+        # Acumulados da semana e do mês
+        if RELATORIOS_PERIODO and armazenar:
+            adicionar_relatorios_periodo(data_processor, relatorios_por_uf, agregados)
         
         # Etapa 5: Enviar mensagens WhatsApp
+        coletor.marcar_etapa('envio')
         logger.info("ETAPA 5: Enviando mensagens WhatsApp...")
         
         # Testar conexão primeiro
@@ -114,10 +405,13 @@ def main():
         total = len(resultados)
         
         logger.info(f"Envios concluídos: {sucessos}/{total} sucessos")
+        coletor.definir('mensagens_enviadas', sucessos)
+        coletor.definir('mensagens_total', total)
         
         # Etapa 6: Resumo final
+        coletor.marcar_etapa('resumo')
         logger.info("ETAPA 6: Resumo da execução...")
-        logger.info(f"- Vendas processadas: {len(vendas_relacionadas)}")
+        logger.info(f"- Vendas processadas: {total_vendas}")
         logger.info(f"- UFs com vendas: {len(relatorios_por_uf)}")
         logger.info(f"- Mensagens enviadas: {sucessos}/{total}")
         
@@ -137,6 +431,191 @@ def main():
         logger.info("FIM DA EXECUÇÃO")
         logger.info("=" * 50)
 
+def executar_backfill(inicio, fim, atualizar_cadastros=False):
+    """
+    Reprocessa um intervalo de datas e grava cada dia no histórico local
+    
+    Args:
+        inicio (date): Data inicial
+        fim (date): Data final (inclusiva)
+        atualizar_cadastros (bool): Ignora o cache de vendedores e empresas
+        
+    Returns:
+        bool: True se todos os dias foram processados
+    """
+    setup_logging()
+    logger = logging.getLogger(__name__)
+    
+    logger.info("=" * 50)
+    logger.info("BACKFILL DE VENDAS")
+    logger.info("=" * 50)
+    
+    try:
+        api_client = APIClient()
+        data_processor = DataProcessor()
+        armazem = ArmazemVendas() if ARMAZENAR_VENDAS else None
+        # Os dias consultados em paralelo dividem o mesmo pool de processos
+        processador_paralelo = ProcessadorParalelo(data_processor) if PROCESSAMENTO_PARALELO else None
+        
+        try:
+            resultados, falhas = Backfill(api_client, data_processor, armazem, processador_paralelo=processador_paralelo).executar(
+                inicio, fim, forcar_atualizacao=atualizar_cadastros
+            )
+        finally:
+            if armazem is not None:
+                armazem.fechar()
+            if processador_paralelo is not None:
+                processador_paralelo.fechar()
+        
+        if resultados is None:
+            return False
+        
+        for data, agregados in resultados.items():
+            for uf, consultores in sorted(agregados.items()):
+                quantidade = sum(dados['quantidade'] for dados in consultores.values())
+                total = sum(dados['total'] for dados in consultores.values())
+                logger.info("%s %s: %d vendas, %s", data.strftime('%d/%m/%Y'), uf, quantidade, formatar_moeda(total))
+        
+        for data in falhas:
+            logger.error(f"Dia não processado: {data.strftime('%d/%m/%Y')}")
+        
+        return not falhas
+        
+    except Exception as e:
+        logger.error(f"ERRO CRÍTICO no backfill: {str(e)}")
+        return False
+
+def executar_daemon(incremental=False):
+    """
+    Mantém o processo ativo e executa o resumo nos horários da agenda
+    
+    Cliente da API, enviador e processador são criados uma vez e reaproveitados
+    entre os ciclos, mantendo conexões, token e cadastros em memória.
+    SIGINT/SIGTERM encerram o daemon depois do ciclo em andamento.
+    
+    Args:
+        incremental (bool): Processa apenas pedidos novos ou alterados em cada ciclo
+        
+    Returns:
+        bool: False se a agenda for inválida ou vazia
+    """
+    setup_logging()
+    logger = logging.getLogger(__name__)
+    
+    api_client = APIClient()
+    whatsapp_sender = WhatsAppSender()
+    data_processor = DataProcessor()
+    
+    try:
+        agenda = carregar_agenda(whatsapp_sender.grupos_config)
+    except ValueError as e:
+        logger.error(f"Agenda inválida: {str(e)}")
+        return False
+    
+    if not agenda:
+        logger.error("Agenda vazia: nenhuma UF configurada em config.json")
+        return False
+    
+    for cron, ufs in agenda:
+        logger.info(f"Agenda '{cron.expressao}': {', '.join(sorted(ufs))}")
+    
+    parar = threading.Event()
+    
+    def sinalizar_parada(signum, frame):
+        logger.info("Sinal de parada recebido; encerrando após o ciclo em andamento")
+        parar.set()
+    
+    signal.signal(signal.SIGINT, sinalizar_parada)
+    signal.signal(signal.SIGTERM, sinalizar_parada)
+    
+    def ciclo(ufs):
+        main(incremental=incremental, api_client=api_client, whatsapp_sender=whatsapp_sender,
+             data_processor=data_processor, ufs=ufs)
+    
+    try:
+        # A agenda é relida a cada verificação para refletir mudanças em config.json
+        Agendador(lambda: carregar_agenda(whatsapp_sender.grupos_config)).executar(ciclo, parar)
+    finally:
+        if whatsapp_sender.outbox is not None:
+            whatsapp_sender.outbox.fechar()
+        api_client.session.close()
+        whatsapp_sender.session.close()
+    
+    return True
+
+def executar_mock(incremental=False, ufs=None):
+    """
+    Executa o fluxo completo contra o servidor simulado das APIs
+    
+    Usa caches de token e de cadastros e estado incremental separados, caixa
+    de saída em memória e não grava o histórico, para não misturar dados
+    sintéticos com os reais.
+    
+    Args:
+        incremental (bool): Processa apenas pedidos novos ou alterados
+        ufs (set): Gera apenas os relatórios destas UFs
+        
+    Returns:
+        bool: Resultado de main()
+    """
+    from mock_server import ServidorSimulado
+    
+    servidor = ServidorSimulado().iniciar()
+    try:
+        api_client = APIClient(
+            base_url=servidor.api_base_url,
+            token_cache=TokenCache(caminho=f"{TOKEN_CACHE_PATH}.mock", base_url=servidor.api_base_url),
+            cache_mestres=CacheDadosMestres(diretorio=os.path.join(MASTER_CACHE_DIR, 'mock'))
+        )
+        whatsapp_sender = WhatsAppSender(api_url=servidor.whatsapp_api_url, outbox=CaixaSaida(':memory:'))
+        return main(incremental=incremental, ufs=ufs, api_client=api_client, whatsapp_sender=whatsapp_sender,
+                    armazenar=False, caminho_estado=f"{INCREMENTAL_STATE_PATH}.mock")
+    finally:
+        logging.getLogger(__name__).info(f"Servidor simulado: {servidor.estatisticas}")
+        servidor.parar()
+
+def executar_replay(caminho, ufs=None):
+    """
+    Executa o fluxo completo a partir de um snapshot, sem acessar a rede
+    
+    As consultas são respondidas pelo snapshot gravado com SNAPSHOT_GRAVAR e
+    as mensagens vão para um destino simulado, gravadas em <snapshot>.envios.jsonl.
+    Como no modo --mock, o histórico não é gravado e a caixa de saída fica em memória.
+    Os relatórios levam a data gravada no snapshot, não a data da execução.
+    
+    Args:
+        caminho (str): Arquivo .jsonl.gz do snapshot
+        ufs (set): Gera apenas os relatórios destas UFs
+        
+    Returns:
+        bool: Resultado de main()
+    """
+    from snapshots import AdaptadorReplay, DestinoSimulado, cliente_replay, criar_sessao_simulada
+    
+    setup_logging()
+    logger = logging.getLogger(__name__)
+    
+    try:
+        adaptador = AdaptadorReplay(caminho)
+    except (OSError, ValueError) as e:
+        logger.error(f"Snapshot inválido ({caminho}): {str(e)}")
+        return False
+    
+    api_client = cliente_replay(adaptador)
+    if adaptador.data_emissao is None:
+        logger.warning("Snapshot sem um único dia gravado: relatórios com a data atual")
+    
+    base = caminho[:-len('.jsonl.gz')] if caminho.endswith('.jsonl.gz') else caminho
+    destino = DestinoSimulado(f"{base}.envios.jsonl")
+    whatsapp_sender = WhatsAppSender(session=criar_sessao_simulada(destino), outbox=CaixaSaida(':memory:'),
+                                     data_relatorio=adaptador.data_emissao)
+    
+    # Os cadastros também vêm do snapshot, nunca do cache da execução real
+    sucesso = main(atualizar_cadastros=True, ufs=ufs, api_client=api_client,
+                   whatsapp_sender=whatsapp_sender, armazenar=False)
+    logger.info(f"Replay: {len(destino.envios)} mensagens simuladas gravadas em {destino.caminho}")
+    return sucesso
+
 def test_apis():
     """Função para testar conectividade com as APIs"""
     setup_logging()
@@ -169,9 +648,70 @@ def test_apis():
     else:
         logger.error("❌ WhatsApp API: FALHA")
 
+def interpretar_ufs(texto):
+    """
+    Converte a lista de UFs da linha de comando (ex.: "CE,PI") em conjunto
+    
+    Args:
+        texto (str): UFs separadas por vírgula
+        
+    Returns:
+        set: Siglas em maiúsculas
+    """
+    ufs = {uf.strip().upper() for uf in texto.split(',') if uf.strip()}
+    if not ufs:
+        raise argparse.ArgumentTypeError("informe ao menos uma UF")
+    return ufs
+
+def parse_args():
+    """Interpreta os argumentos de linha de comando"""
+    parser = argparse.ArgumentParser(description="Resumo de vendas via WhatsApp")
+    parser.add_argument('--test', action='store_true', help="Testa a conectividade com as APIs")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Processa apenas pedidos novos ou alterados desde a última execução do dia")
+    parser.add_argument('--atualizar-cadastros', action='store_true',
+                        help="Ignora o cache e consulta vendedores e empresas na API")
+    parser.add_argument('--daemon', action='store_true',
+                        help="Mantém o processo ativo e executa nos horários da agenda (DAEMON_AGENDA / config.json)")
+    parser.add_argument('--mock', action='store_true',
+                        help="Executa contra o servidor simulado das APIs (mock_server.py)")
+    parser.add_argument('--replay', metavar='SNAPSHOT',
+                        help="Executa a partir de um snapshot gravado com SNAPSHOT_GRAVAR, sem rede e sem enviar mensagens")
+    parser.add_argument('--uf', dest='ufs', type=interpretar_ufs, metavar='UFS',
+                        help="Gera e envia apenas os relatórios destas UFs (ex.: CE,PI), consultando só as empresas delas")
+    parser.add_argument('--from', dest='inicio', type=interpretar_data, metavar='DATA',
+                        help="Backfill: data inicial (DD/MM/YYYY ou YYYY-MM-DD)")
+    parser.add_argument('--to', dest='fim', type=interpretar_data, metavar='DATA',
+                        help="Backfill: data final, inclusiva (padrão: hoje)")
+    args = parser.parse_args()
+    
+    if args.fim and not args.inicio:
+        parser.error("--to exige --from")
+    if args.inicio and args.inicio > (args.fim or date.today()):
+        parser.error("--from deve ser anterior ou igual a --to")
+    if args.ufs and (args.daemon or args.inicio or args.test):
+        parser.error("--uf não pode ser combinado com --daemon, --from ou --test")
+    if args.replay and (args.daemon or args.inicio or args.test or args.mock or args.incremental):
+        parser.error("--replay não pode ser combinado com --daemon, --from, --test, --mock ou --incremental")
+    
+    return args
+
 if __name__ == "__main__":
-    if len(sys.argv) > 1 and sys.argv[1] == "--test":
+    args = parse_args()
+    if args.test:
         test_apis()
+    elif args.daemon:
+        success = executar_daemon(incremental=args.incremental)
+        sys.exit(0 if success else 1)
+    elif args.replay:
+        success = executar_replay(args.replay, ufs=args.ufs)
+        sys.exit(0 if success else 1)
+    elif args.mock:
+        success = executar_mock(incremental=args.incremental, ufs=args.ufs)
+        sys.exit(0 if success else 1)
+    elif args.inicio:
+        success = executar_backfill(args.inicio, args.fim or date.today(), atualizar_cadastros=args.atualizar_cadastros)
+        sys.exit(0 if success else 1)
     else:
-        success = main()
+        success = main(incremental=args.incremental, atualizar_cadastros=args.atualizar_cadastros, ufs=args.ufs)
         sys.exit(0 if success else 1)
\ No newline at end of file
@@ -0,0 +1,117 @@
+"""
+Cache local dos dados mestres (vendedores e empresas)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from config import MASTER_CACHE_DIR, MASTER_CACHE_TTL
+
+class CacheDadosMestres:
+    """Cache em disco, com TTL, de cadastros que mudam pouco"""
+    
+    def __init__(self, diretorio=None, ttl=None):
+        self.diretorio = diretorio or MASTER_CACHE_DIR
+        self.ttl = MASTER_CACHE_TTL if ttl is None else ttl
+        self.logger = logging.getLogger(__name__)
+        # nome -> (hash, dados, atualizado_em); mantém o mesmo objeto enquanto o conteúdo não muda
+        self._memoria = {}
+        self._lock = threading.Lock()
+    
+    def _caminho(self, nome):
+        return os.path.join(self.diretorio, f"{nome}.json")
+    
+    @staticmethod
+    def calcular_hash(dados):
+        """
+        Calcula hash do conteúdo para detectar alterações
+        
+        Args:
+            dados (list): Registros
+            
+        Returns:
+            str: Hash SHA-256 do conteúdo
+        """
+        conteudo = json.dumps(dados, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+    
+    def _ler(self, nome):
+        """
+        Lê a entrada do cache (memória ou disco)
+        
+        Returns:
+            tuple: (hash, dados, atualizado_em) ou None
+        """
+        if nome in self._memoria:
+            return self._memoria[nome]
+        
+        try:
+            with open(self._caminho(nome), 'r', encoding='utf-8') as f:
+                entrada = json.load(f)
+            registro = (entrada['hash'], entrada['dados'], float(entrada['atualizado_em']))
+            self._memoria[nome] = registro
+            return registro
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.warning(f"Cache de {nome} inválido, ignorando: {str(e)}")
+            return None
+    
+    def _gravar(self, nome, hash_dados, dados, atualizado_em):
+        try:
+            os.makedirs(self.diretorio, exist_ok=True)
+            temporario = f"{self._caminho(nome)}.tmp"
+            with open(temporario, 'w', encoding='utf-8') as f:
+                json.dump({'hash': hash_dados, 'atualizado_em': atualizado_em, 'dados': dados}, f, ensure_ascii=False)
+            os.replace(temporario, self._caminho(nome))
+        except Exception as e:
+            self.logger.warning(f"Não foi possível gravar o cache de {nome}: {str(e)}")
+    
+    def obter(self, nome, carregador, forcar=False):
+        """
+        Retorna dados do cache ou os recarrega da API quando expirados
+        
+        Se a consulta falhar, a última versão em cache é usada mesmo expirada.
+        Enquanto o conteúdo não muda, a mesma lista é retornada, permitindo
+        que índices construídos sobre ela sejam reaproveitados.
+        
+        Args:
+            nome (str): Nome do cadastro ('vendedores', 'empresas')
+            carregador (callable): Função que consulta a API e retorna lista ou None
+            forcar (bool): Ignora o TTL e recarrega da API
+            
+        Returns:
+            list: Registros ou None se não houver dados disponíveis
+        """
+        with self._lock:
+            entrada = self._ler(nome)
+        
+        if entrada and not forcar and time.time() - entrada[2] < self.ttl:
+            self.logger.info(f"Cadastro de {nome} obtido do cache ({len(entrada[1])} registros)")
+            return entrada[1]
+        
+        dados = carregador()
+        
+        if dados is None:
+            if entrada:
+                self.logger.warning(f"Falha ao atualizar {nome}; usando versão em cache")
+                return entrada[1]
+            return None
+        
+        hash_dados = self.calcular_hash(dados)
+        agora = time.time()
+        
+        if entrada and entrada[0] == hash_dados:
+            self.logger.info(f"Cadastro de {nome} sem alterações")
+            dados = entrada[1]
+        else:
+            self.logger.info(f"Cadastro de {nome} atualizado ({len(dados)} registros)")
+        
+        with self._lock:
+            self._memoria[nome] = (hash_dados, dados, agora)
+            self._gravar(nome, hash_dados, dados, agora)
+        
+        return dados
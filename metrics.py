@@ -0,0 +1,284 @@
+"""
+Métricas de execução: duração das etapas, chamadas HTTP, linhas processadas e envios
+
+As métricas de cada execução são exportadas como relatório JSON e, se
+configurado, como arquivo texto do node_exporter (Prometheus textfile collector).
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlparse
+from config import METRICAS_ATIVAS, METRICAS_DIR, METRICAS_MAX_ARQUIVOS, METRICAS_PROMETHEUS_PATH
+
+PREFIXO_PROMETHEUS = "resumo_vendas"
+
+def _percentil(valores, fracao):
+    """Percentil por posição em uma lista ordenada (sem interpolação)"""
+    if not valores:
+        return 0.0
+    return valores[min(len(valores) - 1, int(fracao * len(valores)))]
+
+def _rotulos(**rotulos):
+    """Formata rótulos no padrão Prometheus"""
+    pares = []
+    for nome, valor in rotulos.items():
+        texto = str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pares.append(f'{nome}="{texto}"')
+    return '{' + ','.join(pares) + '}'
+
+class ColetorMetricas:
+    """Acumula as métricas de uma execução (thread-safe)"""
+    
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self.reiniciar()
+    
+    def reiniciar(self):
+        """Descarta as métricas acumuladas e inicia uma nova execução"""
+        with self._lock:
+            self.inicio = time.time()
+            self._inicio_monotonico = time.perf_counter()
+            self._etapa_atual = None
+            # etapa -> segundos
+            self.etapas = {}
+            # endpoint -> {'status': {codigo: n}, 'latencias': [...], 'bytes': n}
+            self.http = {}
+            # passo -> {'entrada': n, 'saida': n}
+            self.linhas = {}
+            # uf -> {'latencia': s, 'sucesso': bool}
+            self.envios = {}
+            # nome -> valor
+            self.valores = {}
+    
+    def _somar_etapa(self, nome, duracao):
+        self.etapas[nome] = self.etapas.get(nome, 0.0) + duracao
+    
+    def marcar_etapa(self, nome):
+        """
+        Encerra a etapa em andamento (se houver) e inicia outra
+        
+        Args:
+            nome (str): Nome da nova etapa, ou None para apenas encerrar a atual
+        """
+        agora = time.perf_counter()
+        with self._lock:
+            if self._etapa_atual is not None:
+                anterior, inicio = self._etapa_atual
+                self._somar_etapa(anterior, agora - inicio)
+            self._etapa_atual = (nome, agora) if nome is not None else None
+    
+    def registrar_http(self, endpoint, status, latencia, tamanho):
+        """
+        Registra uma resposta HTTP
+        
+        Args:
+            endpoint (str): Nome do endpoint
+            status (int): Status da resposta
+            latencia (float): Tempo até receber os headers, em segundos
+            tamanho (int): Tamanho do corpo em bytes
+        """
+        with self._lock:
+            dados = self.http.setdefault(endpoint, {'status': {}, 'latencias': [], 'bytes': 0})
+            dados['status'][status] = dados['status'].get(status, 0) + 1
+            dados['latencias'].append(latencia)
+            dados['bytes'] += tamanho
+    
+    def gancho_resposta(self, resposta, *args, **kwargs):
+        """
+        Hook de resposta do requests (session.hooks['response'])
+        
+        O tamanho vem do header Content-Length para não consumir respostas
+        em streaming; respostas sem o header contam 0 bytes.
+        """
+        endpoint = urlparse(resposta.url).path.rstrip('/').rsplit('/', 1)[-1] or '/'
+        try:
+            tamanho = int(resposta.headers.get('Content-Length') or 0)
+        except ValueError:
+            tamanho = 0
+        self.registrar_http(endpoint, resposta.status_code, resposta.elapsed.total_seconds(), tamanho)
+    
+    def registrar_linhas(self, passo, entrada, saida):
+        """
+        Registra quantas linhas entraram e saíram de um passo do processamento
+        
+        Args:
+            passo (str): Nome do passo
+            entrada (int): Linhas recebidas
+            saida (int): Linhas produzidas
+        """
+        with self._lock:
+            dados = self.linhas.setdefault(passo, {'entrada': 0, 'saida': 0})
+            dados['entrada'] += entrada
+            dados['saida'] += saida
+    
+    def registrar_envio(self, uf, latencia, sucesso):
+        """
+        Registra o envio do relatório de uma UF
+        
+        Args:
+            uf (str): UF do relatório
+            latencia (float): Duração do envio em segundos
+            sucesso (bool): Se o envio foi concluído
+        """
+        with self._lock:
+            self.envios[uf] = {'latencia': latencia, 'sucesso': bool(sucesso)}
+    
+    def definir(self, nome, valor):
+        """
+        Define um valor numérico da execução (ex.: vendas_processadas)
+        
+        Args:
+            nome (str): Nome da métrica
+            valor (float): Valor
+        """
+        with self._lock:
+            self.valores[nome] = valor
+    
+    def relatorio(self):
+        """
+        Monta o relatório da execução
+        
+        Returns:
+            dict: Métricas prontas para serialização
+        """
+        with self._lock:
+            http = {}
+            for endpoint, dados in self.http.items():
+                latencias = sorted(dados['latencias'])
+                http[endpoint] = {
+                    'requisicoes': len(latencias),
+                    'status': {str(codigo): n for codigo, n in sorted(dados['status'].items())},
+                    'bytes': dados['bytes'],
+                    'latencia_media': sum(latencias) / len(latencias) if latencias else 0.0,
+                    'latencia_p50': _percentil(latencias, 0.5),
+                    'latencia_p95': _percentil(latencias, 0.95),
+                    'latencia_max': latencias[-1] if latencias else 0.0
+                }
+            
+            return {
+                'inicio': datetime.fromtimestamp(self.inicio).isoformat(timespec='seconds'),
+                'duracao': time.perf_counter() - self._inicio_monotonico,
+                'etapas': dict(self.etapas),
+                'http': http,
+                'linhas': {passo: dict(dados) for passo, dados in self.linhas.items()},
+                'envios': {uf: dict(dados) for uf, dados in self.envios.items()},
+                'valores': dict(self.valores)
+            }
+    
+    def formatar_prometheus(self, relatorio=None):
+        """
+        Converte o relatório para o formato texto do Prometheus
+        
+        Args:
+            relatorio (dict): Relatório de relatorio(). Se None, é gerado aqui
+            
+        Returns:
+            str: Conteúdo do arquivo .prom
+        """
+        relatorio = relatorio or self.relatorio()
+        p = PREFIXO_PROMETHEUS
+        linhas = []
+        
+        def metrica(nome, tipo, ajuda, amostras):
+            linhas.append(f"# HELP {p}_{nome} {ajuda}")
+            linhas.append(f"# TYPE {p}_{nome} {tipo}")
+            for rotulos, valor in amostras:
+                linhas.append(f"{p}_{nome}{rotulos} {valor}")
+        
+        metrica('execucao_inicio_timestamp_segundos', 'gauge', "Início da última execução",
+                [('', self.inicio)])
+        metrica('execucao_duracao_segundos', 'gauge', "Duração da última execução",
+                [('', relatorio['duracao'])])
+        metrica('etapa_duracao_segundos', 'gauge', "Duração de cada etapa",
+                [(_rotulos(etapa=etapa), duracao) for etapa, duracao in relatorio['etapas'].items()])
+        metrica('http_respostas', 'gauge', "Respostas HTTP por endpoint e status",
+                [(_rotulos(endpoint=endpoint, status=status), n)
+                 for endpoint, dados in relatorio['http'].items() for status, n in dados['status'].items()])
+        metrica('http_bytes', 'gauge', "Bytes recebidos por endpoint",
+                [(_rotulos(endpoint=endpoint), dados['bytes']) for endpoint, dados in relatorio['http'].items()])
+        metrica('http_latencia_segundos', 'gauge', "Latência HTTP por endpoint (média, p50, p95, máxima)",
+                [(_rotulos(endpoint=endpoint, estatistica=estatistica), dados[f'latencia_{estatistica}'])
+                 for endpoint, dados in relatorio['http'].items() for estatistica in ('media', 'p50', 'p95', 'max')])
+        metrica('linhas', 'gauge', "Linhas recebidas e produzidas por passo do processamento",
+                [(_rotulos(passo=passo, direcao=direcao), n)
+                 for passo, dados in relatorio['linhas'].items() for direcao, n in dados.items()])
+        metrica('envio_latencia_segundos', 'gauge', "Duração do envio do relatório por UF",
+                [(_rotulos(uf=uf), dados['latencia']) for uf, dados in relatorio['envios'].items()])
+        metrica('envio_sucesso', 'gauge', "Envio do relatório concluído (1) ou não (0) por UF",
+                [(_rotulos(uf=uf), int(dados['sucesso'])) for uf, dados in relatorio['envios'].items()])
+        for nome, valor in relatorio['valores'].items():
+            metrica(nome, 'gauge', nome.replace('_', ' ').capitalize(), [('', valor)])
+        
+        return '\n'.join(linhas) + '\n'
+    
+    def _remover_antigos(self, diretorio, maximo):
+        """
+        Mantém apenas os relatórios JSON mais recentes do diretório
+        
+        Args:
+            diretorio (str): Pasta dos relatórios JSON
+            maximo (int): Quantidade mantida (0 = sem limite)
+        """
+        if maximo <= 0:
+            return
+        
+        # O nome contém data e hora, então a ordem alfabética é a cronológica
+        relatorios = sorted(nome for nome in os.listdir(diretorio)
+                            if nome.startswith('execucao_') and nome.endswith('.json'))
+        for nome in relatorios[:-maximo]:
+            try:
+                os.remove(os.path.join(diretorio, nome))
+            except OSError as e:
+                self.logger.warning(f"Não foi possível remover o relatório de métricas {nome}: {str(e)}")
+    
+    def exportar(self, diretorio=None, caminho_prometheus=None):
+        """
+        Encerra a etapa em andamento e grava o relatório JSON e o arquivo Prometheus
+        
+        Relatórios JSON além de METRICAS_MAX_ARQUIVOS são removidos, dos mais
+        antigos para os mais novos. Erros de gravação são apenas registrados no log.
+        
+        Args:
+            diretorio (str): Pasta dos relatórios JSON. Se None, usa METRICAS_DIR
+            caminho_prometheus (str): Arquivo .prom. Se None, usa METRICAS_PROMETHEUS_PATH (vazio = não grava)
+            
+        Returns:
+            dict: Relatório exportado
+        """
+        self.marcar_etapa(None)
+        relatorio = self.relatorio()
+        
+        if not METRICAS_ATIVAS:
+            return relatorio
+        
+        diretorio = diretorio or METRICAS_DIR
+        caminho_prometheus = METRICAS_PROMETHEUS_PATH if caminho_prometheus is None else caminho_prometheus
+        
+        try:
+            os.makedirs(diretorio, exist_ok=True)
+            nome = datetime.fromtimestamp(self.inicio).strftime('execucao_%Y%m%d_%H%M%S.json')
+            with open(os.path.join(diretorio, nome), 'w', encoding='utf-8') as f:
+                json.dump(relatorio, f, ensure_ascii=False, indent=2)
+            self._remover_antigos(diretorio, METRICAS_MAX_ARQUIVOS)
+        except OSError as e:
+            self.logger.warning(f"Não foi possível gravar o relatório de métricas: {str(e)}")
+        
+        if caminho_prometheus:
+            # Grava em arquivo temporário e renomeia para o coletor nunca ler um arquivo parcial
+            temporario = f"{caminho_prometheus}.{os.getpid()}.tmp"
+            try:
+                with open(temporario, 'w', encoding='utf-8') as f:
+                    f.write(self.formatar_prometheus(relatorio))
+                os.replace(temporario, caminho_prometheus)
+            except OSError as e:
+                self.logger.warning(f"Não foi possível gravar as métricas Prometheus: {str(e)}")
+        
+        return relatorio
+
+# Coletor usado pelos módulos do sistema (reiniciado a cada execução)
+coletor = ColetorMetricas()
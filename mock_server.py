@@ -0,0 +1,306 @@
+"""
+Servidor local que simula as APIs WMW e WhatsApp para testes de carga
+
+Implementa /oauth/token, /integration/v1/fetch/{pedido,representante,empresa}
+e /api/messages/send com latência, taxa de erro, limite de requisições,
+volume de dados e compressão gzip/deflate configuráveis.
+
+Uso:
+    python mock_server.py --porta 8099 --vendas 20000 --latencia-ms 80 --taxa-erro 0.02
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import random
+import threading
+import time
+import zlib
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from config import MOCK_VENDAS, MOCK_LATENCIA_MS, MOCK_JITTER_MS, MOCK_TAXA_ERRO, MOCK_LIMITE_REQ_S, MOCK_COMPRESSAO
+from query_filters import filtrar_registros, normalizar_filtros
+from rate_limiter import LimitadorTaxa
+from synthetic_data import GeradorDadosSinteticos
+
+PREFIXO_WMW = "/lubnordws"
+
+class ServidorSimulado:
+    """Simulador das APIs WMW e WhatsApp executado em uma thread"""
+    
+    def __init__(self, host='127.0.0.1', porta=0, vendas=None, latencia_ms=None, jitter_ms=None,
+                 taxa_erro=None, limite_req_s=None, semente=42, validade_token=3600, compressao=None):
+        """
+        Args:
+            host (str): Endereço de escuta
+            porta (int): Porta (0 = escolhida pelo sistema)
+            vendas (int): Pedidos gerados por dia consultado
+            latencia_ms (float): Latência base de cada resposta
+            jitter_ms (float): Média da latência extra (exponencial, gera cauda)
+            taxa_erro (float): Probabilidade de responder 503
+            limite_req_s (float): Requisições por segundo antes de responder 429 (0 = sem limite)
+            semente (int): Semente dos dados e das falhas
+            validade_token (int): Validade dos tokens emitidos, em segundos
+            compressao (bool): Comprime as respostas com gzip/deflate quando o cliente aceita
+        """
+        self.vendas = MOCK_VENDAS if vendas is None else vendas
+        self.latencia = (MOCK_LATENCIA_MS if latencia_ms is None else latencia_ms) / 1000
+        self.jitter = (MOCK_JITTER_MS if jitter_ms is None else jitter_ms) / 1000
+        self.taxa_erro = MOCK_TAXA_ERRO if taxa_erro is None else taxa_erro
+        limite = MOCK_LIMITE_REQ_S if limite_req_s is None else limite_req_s
+        self.limitador = LimitadorTaxa(limite, max(1, int(limite)))
+        self.semente = semente
+        self.validade_token = validade_token
+        self.compressao = MOCK_COMPRESSAO if compressao is None else compressao
+        self.aleatorio = random.Random(semente)
+        self.logger = logging.getLogger(__name__)
+        
+        gerador = GeradorDadosSinteticos(semente=semente)
+        self.empresas = gerador.gerar_empresas()
+        self.vendedores = gerador.gerar_vendedores(self.empresas)
+        self._vendas_por_data = {}
+        self._tokens = {}
+        self._lock = threading.Lock()
+        
+        # Contadores por endpoint: requisições e respostas por status
+        self.estatisticas = {}
+        
+        self.httpd = ThreadingHTTPServer((host, porta), _criar_handler(self))
+        self.httpd.daemon_threads = True
+        self._thread = None
+    
+    @property
+    def url(self):
+        host, porta = self.httpd.server_address[:2]
+        return f"http://{host}:{porta}"
+    
+    @property
+    def api_base_url(self):
+        """URL a usar como API_BASE_URL"""
+        return f"{self.url}{PREFIXO_WMW}"
+    
+    @property
+    def whatsapp_api_url(self):
+        """URL a usar como WHATSAPP_API_URL"""
+        return f"{self.url}/api/messages/send"
+    
+    def iniciar(self):
+        """Inicia o servidor em uma thread de fundo"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='mock-server', daemon=True)
+        self._thread.start()
+        self.logger.info(f"Servidor simulado em {self.url}")
+        return self
+    
+    def parar(self):
+        """Encerra o servidor"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+    
+    def vendas_do_dia(self, data_emissao):
+        """
+        Gera (uma vez) os pedidos sintéticos de uma data
+        
+        Args:
+            data_emissao (str): Data no formato DD/MM/YYYY
+            
+        Returns:
+            list: Pedidos do dia
+        """
+        with self._lock:
+            if data_emissao not in self._vendas_por_data:
+                semente = int(hashlib.md5(f"{self.semente}|{data_emissao}".encode()).hexdigest()[:8], 16)
+                gerador = GeradorDadosSinteticos(semente=semente)
+                data = datetime.strptime(data_emissao, "%d/%m/%Y").date()
+                self._vendas_por_data[data_emissao] = list(
+                    gerador.iter_vendas(self.vendas, self.vendedores, self.empresas, data)
+                )
+            return self._vendas_por_data[data_emissao]
+    
+    def emitir_token(self):
+        with self._lock:
+            token = f"mock-{len(self._tokens) + 1}-{self.aleatorio.getrandbits(32):08x}"
+            self._tokens[token] = time.time() + self.validade_token
+        return {'access_token': token, 'token_type': 'bearer', 'expires_in': self.validade_token}
+    
+    def token_valido(self, authorization):
+        token = (authorization or '').replace('Bearer ', '', 1)
+        with self._lock:
+            return self._tokens.get(token, 0) > time.time()
+    
+    def registrar(self, endpoint, status):
+        with self._lock:
+            contadores = self.estatisticas.setdefault(endpoint, {})
+            contadores[status] = contadores.get(status, 0) + 1
+    
+    def simular_condicoes(self):
+        """
+        Aplica latência, limite de requisições e falhas aleatórias
+        
+        Returns:
+            tuple: (status, headers extras) de erro, ou None para seguir normalmente
+        """
+        permitido, espera = self.limitador.tentar_adquirir()
+        if not permitido:
+            return 429, {'Retry-After': str(max(1, round(espera)))}
+        
+        with self._lock:
+            atraso = self.latencia + (self.aleatorio.expovariate(1 / self.jitter) if self.jitter else 0)
+            falhar = self.aleatorio.random() < self.taxa_erro
+        time.sleep(atraso)
+        
+        if falhar:
+            return 503, {}
+        return None
+
+def _criar_handler(simulador):
+    """Cria a classe de handler ligada a um simulador"""
+    
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        
+        def log_message(self, formato, *args):
+            simulador.logger.debug(formato % args)
+        
+        def _codificacao(self):
+            if not simulador.compressao:
+                return None
+            aceitas = {parte.split(';')[0].strip().lower() for parte in self.headers.get('Accept-Encoding', '').split(',')}
+            for codificacao in ('gzip', 'deflate'):
+                if codificacao in aceitas:
+                    return codificacao
+            return None
+        
+        def _responder(self, endpoint, status, corpo=None, headers=None):
+            conteudo = json.dumps(corpo if corpo is not None else {}).encode('utf-8')
+            codificacao = self._codificacao()
+            if codificacao == 'gzip':
+                conteudo = gzip.compress(conteudo, compresslevel=6)
+            elif codificacao == 'deflate':
+                conteudo = zlib.compress(conteudo, 6)
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            if codificacao:
+                self.send_header('Content-Encoding', codificacao)
+            self.send_header('Content-Length', str(len(conteudo)))
+            for nome, valor in (headers or {}).items():
+                self.send_header(nome, valor)
+            self.end_headers()
+            self.wfile.write(conteudo)
+            simulador.registrar(endpoint, status)
+        
+        def _ler_corpo(self):
+            tamanho = int(self.headers.get('Content-Length') or 0)
+            return self.rfile.read(tamanho) if tamanho else b''
+        
+        def do_GET(self):
+            self._ler_corpo()
+            caminho = urlparse(self.path).path
+            # O teste de conexão do WhatsApp aceita 404 na URL base
+            self._responder(caminho, 404, {'error': 'not found'})
+        
+        def do_POST(self):
+            corpo = self._ler_corpo()
+            caminho = urlparse(self.path).path
+            
+            erro = simulador.simular_condicoes()
+            if erro:
+                status, headers = erro
+                self._responder(caminho, status, {'error': 'simulado'}, headers)
+                return
+            
+            if caminho == f"{PREFIXO_WMW}/oauth/token":
+                dados = parse_qs(corpo.decode('utf-8'))
+                if dados.get('grant_type') != ['password']:
+                    self._responder(caminho, 400, {'error': 'invalid_request'})
+                    return
+                self._responder(caminho, 200, simulador.emitir_token())
+                return
+            
+            if caminho == '/api/messages/send':
+                if not self.headers.get('Authorization'):
+                    self._responder(caminho, 401, {'error': 'unauthorized'})
+                    return
+                self._responder(caminho, 200, {'status': 'sent'})
+                return
+            
+            prefixo_fetch = f"{PREFIXO_WMW}/integration/v1/fetch/"
+            if not caminho.startswith(prefixo_fetch):
+                self._responder(caminho, 404, {'error': 'not found'})
+                return
+            
+            if not simulador.token_valido(self.headers.get('Authorization')):
+                self._responder(caminho, 401, {'error': 'invalid_token'})
+                return
+            
+            try:
+                payload = json.loads(corpo or b'{}')
+            except ValueError:
+                self._responder(caminho, 400, {'error': 'invalid json'})
+                return
+            
+            filtros = normalizar_filtros(payload.get('filters'))
+            recurso = caminho[len(prefixo_fetch):]
+            
+            if recurso == 'pedido':
+                data_emissao = filtros.get('DTEMISSAO') or datetime.now().strftime("%d/%m/%Y")
+                registros = simulador.vendas_do_dia(data_emissao)
+            elif recurso == 'representante':
+                registros = simulador.vendedores
+            elif recurso == 'empresa':
+                registros = simulador.empresas
+            else:
+                self._responder(caminho, 404, {'error': 'not found'})
+                return
+            
+            registros = filtrar_registros(registros, filtros)
+            
+            if 'limit' in payload:
+                offset = int(payload.get('offset') or 0)
+                registros = registros[offset:offset + int(payload['limit'])]
+            
+            campos = payload.get('fields')
+            if campos:
+                registros = [{campo: registro.get(campo) for campo in campos} for registro in registros]
+            
+            self._responder(caminho, 200, registros)
+    
+    return Handler
+
+def main():
+    """Executa o servidor simulado até Ctrl+C"""
+    parser = argparse.ArgumentParser(description="Servidor simulado das APIs WMW e WhatsApp")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--porta', type=int, default=8099)
+    parser.add_argument('--vendas', type=int, default=MOCK_VENDAS, help="Pedidos por dia")
+    parser.add_argument('--latencia-ms', type=float, default=MOCK_LATENCIA_MS, help="Latência base")
+    parser.add_argument('--jitter-ms', type=float, default=MOCK_JITTER_MS, help="Latência extra média (cauda)")
+    parser.add_argument('--taxa-erro', type=float, default=MOCK_TAXA_ERRO, help="Fração de respostas 503")
+    parser.add_argument('--limite-req-s', type=float, default=MOCK_LIMITE_REQ_S, help="Requisições/s antes de 429")
+    parser.add_argument('--sem-compressao', action='store_true', help="Não comprime as respostas")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    logger = logging.getLogger(__name__)
+    
+    servidor = ServidorSimulado(
+        host=args.host, porta=args.porta, vendas=args.vendas, latencia_ms=args.latencia_ms,
+        jitter_ms=args.jitter_ms, taxa_erro=args.taxa_erro, limite_req_s=args.limite_req_s,
+        compressao=False if args.sem_compressao else None
+    ).iniciar()
+    
+    logger.info(f"API_BASE_URL={servidor.api_base_url}")
+    logger.info(f"WHATSAPP_API_URL={servidor.whatsapp_api_url}")
+    
+    try:
+        while True:
+            time.sleep(60)
+            logger.info(f"Estatísticas: {servidor.estatisticas}")
+    except KeyboardInterrupt:
+        servidor.parar()
+        logger.info(f"Estatísticas finais: {servidor.estatisticas}")
+
+if __name__ == "__main__":
+    main()
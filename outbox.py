@@ -0,0 +1,144 @@
+"""
+Caixa de saída persistente (SQLite) para entrega idempotente de mensagens
+"""
+
+import logging
+import random
+import sqlite3
+import threading
+import time
+from config import OUTBOX_PATH, OUTBOX_MAX_TENTATIVAS, OUTBOX_BACKOFF_BASE, OUTBOX_BACKOFF_MAX, OUTBOX_VALIDADE
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS mensagens (
+    chave TEXT PRIMARY KEY,
+    uf TEXT NOT NULL,
+    numero TEXT NOT NULL,
+    mensagem TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pendente',
+    tentativas INTEGER NOT NULL DEFAULT 0,
+    proxima_tentativa REAL NOT NULL DEFAULT 0,
+    ultimo_erro TEXT,
+    criada_em REAL NOT NULL,
+    enviada_em REAL
+);
+CREATE INDEX IF NOT EXISTS idx_mensagens_status ON mensagens (status, proxima_tentativa);
+"""
+
+# Status possíveis de uma mensagem
+PENDENTE = 'pendente'
+ENVIADA = 'enviada'
+EXPIRADA = 'expirada'
+
+class CaixaSaida:
+    """Registro durável das mensagens a enviar e já enviadas"""
+    
+    def __init__(self, caminho=None):
+        self.caminho = caminho or OUTBOX_PATH
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self.conexao = sqlite3.connect(self.caminho, check_same_thread=False)
+        self.conexao.row_factory = sqlite3.Row
+        self.conexao.execute("PRAGMA journal_mode=WAL")
+        self.conexao.executescript(SCHEMA)
+    
+    def fechar(self):
+        """Fecha a conexão com o banco"""
+        self.conexao.close()
+    
+    def enfileirar(self, chave, uf, numero, mensagem, grupo=None):
+        """
+        Registra a mensagem, se ainda não existir
+        
+        Mensagens pendentes do mesmo grupo (ex.: relatório anterior da mesma
+        UF e data) são expiradas, para que só a versão mais recente seja enviada.
+        
+        Args:
+            chave (str): Chave de idempotência, iniciada por "<grupo>|"
+            uf (str): UF de destino
+            numero (str): Número do grupo
+            mensagem (str): Mensagem completa
+            grupo (str): Prefixo das chaves que esta mensagem substitui. Se None, nenhuma
+            
+        Returns:
+            str: Status atual da mensagem ('pendente', 'enviada' ou 'expirada')
+        """
+        with self._lock, self.conexao:
+            if grupo is not None:
+                prefixo = f"{grupo}|"
+                substituidas = self.conexao.execute(
+                    "UPDATE mensagens SET status = ? WHERE status = ? AND substr(chave, 1, ?) = ? AND chave != ?",
+                    (EXPIRADA, PENDENTE, len(prefixo), prefixo, chave)
+                ).rowcount
+                if substituidas:
+                    self.logger.info(f"{substituidas} mensagens pendentes de {grupo} substituídas pela versão atual")
+            self.conexao.execute(
+                "INSERT OR IGNORE INTO mensagens (chave, uf, numero, mensagem, criada_em) VALUES (?, ?, ?, ?, ?)",
+                (chave, uf, numero, mensagem, time.time())
+            )
+            linha = self.conexao.execute("SELECT status FROM mensagens WHERE chave = ?", (chave,)).fetchone()
+        return linha['status']
+    
+    def marcar_enviada(self, chave):
+        """
+        Marca a mensagem como entregue
+        
+        Args:
+            chave (str): Chave de idempotência
+        """
+        with self._lock, self.conexao:
+            self.conexao.execute(
+                "UPDATE mensagens SET status = ?, enviada_em = ?, tentativas = tentativas + 1 WHERE chave = ?",
+                (ENVIADA, time.time(), chave)
+            )
+    
+    def marcar_falha(self, chave, erro=None):
+        """
+        Registra uma tentativa sem sucesso e agenda a próxima com backoff exponencial
+        
+        Args:
+            chave (str): Chave de idempotência
+            erro (str): Descrição da falha
+            
+        Returns:
+            float: Segundos até a próxima tentativa, ou None se as tentativas se esgotaram
+        """
+        with self._lock, self.conexao:
+            linha = self.conexao.execute("SELECT tentativas FROM mensagens WHERE chave = ?", (chave,)).fetchone()
+            if linha is None:
+                return None
+            tentativas = linha['tentativas'] + 1
+            espera = min(OUTBOX_BACKOFF_MAX, OUTBOX_BACKOFF_BASE * 2 ** (tentativas - 1))
+            espera = random.uniform(espera / 2, espera)
+            self.conexao.execute(
+                "UPDATE mensagens SET tentativas = ?, proxima_tentativa = ?, ultimo_erro = ? WHERE chave = ?",
+                (tentativas, time.time() + espera, erro, chave)
+            )
+        return espera if tentativas < OUTBOX_MAX_TENTATIVAS else None
+    
+    def pendentes(self):
+        """
+        Lista as mensagens pendentes cuja próxima tentativa já venceu
+        
+        Mensagens mais antigas que OUTBOX_VALIDADE ou que esgotaram
+        OUTBOX_MAX_TENTATIVAS são marcadas como expiradas e não são reenviadas.
+        
+        Returns:
+            list: Mensagens (sqlite3.Row com chave, uf, numero, mensagem, tentativas)
+        """
+        agora = time.time()
+        with self._lock, self.conexao:
+            expiradas = self.conexao.execute(
+                "UPDATE mensagens SET status = ? WHERE status = ? AND (criada_em < ? OR tentativas >= ?)",
+                (EXPIRADA, PENDENTE, agora - OUTBOX_VALIDADE, OUTBOX_MAX_TENTATIVAS)
+            ).rowcount
+            linhas = self.conexao.execute(
+                "SELECT chave, uf, numero, mensagem, tentativas FROM mensagens "
+                "WHERE status = ? AND proxima_tentativa <= ? ORDER BY criada_em",
+                (PENDENTE, agora)
+            ).fetchall()
+        
+        if expiradas:
+            self.logger.warning(f"{expiradas} mensagens expiradas na caixa de saída")
+        
+        return linhas
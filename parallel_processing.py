@@ -0,0 +1,146 @@
+"""
+Agregação das vendas em vários processos, um fragmento por resposta da API
+
+Decodificar o JSON e converter os pedidos custa bem mais que somá-los, então
+cada fragmento viaja até o processo como o corpo da resposta (uma partição
+por empresa, ou o dia inteiro no backfill) e volta já agregado.
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from api_client import ErroAPI, extrair_registros
+from config import PROCESSAMENTO_PARALELO_MINIMO_KB, PROCESSAMENTO_PARALELO_WORKERS
+from data_processor import DataProcessor, acumular_pedido, agrupar_totais
+from json_backend import carregar
+from metrics import coletor
+from records import VendaRelacionada
+
+def processar_resposta(conteudo, vendedores_dict, empresas_dict, manter_registros=False):
+    """
+    Decodifica, relaciona e agrega o corpo de uma resposta de vendas
+    
+    Executada nos processos do pool, ou no principal para respostas pequenas.
+    
+    Args:
+        conteudo (bytes): Corpo JSON da consulta de vendas
+        vendedores_dict (dict): Vendedor por CDREPRESENTANTE (de criar_indices)
+        empresas_dict (dict): Empresa por CDEMPRESA (de criar_indices)
+        manter_registros (bool): Também retorna as vendas relacionadas
+    
+    Returns:
+        tuple: (totais UF -> consultor, tuplas com os campos de VendaRelacionada
+            ou None, quantidade de pedidos lidos)
+    
+    Raises:
+        ErroAPI: Se o corpo não for um JSON válido
+    """
+    try:
+        vendas = extrair_registros(carregar(conteudo))
+    except ValueError as e:
+        raise ErroAPI(f"Resposta de vendas inválida: {str(e)}")
+    
+    indices = (vendedores_dict, empresas_dict)
+    # (UF, consultor) -> [total, volume_total, quantidade]
+    totais = {}
+    registros = [] if manter_registros else None
+    
+    for venda in vendas:
+        relacionado = acumular_pedido(totais, venda, indices)
+        if relacionado is not None and registros is not None:
+            vendedor, empresa, valor, volume = relacionado
+            registros.append((empresa.sigla, vendedor.nome, valor, volume, venda.get('DTEMISSAO') or '',
+                              empresa.uf, venda.get('CDEMPRESA'), venda.get('CDREPRESENTANTE')))
+    
+    return agrupar_totais(totais), registros, len(vendas)
+
+class ProcessadorParalelo:
+    """Pool de processos que agrega respostas de vendas fora do processo principal"""
+    
+    def __init__(self, data_processor=None, max_workers=None, minimo_kb=None):
+        """
+        Args:
+            data_processor (DataProcessor): Processador usado na junção dos totais
+            max_workers (int): Processos do pool. Se None, PROCESSAMENTO_PARALELO_WORKERS
+                (0 = número de núcleos)
+            minimo_kb (int): Respostas menores são processadas no próprio processo.
+                Se None, PROCESSAMENTO_PARALELO_MINIMO_KB
+        """
+        self.data_processor = data_processor or DataProcessor()
+        self.max_workers = max_workers or PROCESSAMENTO_PARALELO_WORKERS or os.cpu_count() or 1
+        self.minimo_bytes = (PROCESSAMENTO_PARALELO_MINIMO_KB if minimo_kb is None else minimo_kb) * 1024
+        self.logger = logging.getLogger(__name__)
+        self._executor = None
+        self._lock = threading.Lock()
+    
+    def _obter_executor(self):
+        # Criado só quando alguma resposta passa do mínimo; "spawn" evita fork de um
+        # processo com threads (logs, HTTP) e é o único modo disponível no Windows
+        with self._lock:
+            if self._executor is None:
+                self.logger.info("Iniciando %d processos para a agregação", self.max_workers)
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._executor
+    
+    def fechar(self):
+        """Encerra os processos do pool, se tiverem sido criados"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+    
+    def processar_respostas(self, respostas, vendedores, empresas, indices=None, manter_registros=False):
+        """
+        Relaciona e agrega vendas a partir dos corpos das respostas da API
+        
+        Cada resposta é enviada ao pool assim que chega, enquanto as demais
+        ainda estão sendo consultadas, e os totais parciais são somados no fim.
+        
+        Args:
+            respostas (iterable): Corpos JSON (bytes), ex.: iter_vendas_particionado(bruto=True)
+            vendedores (list): Lista de vendedores
+            empresas (list): Lista de empresas com UF
+            indices (tuple): Índices de criar_indices(). Se None, são criados aqui
+            manter_registros (bool): Também retorna as vendas relacionadas
+        
+        Returns:
+            tuple: (totais UF -> consultor -> {'total', 'volume_total', 'quantidade'},
+                lista de vendas relacionadas ou None)
+        
+        Raises:
+            ErroAPI: Se alguma consulta falhar ou uma resposta for inválida
+        """
+        vendedores_dict, empresas_dict = indices or self.data_processor.criar_indices(vendedores, empresas)
+        
+        resultados = []
+        futuros = []
+        fragmentos = 0
+        try:
+            for conteudo in respostas:
+                fragmentos += 1
+                if len(conteudo) < self.minimo_bytes or self.max_workers < 2:
+                    resultados.append(processar_resposta(conteudo, vendedores_dict, empresas_dict, manter_registros))
+                else:
+                    futuros.append(self._obter_executor().submit(
+                        processar_resposta, conteudo, vendedores_dict, empresas_dict, manter_registros
+                    ))
+            resultados.extend(futuro.result() for futuro in futuros)
+        finally:
+            for futuro in futuros:
+                futuro.cancel()
+        
+        agregados = self.data_processor.somar_agregados(*(parcial for parcial, _, _ in resultados))
+        registros = None
+        if manter_registros:
+            registros = [VendaRelacionada(*registro) for _, parcial, _ in resultados for registro in parcial]
+        
+        lidas = sum(quantidade for _, _, quantidade in resultados)
+        relacionadas = sum(d['quantidade'] for consultores in agregados.values() for d in consultores.values())
+        self.logger.info("Relacionadas %d vendas válidas de %d totais (%d respostas, %d em outros processos)",
+                         relacionadas, lidas, fragmentos, len(futuros))
+        coletor.registrar_linhas('processar_respostas', lidas, relacionadas)
+        return agregados, registros
\ No newline at end of file
@@ -0,0 +1,24 @@
+"""
+Filtros das consultas às APIs WMW aplicados localmente
+
+Usados pelo servidor simulado (mock_server.py) e pelo replay de snapshots
+(snapshots.py) para responder às consultas como a API.
+"""
+
+# Filtros que a API aplica por conta própria e não restringem os registros
+FILTROS_IGNORADOS = ('FLATIVO', 'FLTIPOCADASTRO', 'DTEMISSAO')
+
+def normalizar_filtros(filtros):
+    """Aceita filtros como dict ou lista de {'property', 'value'}"""
+    if isinstance(filtros, list):
+        return {filtro.get('property'): filtro.get('value') for filtro in filtros}
+    return filtros or {}
+
+def filtrar_registros(registros, filtros):
+    """Aplica os filtros de igualdade da API (valor único ou lista de valores aceitos)"""
+    for campo, valor in filtros.items():
+        if campo in FILTROS_IGNORADOS:
+            continue
+        aceitos = {str(v) for v in valor} if isinstance(valor, list) else {str(valor)}
+        registros = [registro for registro in registros if str(registro.get(campo)) in aceitos]
+    return registros
\ No newline at end of file
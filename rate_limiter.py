@@ -0,0 +1,64 @@
+"""
+Limitador de taxa (token bucket) para chamadas a APIs externas
+"""
+
+import threading
+import time
+
+class LimitadorTaxa:
+    """Token bucket thread-safe: permite rajadas até a capacidade e depois uma taxa fixa"""
+    
+    def __init__(self, taxa, capacidade):
+        """
+        Args:
+            taxa (float): Fichas repostas por segundo (0 = sem limite)
+            capacidade (int): Máximo de fichas acumuladas (tamanho da rajada)
+        """
+        self.taxa = taxa
+        self.capacidade = max(1, capacidade)
+        self.fichas = float(self.capacidade)
+        self.ultima_reposicao = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _repor(self):
+        agora = time.monotonic()
+        self.fichas = min(self.capacidade, self.fichas + (agora - self.ultima_reposicao) * self.taxa)
+        self.ultima_reposicao = agora
+    
+    def tentar_adquirir(self):
+        """
+        Consome uma ficha se houver, sem bloquear
+        
+        Returns:
+            tuple: (True, 0) se consumiu, ou (False, segundos até a próxima ficha)
+        """
+        if self.taxa <= 0:
+            return True, 0.0
+        
+        with self._lock:
+            self._repor()
+            if self.fichas >= 1:
+                self.fichas -= 1
+                return True, 0.0
+            return False, (1 - self.fichas) / self.taxa
+    
+    def adquirir(self):
+        """
+        Aguarda até haver uma ficha disponível e a consome
+        
+        Returns:
+            float: Tempo de espera em segundos
+        """
+        if self.taxa <= 0:
+            return 0.0
+        
+        espera_total = 0.0
+        while True:
+            with self._lock:
+                self._repor()
+                if self.fichas >= 1:
+                    self.fichas -= 1
+                    return espera_total
+                espera = (1 - self.fichas) / self.taxa
+            time.sleep(espera)
+            espera_total += espera
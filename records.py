@@ -0,0 +1,273 @@
+"""
+Registros compactos (com __slots__) para pedidos, cadastros e vendas relacionadas
+
+Cada registro guarda os campos em atributos e números já convertidos, e
+strings repetidas (códigos, UF, base, consultor) são internadas. Para manter
+compatibilidade com o código que trata os registros como dict, todos
+aceitam leitura por nome de campo da API: registro.get('CDEMPRESA'),
+registro['UF'], dict(registro).
+"""
+
+import sys
+from collections.abc import Mapping
+from config import PEDIDO_CHAVE
+
+def converter_numero(valor_raw):
+    """
+    Converte valor numérico vindo da API (número ou texto) para float
+    
+    Args:
+        valor_raw (int|float|str): Valor bruto, possivelmente com "R$" e espaços
+        
+    Returns:
+        float: Valor convertido ou 0.0 se inválido
+    """
+    # Se já é número, usar diretamente
+    if isinstance(valor_raw, (int, float)):
+        return float(valor_raw)
+    
+    try:
+        # Se é string, limpar apenas caracteres de moeda
+        # Não remover pontos decimais - apenas converter
+        valor_limpo = str(valor_raw).replace('R$', '').replace(' ', '').strip()
+        return float(valor_limpo)
+    except (TypeError, ValueError):
+        return 0.0
+
+def converter_volume(volume_raw):
+    """
+    Converte volume vindo da API (número ou texto) para float
+    
+    Diferente de converter_numero, remove apenas espaços: a API não envia
+    volume com "R$", e um texto nesse formato conta como inválido.
+    
+    Args:
+        volume_raw (int|float|str): Volume bruto
+        
+    Returns:
+        float: Volume convertido ou 0.0 se inválido
+    """
+    # Se já é número, usar diretamente
+    if isinstance(volume_raw, (int, float)):
+        return float(volume_raw)
+    
+    try:
+        # Se é string, converter para float
+        volume_limpo = str(volume_raw).replace(' ', '').strip()
+        return float(volume_limpo)
+    except (TypeError, ValueError):
+        return 0.0
+
+def internar(valor):
+    """Interna strings para que valores repetidos compartilhem o mesmo objeto"""
+    return sys.intern(valor) if type(valor) is str else valor
+
+class Registro(Mapping):
+    """Base dos registros: leitura no estilo dict pelos nomes externos dos campos"""
+    
+    __slots__ = ()
+    
+    # Nome externo do campo -> atributo
+    CAMPOS = {}
+    
+    def __getitem__(self, nome):
+        atributo = self.CAMPOS.get(nome)
+        if atributo is None:
+            raise KeyError(nome)
+        return getattr(self, atributo)
+    
+    def get(self, nome, padrao=None):
+        atributo = self.CAMPOS.get(nome)
+        if atributo is None:
+            return padrao
+        valor = getattr(self, atributo)
+        return padrao if valor is None else valor
+    
+    def __iter__(self):
+        return iter(self.CAMPOS)
+    
+    def __len__(self):
+        return len(self.CAMPOS)
+    
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self)!r})"
+
+class Pedido(Registro):
+    """Pedido retornado pelo endpoint de vendas"""
+    
+    __slots__ = ('cdempresa', 'cdrepresentante', 'dtemissao', 'valor', 'volume', 'controle',
+                 'nupedido', 'cdusuarioemissao', 'florigempedido', 'cdtipopagamento', 'extras')
+    
+    CAMPOS = {
+        'CDEMPRESA': 'cdempresa',
+        'CDREPRESENTANTE': 'cdrepresentante',
+        'DTEMISSAO': 'dtemissao',
+        'VLTOTALPEDIDO': 'valor',
+        'VLVOLUMEPEDIDO': 'volume',
+        'FLCONTROLEERP': 'controle',
+        'NUPEDIDO': 'nupedido',
+        'CDUSUARIOEMISSAO': 'cdusuarioemissao',
+        'FLORIGEMPEDIDO': 'florigempedido',
+        'CDTIPOPAGAMENTO': 'cdtipopagamento'
+    }
+    
+    # Campos de PEDIDO_CHAVE sem atributo próprio, guardados em extras
+    CAMPOS_EXTRAS = tuple(sorted(set(PEDIDO_CHAVE) - set(CAMPOS)))
+    
+    def __init__(self, cdempresa, cdrepresentante, dtemissao, valor, volume, controle=None,
+                 nupedido=None, cdusuarioemissao=None, florigempedido=None, cdtipopagamento=None, extras=None):
+        self.cdempresa = cdempresa
+        self.cdrepresentante = cdrepresentante
+        self.dtemissao = dtemissao
+        self.valor = valor
+        self.volume = volume
+        self.controle = controle
+        self.nupedido = nupedido
+        self.cdusuarioemissao = cdusuarioemissao
+        self.florigempedido = florigempedido
+        self.cdtipopagamento = cdtipopagamento
+        self.extras = extras
+    
+    @classmethod
+    def de_api(cls, dados):
+        """
+        Converte o dict da API, internando códigos e convertendo valores
+        
+        Args:
+            dados (dict): Pedido como retornado pela API
+            
+        Returns:
+            Pedido: Registro compacto (o próprio objeto, se já for um Pedido)
+        """
+        if type(dados) is cls:
+            return dados
+        
+        extras = None
+        if cls.CAMPOS_EXTRAS:
+            extras = {campo: dados[campo] for campo in cls.CAMPOS_EXTRAS if campo in dados} or None
+        
+        return cls(
+            internar(dados.get('CDEMPRESA')),
+            internar(dados.get('CDREPRESENTANTE')),
+            internar(dados.get('DTEMISSAO')),
+            converter_numero(dados.get('VLTOTALPEDIDO', 0)),
+            converter_volume(dados.get('VLVOLUMEPEDIDO', 0)),
+            dados.get('FLCONTROLEERP'),
+            dados.get('NUPEDIDO'),
+            internar(dados.get('CDUSUARIOEMISSAO')),
+            internar(dados.get('FLORIGEMPEDIDO')),
+            internar(dados.get('CDTIPOPAGAMENTO')),
+            extras
+        )
+    
+    def get(self, nome, padrao=None):
+        if nome not in self.CAMPOS:
+            return self.extras.get(nome, padrao) if self.extras else padrao
+        return super().get(nome, padrao)
+    
+    def __getitem__(self, nome):
+        if nome not in self.CAMPOS and self.extras and nome in self.extras:
+            return self.extras[nome]
+        return super().__getitem__(nome)
+    
+    def __iter__(self):
+        yield from self.CAMPOS
+        if self.extras:
+            yield from self.extras
+    
+    def __len__(self):
+        return len(self.CAMPOS) + len(self.extras or ())
+
+class Vendedor(Registro):
+    """Representante do cadastro de vendedores"""
+    
+    __slots__ = ('cdrepresentante', 'cdempresa', 'nome', 'ativo')
+    
+    CAMPOS = {
+        'CDREPRESENTANTE': 'cdrepresentante',
+        'CDEMPRESA': 'cdempresa',
+        'NMREPRESENTANTE': 'nome',
+        'FLATIVO': 'ativo'
+    }
+    
+    def __init__(self, cdrepresentante, cdempresa, nome, ativo=None):
+        self.cdrepresentante = cdrepresentante
+        self.cdempresa = cdempresa
+        self.nome = nome
+        self.ativo = ativo
+    
+    @classmethod
+    def de_api(cls, dados):
+        """
+        Args:
+            dados (dict): Vendedor como retornado pela API
+            
+        Returns:
+            Vendedor: Registro compacto
+        """
+        return cls(
+            internar(dados.get('CDREPRESENTANTE')),
+            internar(dados.get('CDEMPRESA')),
+            internar(dados.get('NMREPRESENTANTE', '')),
+            dados.get('FLATIVO')
+        )
+
+class Empresa(Registro):
+    """Empresa (base) do cadastro, com a UF já mapeada"""
+    
+    __slots__ = ('cdempresa', 'nome', 'sigla', 'uf')
+    
+    CAMPOS = {
+        'CDEMPRESA': 'cdempresa',
+        'NMEMPRESA': 'nome',
+        'NMEMPRESACURTO': 'sigla',
+        'UF': 'uf'
+    }
+    
+    def __init__(self, cdempresa, nome, sigla, uf):
+        self.cdempresa = cdempresa
+        self.nome = nome
+        self.sigla = sigla
+        self.uf = uf
+    
+    @classmethod
+    def de_api(cls, dados):
+        """
+        Args:
+            dados (dict): Empresa como retornada pela API, com a chave UF
+            
+        Returns:
+            Empresa: Registro compacto
+        """
+        return cls(
+            internar(dados.get('CDEMPRESA')),
+            dados.get('NMEMPRESA'),
+            internar(dados.get('NMEMPRESACURTO', '')),
+            internar(dados.get('UF', 'DESCONHECIDO'))
+        )
+
+class VendaRelacionada(Registro):
+    """Pedido relacionado ao vendedor e à empresa"""
+    
+    __slots__ = ('base', 'consultor', 'valor', 'volume', 'data_emissao', 'uf', 'cdempresa', 'cdrepresentante')
+    
+    CAMPOS = {
+        'Base': 'base',
+        'Consultor': 'consultor',
+        'Valor': 'valor',
+        'Volume': 'volume',
+        'DataEmissao': 'data_emissao',
+        'UF': 'uf',
+        'CDEMPRESA': 'cdempresa',
+        'CDREPRESENTANTE': 'cdrepresentante'
+    }
+    
+    def __init__(self, base, consultor, valor, volume, data_emissao, uf, cdempresa, cdrepresentante):
+        self.base = base
+        self.consultor = consultor
+        self.valor = valor
+        self.volume = volume
+        self.data_emissao = data_emissao
+        self.uf = uf
+        self.cdempresa = cdempresa
+        self.cdrepresentante = cdrepresentante
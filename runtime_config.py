@@ -0,0 +1,141 @@
+"""
+Configurações recarregadas em tempo de execução (grupos WhatsApp e mapeamento de UFs)
+
+Os arquivos são verificados pelo mtime a cada CONFIG_VERIFICACAO_SEGUNDOS.
+Uma nova versão só substitui a atual depois de validada; se o arquivo
+estiver inválido, a versão anterior continua em uso.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from config import CONFIG_PATH, UF_MAPPING_PATH, CONFIG_VERIFICACAO_SEGUNDOS, UF_MAPPING
+from scheduler import ExpressaoCron
+
+class ArquivoMonitorado:
+    """Conteúdo de um arquivo JSON recarregado quando o arquivo muda"""
+    
+    def __init__(self, caminho, validar, padrao=None, intervalo=None):
+        """
+        Args:
+            caminho (str): Arquivo JSON monitorado
+            validar (callable): Recebe o JSON lido e retorna o valor a publicar (ValueError se inválido)
+            padrao: Valor usado enquanto o arquivo não existe ou nunca foi válido
+            intervalo (float): Segundos entre verificações do mtime. Se None, usa CONFIG_VERIFICACAO_SEGUNDOS
+        """
+        self.caminho = caminho
+        self.validar = validar
+        self.padrao = padrao
+        self.intervalo = CONFIG_VERIFICACAO_SEGUNDOS if intervalo is None else intervalo
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._valor = padrao
+        self._assinatura = None
+        self._proxima_verificacao = 0.0
+    
+    def _recarregar(self):
+        try:
+            estado = os.stat(self.caminho)
+        except FileNotFoundError:
+            if self._assinatura is not None:
+                self.logger.warning(f"{self.caminho} removido; mantendo a última configuração válida")
+                self._assinatura = None
+            return
+        
+        assinatura = (estado.st_mtime_ns, estado.st_size)
+        if assinatura == self._assinatura:
+            return
+        self._assinatura = assinatura
+        
+        try:
+            with open(self.caminho, 'r', encoding='utf-8') as f:
+                novo = self.validar(json.load(f))
+        except (OSError, ValueError) as e:
+            self.logger.error(f"{self.caminho} inválido, mantendo a configuração anterior: {str(e)}")
+            return
+        
+        inicial = self._valor is self.padrao
+        self._valor = novo
+        if not inicial:
+            self.logger.info(f"{self.caminho} recarregado")
+    
+    def obter(self):
+        """
+        Retorna a versão atual, verificando o arquivo se o intervalo já passou
+        
+        O valor retornado nunca é alterado depois de publicado; cada recarga
+        publica um objeto novo.
+        """
+        agora = time.monotonic()
+        if agora >= self._proxima_verificacao:
+            with self._lock:
+                if agora >= self._proxima_verificacao:
+                    self._recarregar()
+                    self._proxima_verificacao = agora + self.intervalo
+        return self._valor
+
+def validar_grupos(dados):
+    """
+    Valida a seção grupos_whatsapp de config.json
+    
+    Args:
+        dados (dict): Conteúdo de config.json
+        
+    Returns:
+        dict: UF -> configuração do grupo
+        
+    Raises:
+        ValueError: Se algum grupo estiver incompleto ou com agenda inválida
+    """
+    if not isinstance(dados, dict) or not isinstance(dados.get('grupos_whatsapp'), dict):
+        raise ValueError("seção 'grupos_whatsapp' ausente")
+    
+    grupos = {}
+    for uf, grupo in dados['grupos_whatsapp'].items():
+        if not isinstance(grupo, dict):
+            raise ValueError(f"grupo de {uf} deve ser um objeto")
+        if grupo.get('agenda'):
+            ExpressaoCron(grupo['agenda'])
+        grupos[uf] = dict(grupo)
+    return grupos
+
+def validar_mapeamento_uf(dados):
+    """
+    Valida o mapeamento NMEMPRESACURTO -> UF
+    
+    Args:
+        dados (dict): Conteúdo do arquivo de mapeamento
+        
+    Returns:
+        dict: Sigla da empresa -> UF
+        
+    Raises:
+        ValueError: Se alguma entrada não for sigla -> UF de duas letras
+    """
+    if not isinstance(dados, dict) or not dados:
+        raise ValueError("o mapeamento deve ser um objeto não vazio")
+    
+    for sigla, uf in dados.items():
+        if not isinstance(uf, str) or not re.fullmatch(r'[A-Z]{2}', uf):
+            raise ValueError(f"UF inválida para {sigla}: {uf!r}")
+    return dict(dados)
+
+_grupos = ArquivoMonitorado(CONFIG_PATH, validar_grupos, padrao={})
+_mapeamento_uf = ArquivoMonitorado(UF_MAPPING_PATH, validar_mapeamento_uf, padrao=UF_MAPPING)
+
+def grupos_whatsapp():
+    """
+    Returns:
+        dict: Grupos WhatsApp atuais de config.json (vazio se nunca foi válido)
+    """
+    return _grupos.obter()
+
+def mapeamento_uf():
+    """
+    Returns:
+        dict: Mapeamento atual de UF_MAPPING_PATH, ou UF_MAPPING se o arquivo não existir
+    """
+    return _mapeamento_uf.obter()
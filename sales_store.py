@@ -0,0 +1,221 @@
+"""
+Armazenamento local (SQLite) das vendas processadas
+"""
+
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+from config import VENDAS_DB_PATH
+from data_processor import converter_numero, converter_volume
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS vendas (
+    data_emissao TEXT NOT NULL,
+    uf TEXT NOT NULL,
+    base TEXT,
+    cdempresa TEXT,
+    cdrepresentante TEXT,
+    consultor TEXT,
+    valor REAL NOT NULL DEFAULT 0,
+    volume REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_vendas_data ON vendas (data_emissao);
+CREATE INDEX IF NOT EXISTS idx_vendas_uf_data ON vendas (uf, data_emissao);
+CREATE INDEX IF NOT EXISTS idx_vendas_representante_data ON vendas (cdrepresentante, data_emissao);
+CREATE TABLE IF NOT EXISTS agregados_diarios (
+    data_emissao TEXT NOT NULL,
+    uf TEXT NOT NULL,
+    base TEXT NOT NULL,
+    cdrepresentante TEXT NOT NULL,
+    consultor TEXT,
+    quantidade INTEGER NOT NULL,
+    valor REAL NOT NULL,
+    volume REAL NOT NULL,
+    PRIMARY KEY (data_emissao, uf, base, cdrepresentante)
+);
+"""
+
+def data_iso(data):
+    """
+    Normaliza data para o formato ISO (YYYY-MM-DD) usado no banco
+    
+    Args:
+        data (date|datetime|str): Data como objeto ou texto DD/MM/YYYY ou YYYY-MM-DD
+        
+    Returns:
+        str: Data no formato YYYY-MM-DD
+    """
+    if hasattr(data, 'strftime'):
+        return data.strftime("%Y-%m-%d")
+    if '/' in data:
+        return datetime.strptime(data, "%d/%m/%Y").strftime("%Y-%m-%d")
+    return data
+
+class ArmazemVendas:
+    """Histórico local de vendas relacionadas, consultável por período"""
+    
+    def __init__(self, caminho=None):
+        self.caminho = caminho or VENDAS_DB_PATH
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self.conexao = sqlite3.connect(self.caminho, check_same_thread=False)
+        self.conexao.row_factory = sqlite3.Row
+        self.conexao.execute("PRAGMA journal_mode=WAL")
+        self.conexao.execute("PRAGMA synchronous=NORMAL")
+        self.conexao.executescript(SCHEMA)
+        self._migrar()
+    
+    def _migrar(self):
+        """Gera os agregados diários de bancos criados antes da tabela existir"""
+        versao = self.conexao.execute("PRAGMA user_version").fetchone()[0]
+        if versao < 1:
+            with self.conexao:
+                self.conexao.execute(
+                    "INSERT OR IGNORE INTO agregados_diarios "
+                    "(data_emissao, uf, base, cdrepresentante, consultor, quantidade, valor, volume) "
+                    "SELECT data_emissao, uf, base, cdrepresentante, MAX(consultor), COUNT(*), SUM(valor), SUM(volume) "
+                    "FROM vendas GROUP BY data_emissao, uf, base, cdrepresentante"
+                )
+                self.conexao.execute("PRAGMA user_version = 1")
+    
+    def fechar(self):
+        """Fecha a conexão com o banco"""
+        self.conexao.close()
+    
+    def salvar_dia(self, data_emissao, vendas_relacionadas, ufs=None):
+        """
+        Grava as vendas de um dia, substituindo o que já existir para a data
+        
+        Args:
+            data_emissao (date|str): Data das vendas
+            vendas_relacionadas (list): Vendas relacionadas (relacionar_dados)
+            ufs (set): Substitui apenas estas UFs (consulta parcial). Se None, o dia inteiro
+            
+        Returns:
+            int: Quantidade de vendas gravadas
+        """
+        data = data_iso(data_emissao)
+        linhas = [
+            (
+                data,
+                venda.get('UF', 'DESCONHECIDO'),
+                venda.get('Base', ''),
+                str(venda.get('CDEMPRESA')),
+                str(venda.get('CDREPRESENTANTE')),
+                venda.get('Consultor', ''),
+                converter_numero(venda.get('Valor', 0)),
+                converter_volume(venda.get('Volume', 0))
+            )
+            for venda in vendas_relacionadas
+        ]
+        
+        filtro = "data_emissao = ?"
+        parametros = [data]
+        if ufs is not None:
+            filtro += f" AND uf IN ({', '.join('?' * len(ufs))})"
+            parametros += sorted(ufs)
+        
+        with self._lock, self.conexao:
+            self.conexao.execute(f"DELETE FROM vendas WHERE {filtro}", parametros)
+            self.conexao.executemany(
+                "INSERT INTO vendas (data_emissao, uf, base, cdempresa, cdrepresentante, consultor, valor, volume) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                linhas
+            )
+            # Totais compactos do dia, base dos relatórios de período
+            self.conexao.execute(f"DELETE FROM agregados_diarios WHERE {filtro}", parametros)
+            self.conexao.execute(
+                "INSERT INTO agregados_diarios (data_emissao, uf, base, cdrepresentante, consultor, quantidade, valor, volume) "
+                "SELECT data_emissao, uf, base, cdrepresentante, MAX(consultor), COUNT(*), SUM(valor), SUM(volume) "
+                f"FROM vendas WHERE {filtro} GROUP BY uf, base, cdrepresentante",
+                parametros
+            )
+        
+        self.logger.info(f"{len(linhas)} vendas de {data} gravadas no histórico")
+        return len(linhas)
+    
+    def consultar_periodo(self, inicio, fim, uf=None):
+        """
+        Consulta vendas gravadas em um intervalo de datas (inclusivo)
+        
+        Args:
+            inicio (date|str): Data inicial
+            fim (date|str): Data final
+            uf (str): Filtra por UF. Se None, retorna todas
+            
+        Returns:
+            list: Vendas no mesmo formato de relacionar_dados()
+        """
+        sql = ("SELECT data_emissao, uf, base, cdempresa, cdrepresentante, consultor, valor, volume "
+               "FROM vendas WHERE data_emissao BETWEEN ? AND ?")
+        parametros = [data_iso(inicio), data_iso(fim)]
+        
+        if uf:
+            sql += " AND uf = ?"
+            parametros.append(uf)
+        
+        with self._lock:
+            linhas = self.conexao.execute(sql, parametros).fetchall()
+        
+        return [
+            {
+                'Base': linha['base'],
+                'Consultor': linha['consultor'],
+                'Valor': linha['valor'],
+                'Volume': linha['volume'],
+                'DataEmissao': datetime.strptime(linha['data_emissao'], "%Y-%m-%d").strftime("%d/%m/%Y"),
+                'UF': linha['uf'],
+                'CDEMPRESA': linha['cdempresa'],
+                'CDREPRESENTANTE': linha['cdrepresentante']
+            }
+            for linha in linhas
+        ]
+    
+    def consultar_agregados_periodo(self, inicio, fim):
+        """
+        Soma os totais diários de um intervalo de datas (inclusivo)
+        
+        Usa apenas a tabela de agregados diários, então o custo depende do
+        número de dias e consultores, não do volume de pedidos.
+        
+        Args:
+            inicio (date|str): Data inicial
+            fim (date|str): Data final
+            
+        Returns:
+            dict: UF -> consultor -> {'total', 'volume_total', 'quantidade'}
+        """
+        with self._lock:
+            linhas = self.conexao.execute(
+                "SELECT uf, consultor, SUM(quantidade), SUM(valor), SUM(volume) FROM agregados_diarios "
+                "WHERE data_emissao BETWEEN ? AND ? GROUP BY uf, consultor",
+                (data_iso(inicio), data_iso(fim))
+            ).fetchall()
+        
+        agregados = {}
+        for uf, consultor, quantidade, total, volume_total in linhas:
+            agregados.setdefault(uf, {})[consultor] = {
+                'total': total,
+                'volume_total': volume_total,
+                'quantidade': quantidade
+            }
+        return agregados
+    
+    def datas_armazenadas(self, inicio, fim):
+        """
+        Lista as datas do intervalo que já possuem vendas gravadas
+        
+        Args:
+            inicio (date|str): Data inicial
+            fim (date|str): Data final
+            
+        Returns:
+            list: Datas no formato YYYY-MM-DD
+        """
+        with self._lock:
+            linhas = self.conexao.execute(
+                "SELECT DISTINCT data_emissao FROM vendas WHERE data_emissao BETWEEN ? AND ? ORDER BY data_emissao",
+                (data_iso(inicio), data_iso(fim))
+            ).fetchall()
+        return [linha[0] for linha in linhas]
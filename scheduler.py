@@ -0,0 +1,224 @@
+"""
+Agendamento interno no estilo cron para o modo daemon
+"""
+
+import logging
+from datetime import datetime, timedelta
+from config import DAEMON_AGENDA
+
+# (nome, mínimo, máximo) de cada campo da expressão
+CAMPOS_CRON = (
+    ('minuto', 0, 59),
+    ('hora', 0, 23),
+    ('dia', 1, 31),
+    ('mes', 1, 12),
+    ('dia_semana', 0, 7)
+)
+
+def _interpretar_campo(texto, minimo, maximo):
+    """
+    Converte um campo cron (*, 5, 1-5, */15, 8-18/2, 1,3,5) no conjunto de valores aceitos
+    
+    Raises:
+        ValueError: Se o campo for inválido
+    """
+    valores = set()
+    for parte in texto.split(','):
+        intervalo, _, passo = parte.partition('/')
+        passo = int(passo) if passo else 1
+        if passo < 1:
+            raise ValueError(f"passo inválido: {parte}")
+        
+        if intervalo == '*':
+            inicio, fim = minimo, maximo
+        elif '-' in intervalo:
+            inicio, fim = (int(valor) for valor in intervalo.split('-', 1))
+        else:
+            inicio = int(intervalo)
+            fim = maximo if passo > 1 else inicio
+        
+        if not minimo <= inicio <= fim <= maximo:
+            raise ValueError(f"valor fora do intervalo {minimo}-{maximo}: {parte}")
+        valores.update(range(inicio, fim + 1, passo))
+    return valores
+
+class ExpressaoCron:
+    """Expressão cron de 5 campos: minuto hora dia mês dia-da-semana (0 ou 7 = domingo)"""
+    
+    def __init__(self, expressao):
+        """
+        Args:
+            expressao (str): Ex.: "0 18 * * 1-6"
+            
+        Raises:
+            ValueError: Se a expressão for inválida
+        """
+        self.expressao = expressao.strip()
+        campos = self.expressao.split()
+        if len(campos) != len(CAMPOS_CRON):
+            raise ValueError(f"Expressão cron deve ter 5 campos: '{expressao}'")
+        
+        try:
+            (self.minutos, self.horas, self.dias, self.meses, dias_semana) = (
+                _interpretar_campo(campo, minimo, maximo)
+                for campo, (_, minimo, maximo) in zip(campos, CAMPOS_CRON)
+            )
+        except ValueError as e:
+            raise ValueError(f"Expressão cron inválida '{expressao}': {str(e)}") from None
+        
+        self.dias_semana = {dia % 7 for dia in dias_semana}
+        # Como no cron: com dia e dia da semana restritos, basta um dos dois coincidir
+        self._dia_restrito = campos[2] != '*'
+        self._semana_restrita = campos[4] != '*'
+    
+    def _dia_coincide(self, data):
+        dia_semana = (data.weekday() + 1) % 7
+        if self._dia_restrito and self._semana_restrita:
+            return data.day in self.dias or dia_semana in self.dias_semana
+        return data.day in self.dias and dia_semana in self.dias_semana
+    
+    def proxima(self, apos):
+        """
+        Calcula o próximo horário que satisfaz a expressão
+        
+        Args:
+            apos (datetime): Referência (o resultado é estritamente posterior)
+            
+        Returns:
+            datetime: Próximo disparo, com segundos zerados
+        """
+        momento = apos.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limite = momento + timedelta(days=366 * 5)
+        
+        while momento < limite:
+            if momento.month not in self.meses:
+                ano, mes = (momento.year + 1, 1) if momento.month == 12 else (momento.year, momento.month + 1)
+                momento = momento.replace(year=ano, month=mes, day=1, hour=0, minute=0)
+                continue
+            if not self._dia_coincide(momento):
+                momento = momento.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if momento.hour not in self.horas:
+                momento = momento.replace(minute=0) + timedelta(hours=1)
+                continue
+            if momento.minute not in self.minutos:
+                momento += timedelta(minutes=1)
+                continue
+            return momento
+        
+        raise ValueError(f"Expressão cron sem próximo disparo: '{self.expressao}'")
+    
+    def __repr__(self):
+        return f"ExpressaoCron('{self.expressao}')"
+
+def carregar_agenda(grupos_config, padrao=None):
+    """
+    Monta a agenda a partir da chave "agenda" de cada UF em config.json
+    
+    UFs sem agenda própria usam DAEMON_AGENDA. UFs com a mesma expressão são
+    disparadas juntas, em um único ciclo.
+    
+    Args:
+        grupos_config (dict): Seção grupos_whatsapp de config.json
+        padrao (str): Expressão padrão. Se None, usa DAEMON_AGENDA
+        
+    Returns:
+        list: Pares (ExpressaoCron, conjunto de UFs)
+        
+    Raises:
+        ValueError: Se alguma expressão for inválida
+    """
+    padrao = padrao or DAEMON_AGENDA
+    ufs_por_expressao = {}
+    for uf, grupo in grupos_config.items():
+        expressao = ' '.join((grupo.get('agenda') or padrao).split())
+        ufs_por_expressao.setdefault(expressao, set()).add(uf)
+    
+    return [(ExpressaoCron(expressao), ufs) for expressao, ufs in ufs_por_expressao.items()]
+
+class Agendador:
+    """Executa uma tarefa nos horários da agenda até ser interrompido"""
+    
+    def __init__(self, agenda):
+        """
+        Args:
+            agenda (list|callable): Pares (ExpressaoCron, conjunto de UFs), ou função que
+                retorna a agenda atual (consultada a cada verificação)
+        """
+        self.agenda = agenda
+        self.logger = logging.getLogger(__name__)
+    
+    def proximo_disparo(self, agora):
+        """
+        Args:
+            agora (datetime): Horário de referência
+            
+        Returns:
+            tuple: (horário do próximo disparo, UFs a processar nele), ou None se
+                a agenda estiver vazia
+            
+        Raises:
+            ValueError: Se alguma expressão da agenda for inválida
+        """
+        agenda = self.agenda() if callable(self.agenda) else self.agenda
+        disparos = [(cron.proxima(agora), ufs) for cron, ufs in agenda]
+        if not disparos:
+            return None
+        quando = min(horario for horario, _ in disparos)
+        ufs = set().union(*(ufs for horario, ufs in disparos if horario == quando))
+        return quando, ufs
+    
+    def executar(self, tarefa, parar):
+        """
+        Dorme até cada disparo e executa a tarefa com as UFs agendadas
+        
+        Um ciclo em andamento nunca é interrompido: o sinal de parada é
+        verificado entre os ciclos. Disparos perdidos durante um ciclo longo
+        não são acumulados. Se a agenda ficar vazia ou inválida (ex.: config.json
+        alterado), o agendador aguarda e volta a lê-la, sem encerrar.
+        
+        Args:
+            tarefa (callable): Recebe o conjunto de UFs do disparo
+            parar (threading.Event): Encerra o laço quando sinalizado
+        """
+        while not parar.is_set():
+            referencia = datetime.now()
+            anunciado = None
+            
+            # Acorda periodicamente para tolerar ajustes de relógio e suspensão da máquina
+            # e para aplicar mudanças na agenda
+            while not parar.is_set():
+                try:
+                    disparo = self.proximo_disparo(referencia)
+                    problema = None if disparo is not None else "Agenda vazia (nenhuma UF em config.json)"
+                except ValueError as e:
+                    disparo = None
+                    problema = f"Agenda inválida: {str(e)}"
+                
+                if disparo is None:
+                    if problema != anunciado:
+                        self.logger.warning("%s; verificando novamente a cada 60s", problema)
+                        anunciado = problema
+                    parar.wait(60)
+                    # Disparos do período sem agenda não são executados depois
+                    referencia = datetime.now()
+                    continue
+                
+                quando, ufs = disparo
+                if (quando, ufs) != anunciado:
+                    self.logger.info("Próximo ciclo em %s para %s", quando.strftime('%d/%m/%Y %H:%M'), ', '.join(sorted(ufs)))
+                    anunciado = (quando, ufs)
+                espera = (quando - datetime.now()).total_seconds()
+                if espera <= 0:
+                    break
+                parar.wait(min(espera, 60))
+            
+            if parar.is_set():
+                break
+            
+            try:
+                tarefa(ufs)
+            except Exception as e:
+                self.logger.error(f"Erro no ciclo agendado: {str(e)}")
+        
+        self.logger.info("Agendador encerrado")
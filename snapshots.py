@@ -0,0 +1,335 @@
+"""
+Gravação e reprodução das respostas das APIs (snapshots comprimidos)
+
+Com SNAPSHOT_GRAVAR, cada resposta das consultas WMW é anexada a um arquivo
+JSON lines comprimido em SNAPSHOT_DIR. O modo replay (python main.py --replay)
+responde às mesmas consultas a partir desse arquivo, sem acessar a rede, e
+os envios do WhatsApp vão para um destino simulado.
+"""
+
+import gzip
+import logging
+import os
+import threading
+from datetime import datetime
+from itertools import chain
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from config import SNAPSHOT_DIR
+from http_session import SessaoHTTP
+from json_backend import carregar, serializar
+from metrics import coletor
+from query_filters import FILTROS_IGNORADOS, filtrar_registros, normalizar_filtros
+
+# URL base fictícia do modo replay
+REPLAY_BASE_URL = "http://snapshot.replay/lubnordws"
+
+ENDPOINT_TOKEN = "/oauth/token"
+
+# Nível de compressão das entradas (6 equilibra tamanho e tempo na consulta de pedidos)
+NIVEL_COMPRESSAO = 6
+
+def _resposta(request, status, conteudo):
+    """Monta a resposta do requests com o corpo já em memória"""
+    resposta = requests.Response()
+    resposta.status_code = status
+    resposta.reason = 'OK' if status == 200 else 'Not Found'
+    resposta.headers = CaseInsensitiveDict({
+        'Content-Type': 'application/json',
+        'Content-Length': str(len(conteudo))
+    })
+    resposta._content = conteudo
+    # Sem conexão por trás: iter_content() entrega o corpo em blocos a partir da memória
+    resposta._content_consumed = True
+    resposta.encoding = 'utf-8'
+    resposta.url = request.url
+    resposta.request = request
+    return resposta
+
+def ler_snapshot(caminho):
+    """
+    Lê as entradas de um snapshot
+    
+    Args:
+        caminho (str): Arquivo .jsonl.gz gravado por GravadorSnapshot
+    
+    Yields:
+        dict: Entrada com 'endpoint', 'requisicao', 'status', 'resposta' e 'gravado_em'
+    
+    Raises:
+        OSError: Se o arquivo não puder ser lido
+    """
+    try:
+        with gzip.open(caminho, 'rt', encoding='utf-8') as arquivo:
+            for linha in arquivo:
+                if linha.strip():
+                    yield carregar(linha)
+    except EOFError:
+        # Execução interrompida no meio de uma gravação: a última entrada é descartada
+        logging.getLogger(__name__).warning("Snapshot %s truncado; usando as entradas completas", caminho)
+
+class GravadorSnapshot:
+    """Anexa as respostas das consultas a um snapshot comprimido e datado"""
+    
+    def __init__(self, base_url, diretorio=None, caminho=None):
+        """
+        Args:
+            base_url (str): URL base da API; os endpoints são gravados relativos a ela
+            diretorio (str): Diretório dos snapshots. Se None, usa SNAPSHOT_DIR
+            caminho (str): Arquivo do snapshot. Se None, um novo arquivo com data e hora
+        """
+        self.base_url = base_url.rstrip('/')
+        diretorio = diretorio or SNAPSHOT_DIR
+        self.caminho = caminho or os.path.join(diretorio, f"{datetime.now():%Y-%m-%d_%H%M%S}.jsonl.gz")
+        self.entradas = 0
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+    
+    def registrar(self, endpoint, requisicao, status, conteudo):
+        """
+        Anexa uma resposta ao snapshot
+        
+        Cada entrada é um membro gzip separado, então uma execução interrompida
+        não corrompe as entradas anteriores.
+        
+        Args:
+            endpoint (str): Caminho relativo à URL base (ex.: /integration/v1/fetch/pedido)
+            requisicao (dict): Corpo JSON da requisição
+            status (int): Status HTTP
+            conteudo (bytes): Corpo da resposta
+        """
+        linha = serializar({
+            'endpoint': endpoint,
+            'requisicao': requisicao,
+            'status': status,
+            'resposta': conteudo.decode('utf-8'),
+            'gravado_em': datetime.now().isoformat(timespec='seconds')
+        }) + b'\n'
+        
+        with self._lock:
+            diretorio = os.path.dirname(self.caminho)
+            if diretorio:
+                os.makedirs(diretorio, exist_ok=True)
+            with gzip.open(self.caminho, 'ab', compresslevel=NIVEL_COMPRESSAO) as arquivo:
+                arquivo.write(linha)
+            if not self.entradas:
+                self.logger.info("Gravando respostas da API em %s", self.caminho)
+            self.entradas += 1
+    
+    def gancho_resposta(self, resposta, *args, **kwargs):
+        """
+        Hook de resposta do requests (session.hooks['response'])
+        
+        Grava apenas as consultas bem-sucedidas; o endpoint de token fica de
+        fora por carregar credenciais. Respostas em streaming são lidas por
+        inteiro aqui, e o cliente continua lendo o corpo em blocos da memória.
+        """
+        if resposta.status_code != 200 or not resposta.url.startswith(self.base_url):
+            return
+        endpoint = resposta.url[len(self.base_url):]
+        if endpoint == ENDPOINT_TOKEN:
+            return
+        
+        try:
+            corpo = resposta.request.body
+            requisicao = carregar(corpo) if corpo else None
+            self.registrar(endpoint, requisicao, resposta.status_code, resposta.content)
+        except (OSError, ValueError) as e:
+            self.logger.error(f"Erro ao gravar resposta de {endpoint} no snapshot: {str(e)}")
+
+class AdaptadorReplay(BaseAdapter):
+    """Adapter do requests que responde às consultas a partir de um snapshot"""
+    
+    def __init__(self, caminho, base_url=None):
+        """
+        Args:
+            caminho (str): Arquivo .jsonl.gz gravado por GravadorSnapshot
+            base_url (str): URL base usada pelo cliente. Se None, REPLAY_BASE_URL
+        
+        Raises:
+            OSError: Se o snapshot não puder ser lido
+            ValueError: Se alguma entrada for inválida
+        """
+        super().__init__()
+        self.base_url = (base_url or REPLAY_BASE_URL).rstrip('/')
+        self.logger = logging.getLogger(__name__)
+        # endpoint -> data (filtro DTEMISSAO ou None) -> {'completa': registros, 'parciais': {consulta: registros}}
+        self._gravacoes = {}
+        # endpoint -> True se a resposta gravada era um objeto com chave 'data'
+        self._envelope = {}
+        
+        entradas = 0
+        for entrada in ler_snapshot(caminho):
+            self._adicionar(entrada)
+            entradas += 1
+        
+        if not entradas:
+            raise ValueError(f"Snapshot sem respostas gravadas: {caminho}")
+        self.logger.info("Snapshot %s: %d respostas de %s", caminho, entradas, ', '.join(sorted(self._gravacoes)))
+    
+    @property
+    def data_emissao(self):
+        """
+        Dia gravado no snapshot (filtro DTEMISSAO das consultas)
+        
+        Returns:
+            str: Data no formato DD/MM/YYYY ou None se o snapshot tiver mais de um dia ou nenhum
+        """
+        datas = {data for gravacoes in self._gravacoes.values() for data in gravacoes if data}
+        return datas.pop() if len(datas) == 1 else None
+    
+    def _adicionar(self, entrada):
+        endpoint = entrada['endpoint']
+        requisicao = entrada.get('requisicao') or {}
+        filtros = normalizar_filtros(requisicao.get('filters'))
+        dados = carregar(entrada['resposta'])
+        
+        self._envelope[endpoint] = isinstance(dados, dict)
+        registros = (dados.get('data') or []) if isinstance(dados, dict) else dados
+        
+        grupo = self._gravacoes.setdefault(endpoint, {}).setdefault(
+            filtros.get('DTEMISSAO'), {'completa': None, 'parciais': {}}
+        )
+        restritiva = any(campo not in FILTROS_IGNORADOS for campo in filtros) or 'limit' in requisicao
+        if restritiva:
+            # Partições e páginas são disjuntas; a mesma consulta repetida substitui a anterior
+            consulta = serializar([sorted(filtros.items()), requisicao.get('limit'), requisicao.get('offset')])
+            grupo['parciais'][consulta] = registros
+        else:
+            grupo['completa'] = registros
+    
+    def _registros(self, endpoint, requisicao):
+        """
+        Reconstrói a resposta de uma consulta a partir das respostas gravadas
+        
+        Se o snapshot tem um único dia, ele responde a qualquer data pedida
+        (o dia gravado é reproduzido como o dia atual).
+        
+        Returns:
+            list: Registros da consulta ou None se o snapshot não os contém
+        """
+        datas = self._gravacoes.get(endpoint)
+        if not datas:
+            return None
+        
+        filtros = normalizar_filtros(requisicao.get('filters'))
+        grupo = datas.get(filtros.get('DTEMISSAO'))
+        if grupo is None:
+            if len(datas) != 1:
+                return None
+            grupo = next(iter(datas.values()))
+        
+        registros = grupo['completa']
+        if registros is None:
+            registros = list(chain.from_iterable(grupo['parciais'].values()))
+        registros = filtrar_registros(registros, filtros)
+        
+        if 'limit' in requisicao:
+            offset = int(requisicao.get('offset') or 0)
+            registros = registros[offset:offset + int(requisicao['limit'])]
+        return registros
+    
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        endpoint = request.url[len(self.base_url):] if request.url.startswith(self.base_url) else request.url
+        
+        if endpoint == ENDPOINT_TOKEN:
+            return _resposta(request, 200, serializar({
+                'access_token': 'replay', 'token_type': 'bearer', 'expires_in': 3600
+            }))
+        
+        requisicao = carregar(request.body) if request.body else {}
+        registros = self._registros(endpoint, requisicao)
+        if registros is None:
+            self.logger.warning("Consulta não encontrada no snapshot: %s %s", endpoint, request.body)
+            return _resposta(request, 404, serializar({'error': 'consulta não gravada no snapshot'}))
+        
+        dados = {'data': registros} if self._envelope.get(endpoint) else registros
+        return _resposta(request, 200, serializar(dados))
+    
+    def close(self):
+        pass
+
+class DestinoSimulado(BaseAdapter):
+    """Adapter do requests que recebe os envios do WhatsApp sem enviá-los (dry-run)"""
+    
+    def __init__(self, caminho=None):
+        """
+        Args:
+            caminho (str): Arquivo JSON lines onde as mensagens são gravadas
+                (recriado a cada execução). Se None, apenas registra no log
+        """
+        super().__init__()
+        self.caminho = caminho
+        self.envios = []
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        if caminho:
+            open(caminho, 'wb').close()
+    
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        # GET é o teste de conexão; não há mensagem a registrar
+        if request.method == 'POST':
+            payload = carregar(request.body) if request.body else {}
+            envio = {
+                'numero': payload.get('number'),
+                'mensagem': payload.get('body'),
+                'enviado_em': datetime.now().isoformat(timespec='seconds')
+            }
+            with self._lock:
+                self.envios.append(envio)
+                if self.caminho:
+                    with open(self.caminho, 'ab') as arquivo:
+                        arquivo.write(serializar(envio) + b'\n')
+            self.logger.info("Envio simulado para %s (%d caracteres)", envio['numero'], len(envio['mensagem'] or ''))
+        
+        return _resposta(request, 200, serializar({'status': 'simulado'}))
+    
+    def close(self):
+        pass
+
+def criar_sessao_simulada(adaptador):
+    """
+    Cria uma sessão HTTP atendida inteiramente por um adapter local
+    
+    Args:
+        adaptador (BaseAdapter): AdaptadorReplay ou DestinoSimulado
+    
+    Returns:
+        SessaoHTTP: Sessão sem acesso à rede, com o hook de métricas
+    """
+    sessao = SessaoHTTP()
+    sessao.mount('http://', adaptador)
+    sessao.mount('https://', adaptador)
+    sessao.hooks['response'].append(coletor.gancho_resposta)
+    return sessao
+
+def cliente_replay(snapshot):
+    """
+    Cria um APIClient que consulta um snapshot em vez da API
+    
+    Args:
+        snapshot (str|AdaptadorReplay): Arquivo .jsonl.gz gravado por GravadorSnapshot
+            ou o adapter já carregado
+    
+    Returns:
+        APIClient: Cliente com cache de cadastros e de token separados e sem gravação
+    
+    Raises:
+        OSError: Se o snapshot não puder ser lido
+        ValueError: Se o snapshot for inválido ou vazio
+    """
+    from api_client import APIClient
+    from config import MASTER_CACHE_DIR, TOKEN_CACHE_PATH
+    from master_cache import CacheDadosMestres
+    from token_cache import TokenCache
+    
+    adaptador = snapshot if isinstance(snapshot, AdaptadorReplay) else AdaptadorReplay(snapshot)
+    return APIClient(
+        session=criar_sessao_simulada(adaptador),
+        base_url=REPLAY_BASE_URL,
+        cache_mestres=CacheDadosMestres(diretorio=os.path.join(MASTER_CACHE_DIR, 'replay')),
+        # O token fictício do replay nunca substitui o token real em disco
+        token_cache=TokenCache(caminho=f"{TOKEN_CACHE_PATH}.replay", base_url=REPLAY_BASE_URL),
+        gravar=False
+    )
\ No newline at end of file
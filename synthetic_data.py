@@ -0,0 +1,138 @@
+"""
+Gerador de dados sintéticos de vendas, vendedores e empresas para benchmarks
+"""
+
+import random
+from datetime import date
+from config import UF_MAPPING
+
+# Siglas fora do UF_MAPPING, para exercitar a UF DESCONHECIDO
+SIGLAS_DESCONHECIDAS = ['LXX', 'LYY']
+
+NOMES = ['Ana', 'Bruno', 'Carla', 'Diego', 'Elaine', 'Fábio', 'Gabriela', 'Hugo', 'Isabel', 'João',
+         'Karina', 'Lucas', 'Marina', 'Nelson', 'Otávio', 'Paula', 'Rafael', 'Sabrina', 'Tiago', 'Vanessa']
+SOBRENOMES = ['Silva', 'Souza', 'Oliveira', 'Lima', 'Pereira', 'Costa', 'Rodrigues', 'Almeida',
+              'Nascimento', 'Carvalho', 'Araújo', 'Ribeiro', 'Gomes', 'Martins', 'Barbosa']
+
+class GeradorDadosSinteticos:
+    """Gera payloads no formato das APIs de pedido, representante e empresa"""
+    
+    def __init__(self, semente=42, vendedores_por_empresa=15, proporcao_texto=0.4, proporcao_orfas=0.02):
+        """
+        Args:
+            semente (int): Semente do gerador aleatório (resultados reproduzíveis)
+            vendedores_por_empresa (int): Vendedores ativos por empresa
+            proporcao_texto (float): Fração de valores enviados como texto
+            proporcao_orfas (float): Fração de pedidos sem vendedor ou empresa válidos
+        """
+        self.aleatorio = random.Random(semente)
+        self.vendedores_por_empresa = vendedores_por_empresa
+        self.proporcao_texto = proporcao_texto
+        self.proporcao_orfas = proporcao_orfas
+    
+    def gerar_empresas(self):
+        """
+        Gera uma empresa para cada sigla do UF_MAPPING e algumas desconhecidas
+        
+        Returns:
+            list: Empresas no formato da API
+        """
+        siglas = list(UF_MAPPING) + SIGLAS_DESCONHECIDAS
+        return [
+            {'CDEMPRESA': str(codigo), 'NMEMPRESA': f'Lubnord {sigla}', 'NMEMPRESACURTO': sigla}
+            for codigo, sigla in enumerate(siglas, start=1)
+        ]
+    
+    def gerar_vendedores(self, empresas):
+        """
+        Gera vendedores ativos distribuídos entre as empresas
+        
+        Args:
+            empresas (list): Empresas geradas
+            
+        Returns:
+            list: Vendedores no formato da API
+        """
+        vendedores = []
+        codigo = 1
+        for empresa in empresas:
+            for _ in range(self.vendedores_por_empresa):
+                nome = f"{self.aleatorio.choice(NOMES)} {self.aleatorio.choice(SOBRENOMES)} {self.aleatorio.choice(SOBRENOMES)}"
+                vendedores.append({
+                    'CDEMPRESA': empresa['CDEMPRESA'],
+                    'CDREPRESENTANTE': str(codigo),
+                    'NMREPRESENTANTE': nome,
+                    'FLATIVO': 'S'
+                })
+                codigo += 1
+        return vendedores
+    
+    def _formatar_numero(self, valor, moeda=False):
+        """Alterna entre os formatos numéricos observados na API ("R$" só em valores monetários)"""
+        if self.aleatorio.random() >= self.proporcao_texto:
+            return valor
+        formato = self.aleatorio.randrange(3 if moeda else 2)
+        if formato == 0:
+            return f"{valor:.2f}"
+        if formato == 2:
+            return f"R$ {valor:.2f}"
+        return f" {valor} "
+    
+    def iter_vendas(self, quantidade, vendedores, empresas, data_emissao=None):
+        """
+        Gera pedidos um a um, sem materializar a lista
+        
+        Args:
+            quantidade (int): Número de pedidos
+            vendedores (list): Vendedores gerados
+            empresas (list): Empresas geradas
+            data_emissao (date): Data dos pedidos. Se None, usa hoje
+            
+        Yields:
+            dict: Pedido no formato da API
+        """
+        data = (data_emissao or date.today()).strftime("%d/%m/%Y")
+        aleatorio = self.aleatorio
+        
+        for numero in range(1, quantidade + 1):
+            vendedor = aleatorio.choice(vendedores)
+            cd_empresa = vendedor['CDEMPRESA']
+            cd_representante = vendedor['CDREPRESENTANTE']
+            
+            if aleatorio.random() < self.proporcao_orfas:
+                if aleatorio.random() < 0.5:
+                    cd_representante = '0'
+                else:
+                    cd_empresa = '0'
+            
+            volume = round(aleatorio.uniform(0, 400), 2)
+            valor = round(volume * aleatorio.uniform(15, 35) + aleatorio.uniform(0, 50), 2)
+            
+            yield {
+                'NUPEDIDO': str(numero),
+                'CDEMPRESA': cd_empresa,
+                'CDREPRESENTANTE': cd_representante,
+                'CDUSUARIOEMISSAO': cd_representante,
+                'FLORIGEMPEDIDO': aleatorio.choice(['P', 'E']),
+                'CDTIPOPAGAMENTO': str(aleatorio.randint(1, 6)),
+                'DTEMISSAO': data,
+                'VLTOTALPEDIDO': self._formatar_numero(valor, moeda=True),
+                'VLVOLUMEPEDIDO': self._formatar_numero(volume),
+                'FLCONTROLEERP': aleatorio.choice(['S', 'N'])
+            }
+    
+    def gerar_dataset(self, quantidade, data_emissao=None):
+        """
+        Gera um conjunto completo de empresas, vendedores e vendas
+        
+        Args:
+            quantidade (int): Número de pedidos
+            data_emissao (date): Data dos pedidos. Se None, usa hoje
+            
+        Returns:
+            tuple: (vendas, vendedores, empresas)
+        """
+        empresas = self.gerar_empresas()
+        vendedores = self.gerar_vendedores(empresas)
+        vendas = list(self.iter_vendas(quantidade, vendedores, empresas, data_emissao))
+        return vendas, vendedores, empresas
@@ -3,7 +3,9 @@ Script para investigar todos os campos disponíveis na API de vendas
 """
 
 import logging
+import sys
 from api_client import APIClient
+from snapshots import cliente_replay
 import json
 
 def setup_logging():
@@ -25,8 +27,8 @@ def main():
     logger.info("=" * 60)
     
     try:
-        # Inicializar componentes
-        api_client = APIClient()
+        # Inicializar componentes (com um snapshot como argumento, consulta o arquivo em vez da API)
+        api_client = cliente_replay(sys.argv[1]) if len(sys.argv) > 1 else APIClient()
         
         # Gerar token
         logger.info("Gerando token...")
@@ -39,12 +41,10 @@ def main():
         logger.info("Fazendo consulta sem filtro de campos...")
         
         # Modificar temporariamente o método para não filtrar campos
-        import requests
         from datetime import datetime
         
         # URL da API
-        from config import VENDAS_URL
-        url = VENDAS_URL
+        url = api_client.vendas_url
         
         # Data de hoje
         hoje = datetime.now().strftime('%d/%m/%Y')
@@ -61,15 +61,10 @@ def main():
             "limit": 1  # Apenas 1 registro para análise
         }
         
-        headers = {
-            'Authorization': f'Bearer {token}',
-            'Content-Type': 'application/json'
-        }
-        
         logger.info(f"Consultando URL: {url}")
         logger.info(f"Payload: {json.dumps(payload, indent=2)}")
         
-        response = requests.post(url, json=payload, headers=headers)
+        response = api_client.post_autenticado(url, payload)
         
         if response.status_code == 200:
             data = response.json()
@@ -3,8 +3,10 @@ Script de teste para verificar se o campo vlvolumepedido está retornando valore
 """
 
 import logging
+import sys
 from api_client import APIClient
 from data_processor import DataProcessor
+from snapshots import cliente_replay
 
 def setup_logging():
     """Configura sistema de logs"""
@@ -25,8 +27,8 @@ def main():
     logger.info("=" * 50)
     
     try:
-        # Inicializar componentes
-        api_client = APIClient()
+        # Inicializar componentes (com um snapshot como argumento, consulta o arquivo em vez da API)
+        api_client = cliente_replay(sys.argv[1]) if len(sys.argv) > 1 else APIClient()
         data_processor = DataProcessor()
         
         # Gerar token
@@ -0,0 +1,116 @@
+"""
+Cache persistente do token OAuth da API
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from config import API_BASE_URL, API_USERNAME, TOKEN_CACHE_PATH, TOKEN_MARGEM_RENOVACAO
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+class TokenCache:
+    """Cache em disco do token, compartilhado entre execuções concorrentes"""
+    
+    def __init__(self, caminho=None, margem_renovacao=None, base_url=None):
+        self.caminho = caminho or TOKEN_CACHE_PATH
+        self.caminho_lock = f"{self.caminho}.lock"
+        self.margem_renovacao = TOKEN_MARGEM_RENOVACAO if margem_renovacao is None else margem_renovacao
+        # Evita reutilizar token de outro servidor ou usuário
+        self.chave = hashlib.sha256(f"{base_url or API_BASE_URL}|{API_USERNAME}".encode('utf-8')).hexdigest()
+        self.logger = logging.getLogger(__name__)
+    
+    @contextmanager
+    def lock(self):
+        """
+        Bloqueio exclusivo entre processos sobre o arquivo de cache
+        
+        Enquanto o bloqueio é mantido, outras execuções aguardam e depois
+        reutilizam o token gerado, em vez de autenticar em paralelo.
+        """
+        with open(self.caminho_lock, 'a+') as f:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            else:
+                f.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        time.sleep(0.1)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    
+    def carregar(self):
+        """
+        Lê o token do cache se ainda estiver válido
+        
+        Returns:
+            tuple: (token, expira_em) ou (None, 0) se ausente ou próximo de expirar
+        """
+        try:
+            with open(self.caminho, 'r', encoding='utf-8') as f:
+                dados = json.load(f)
+        except FileNotFoundError:
+            return None, 0
+        except Exception as e:
+            self.logger.warning(f"Cache de token inválido, ignorando: {str(e)}")
+            return None, 0
+        
+        if dados.get('chave') != self.chave:
+            return None, 0
+        
+        token = dados.get('access_token')
+        expira_em = float(dados.get('expira_em', 0))
+        
+        if not token or time.time() >= expira_em - self.margem_renovacao:
+            return None, 0
+        
+        return token, expira_em
+    
+    def salvar(self, token, expira_em):
+        """
+        Grava o token no cache de forma atômica
+        
+        Args:
+            token (str): Token de acesso
+            expira_em (float): Instante de expiração (epoch em segundos)
+        """
+        try:
+            temporario = f"{self.caminho}.tmp"
+            with open(temporario, 'w', encoding='utf-8') as f:
+                json.dump({'chave': self.chave, 'access_token': token, 'expira_em': expira_em}, f)
+            if fcntl:
+                os.chmod(temporario, 0o600)
+            os.replace(temporario, self.caminho)
+        except Exception as e:
+            self.logger.warning(f"Não foi possível gravar o cache de token: {str(e)}")
+    
+    def invalidar(self, token):
+        """
+        Remove o token do cache se ainda for o token informado
+        
+        Args:
+            token (str): Token rejeitado pela API
+        """
+        with self.lock():
+            atual, _ = self.carregar()
+            if atual == token:
+                try:
+                    os.remove(self.caminho)
+                except OSError:
+                    pass
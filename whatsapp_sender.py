@@ -2,32 +2,37 @@
 Cliente para envio de mensagens WhatsApp
 """
 
-import requests
-import json
+import hashlib
 import logging
-from config import WHATSAPP_API_URL, WHATSAPP_TOKEN
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config import WHATSAPP_API_URL, WHATSAPP_TOKEN, WHATSAPP_MAX_EM_VOO, WHATSAPP_TAXA_ENVIO, WHATSAPP_RAJADA, OUTBOX_ATIVO, OUTBOX_ESPERA_MAXIMA
+from http_session import criar_sessao
+from json_backend import serializar
+from metrics import coletor
+from outbox import CaixaSaida, ENVIADA
+from rate_limiter import LimitadorTaxa
+from runtime_config import grupos_whatsapp
 
 class WhatsAppSender:
     """Cliente para envio de mensagens via WhatsApp"""
     
-    def __init__(self):
+    def __init__(self, session=None, outbox=None, api_url=None, data_relatorio=None):
         self.logger = logging.getLogger(__name__)
-        self.grupos_config = self.load_grupos_config()
+        self.api_url = api_url or WHATSAPP_API_URL
+        # Data fixa dos relatórios (DD/MM/YYYY), usada no replay de snapshots; None usa a data atual
+        self.data_relatorio = data_relatorio
+        # Envio não é idempotente: apenas falhas de conexão são repetidas no POST
+        self.session = session or criar_sessao()
+        self.limitador = LimitadorTaxa(WHATSAPP_TAXA_ENVIO, WHATSAPP_RAJADA)
+        self.outbox = outbox or (CaixaSaida() if OUTBOX_ATIVO else None)
+        # Latência (segundos) do último envio por UF
+        self.latencias = {}
     
-    def load_grupos_config(self):
-        """
-        Carrega configuração dos grupos WhatsApp
-        
-        Returns:
-            dict: Configuração dos grupos
-        """
-        try:
-            with open('config.json', 'r', encoding='utf-8') as f:
-                config = json.load(f)
-                return config.get('grupos_whatsapp', {})
-        except Exception as e:
-            self.logger.error(f"Erro ao carregar configuração dos grupos: {str(e)}")
-            return {}
+    @property
+    def grupos_config(self):
+        """Grupos atuais de config.json, recarregados quando o arquivo muda"""
+        return grupos_whatsapp()
     
     def send_message(self, numero, mensagem):
         """
@@ -51,11 +56,15 @@ class WhatsAppSender:
                 'body': mensagem
             }
             
-            self.logger.info(f"Enviando mensagem para {numero}...")
-            response = requests.post(WHATSAPP_API_URL, headers=headers, json=payload)
+            espera = self.limitador.adquirir()
+            if espera:
+                self.logger.info("Limite de taxa: aguardou %.2fs para enviar a %s", espera, numero)
+            
+            self.logger.debug("Enviando mensagem para %s...", numero)
+            response = self.session.post(self.api_url, headers=headers, data=serializar(payload))
             
             if response.status_code == 200:
-                self.logger.info(f"Mensagem enviada com sucesso para {numero}")
+                self.logger.debug("Mensagem enviada com sucesso para %s", numero)
                 return True
             else:
                 self.logger.error(f"Erro ao enviar mensagem para {numero}: {response.status_code} - {response.text}")
@@ -77,11 +86,12 @@ class WhatsAppSender:
             bool: True se enviado com sucesso, False caso contrário
         """
         try:
-            if uf not in self.grupos_config:
+            grupos = self.grupos_config
+            if uf not in grupos:
                 self.logger.warning(f"Configuração não encontrada para UF: {uf}")
                 return False
             
-            grupo = self.grupos_config[uf]
+            grupo = grupos[uf]
             numero = grupo.get('numero')
             nome_grupo = grupo.get('nome', f'Grupo {uf}')
             
@@ -94,15 +104,89 @@ class WhatsAppSender:
             mensagem_completa += f"📅 {self.get_data_atual()}\n\n"
             mensagem_completa += relatorio
             
-            return self.send_message(numero, mensagem_completa)
+            if self.outbox is None:
+                return self.send_message(numero, mensagem_completa)
+            
+            # Chave de idempotência: UF + data + conteúdo do relatório; um relatório
+            # novo da mesma UF e data substitui o anterior ainda pendente
+            conteudo_hash = hashlib.sha256(relatorio.encode('utf-8')).hexdigest()[:16]
+            grupo_chave = f"{uf}|{self.get_data_atual()}"
+            chave = f"{grupo_chave}|{conteudo_hash}"
+            
+            status = self.outbox.enfileirar(chave, uf, numero, mensagem_completa, grupo=grupo_chave)
+            if status == ENVIADA:
+                self.logger.info(f"Relatório de {uf} já entregue anteriormente, envio ignorado")
+                return True
+            
+            return self._entregar(chave, numero, mensagem_completa)
             
         except Exception as e:
             self.logger.error(f"Erro ao enviar relatório para UF {uf}: {str(e)}")
             return False
     
+    def _entregar(self, chave, numero, mensagem, retentar=True):
+        """
+        Envia mensagem da caixa de saída e registra o resultado
+        
+        Falhas são repetidas com o backoff da caixa de saída enquanto a espera
+        couber em OUTBOX_ESPERA_MAXIMA; depois disso a mensagem fica pendente
+        para a próxima execução.
+        
+        Args:
+            chave (str): Chave de idempotência
+            numero (str): Número do WhatsApp
+            mensagem (str): Mensagem completa
+            retentar (bool): Repete falhas dentro desta execução
+            
+        Returns:
+            bool: True se enviado com sucesso
+        """
+        prazo = time.monotonic() + OUTBOX_ESPERA_MAXIMA
+        
+        while True:
+            if self.send_message(numero, mensagem):
+                self.outbox.marcar_enviada(chave)
+                return True
+            
+            espera = self.outbox.marcar_falha(chave, "falha no envio")
+            if not retentar or espera is None or time.monotonic() + espera > prazo:
+                return False
+            
+            self.logger.info("Nova tentativa de envio para %s em %.1fs", numero, espera)
+            time.sleep(espera)
+    
+    def drenar_outbox(self):
+        """
+        Reenvia mensagens pendentes da caixa de saída cujo backoff já venceu
+        
+        Returns:
+            tuple: (quantidade enviada, quantidade com falha)
+        """
+        if self.outbox is None:
+            return 0, 0
+        
+        enviadas = falhas = 0
+        
+        for mensagem in self.outbox.pendentes():
+            self.logger.info("Reenviando mensagem pendente para %s (tentativa %d)", mensagem['uf'], mensagem['tentativas'] + 1)
+            if self._entregar(mensagem['chave'], mensagem['numero'], mensagem['mensagem'], retentar=False):
+                enviadas += 1
+            else:
+                falhas += 1
+        
+        if enviadas or falhas:
+            self.logger.info(f"Caixa de saída: {enviadas} reenviadas, {falhas} ainda pendentes")
+        
+        return enviadas, falhas
+    
     def send_relatorios_todas_ufs(self, relatorios_por_uf):
         """
-        Envia relatórios para todas as UFs
+        Envia relatórios para todas as UFs em paralelo
+        
+        Os envios respeitam o limite de taxa (WHATSAPP_TAXA_ENVIO/WHATSAPP_RAJADA)
+        e no máximo WHATSAPP_MAX_EM_VOO ficam em andamento ao mesmo tempo.
+        A latência de cada envio fica disponível em self.latencias. Depois dos
+        envios, as pendências de execuções anteriores são reenviadas.
         
         Args:
             relatorios_por_uf (dict): Dicionário com relatórios por UF
@@ -110,30 +194,54 @@ class WhatsAppSender:
         Returns:
             dict: Resultado dos envios por UF
         """
-        resultados = {}
+        envios = {}
         
         for uf, relatorio in relatorios_por_uf.items():
             if uf == 'DESCONHECIDO':
                 self.logger.warning("Pulando UF DESCONHECIDO")
                 continue
-                
-            resultado = self.send_relatorio_uf(uf, relatorio)
-            resultados[uf] = resultado
+            envios[uf] = relatorio
+        
+        if not envios:
+            self.drenar_outbox()
+            return {}
+        
+        def enviar(uf):
+            inicio = time.perf_counter()
+            resultado = self.send_relatorio_uf(uf, envios[uf])
+            return resultado, time.perf_counter() - inicio
+        
+        resultados = {}
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(WHATSAPP_MAX_EM_VOO, len(envios))),
+                                thread_name_prefix='whatsapp') as executor:
+            futuros = {uf: executor.submit(enviar, uf) for uf in envios}
             
-            if resultado:
-                self.logger.info(f"Relatório enviado com sucesso para {uf}")
-            else:
-                self.logger.error(f"Falha ao enviar relatório para {uf}")
+            for uf, futuro in futuros.items():
+                resultado, latencia = futuro.result()
+                resultados[uf] = resultado
+                self.latencias[uf] = latencia
+                coletor.registrar_envio(uf, latencia, resultado)
+                
+                if resultado:
+                    self.logger.info("Relatório enviado com sucesso para %s em %.2fs", uf, latencia)
+                else:
+                    self.logger.error("Falha ao enviar relatório para %s", uf)
+        
+        # Depois dos relatórios atuais, que já substituíram as versões pendentes da mesma UF e data
+        self.drenar_outbox()
         
         return resultados
     
     def get_data_atual(self):
         """
-        Retorna data atual formatada
+        Retorna data atual formatada (ou a data fixa dos relatórios, se definida)
         
         Returns:
             str: Data formatada
         """
+        if self.data_relatorio:
+            return self.data_relatorio
         from datetime import datetime
         return datetime.now().strftime("%d/%m/%Y")
     
@@ -150,7 +258,7 @@ class WhatsAppSender:
             }
             
             # Fazer uma requisição simples para testar
-            response = requests.get(WHATSAPP_API_URL.replace('/send', ''), headers=headers)
+            response = self.session.get(self.api_url.replace('/send', ''), headers=headers)
             
             if response.status_code in [200, 404]:  # 404 é esperado para GET na URL de send
                 self.logger.info("Conexão com WhatsApp API OK")